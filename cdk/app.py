@@ -10,7 +10,29 @@ import os
 import aws_cdk as cdk
 
 # Own imports
-from helpers.add_tags import add_tags_to_app
+from helpers.account_inventory import (
+    apply_account_inventory,
+    load_account_inventory,
+    load_managed_account_ids,
+)
+from helpers.account_scheduler import normalize_lanes, schedule_account_lanes
+from helpers.add_tags import add_tags_to_app, get_app_tags
+from helpers.assembly_fingerprint import write_assembly_fingerprints
+from helpers.deploy_estimator import write_deploy_estimates
+from helpers.org_spec import DEFAULT_ORG_SPEC_PATH, load_org_spec
+from helpers.parallel_synth import ShardWorkers, plan_shard_groups
+from helpers.policy_library import PolicyLibrary
+from helpers.scp_optimizer import optimize_scps
+from helpers.scp_placement import place_scps
+from helpers.synth_cache import (
+    DEFAULT_SYNTH_CACHE_DIR,
+    SynthCache,
+    shard_cache_keys,
+    source_fingerprint,
+    update_synth_cache,
+)
+from helpers.synth_profiler import create_synth_profiler
+from helpers.warm_synth import synth_request_props
 from stacks.cdk_organization import OrganizationStack
 
 
@@ -18,30 +40,244 @@ print("--> Deployment AWS configuration (safety first):")
 print("CDK_DEFAULT_ACCOUNT", os.getenv("CDK_DEFAULT_ACCOUNT"))
 print("CDK_DEFAULT_REGION", os.getenv("CDK_DEFAULT_REGION"))
 
-app = cdk.App()
+# Outdir and context are explicit when served by a warm synth server
+app = cdk.App(**synth_request_props())
+
+# Opt-in instrumentation of the synth phases (see "helpers/synth_profiler.py")
+profiler = create_synth_profiler(app)
+profiler.start()
 
 # Configurations for the deployment (obtained from env vars and CDK context)
 DEPLOYMENT_ENVIRONMENT = os.environ.get("DEPLOYMENT_ENVIRONMENT", "prod")
+DEPLOYMENT_ENVIRONMENTS = app.node.try_get_context(
+    "deployment_environments"
+) or os.environ.get("DEPLOYMENT_ENVIRONMENTS")
+if isinstance(DEPLOYMENT_ENVIRONMENTS, str):
+    DEPLOYMENT_ENVIRONMENTS = [
+        env.strip() for env in DEPLOYMENT_ENVIRONMENTS.split(",") if env.strip()
+    ]
 MAIN_RESOURCES_NAME = app.node.try_get_context("main_resources_name")
+ORG_SPEC_PATH = app.node.try_get_context("org_spec_path") or DEFAULT_ORG_SPEC_PATH
+ACCOUNT_CREATION_LANES = app.node.try_get_context("account_creation_lanes")
+ACCOUNT_INVENTORY_PATH = app.node.try_get_context("account_inventory_path")
+MANAGED_ACCOUNTS_PATH = app.node.try_get_context("managed_accounts_path")
+SHARDING_MODE = app.node.try_get_context("sharding_mode") or "none"
+SYNTH_CACHE = str(app.node.try_get_context("synth_cache")).lower() == "true"
+SYNTH_CACHE_MAX_ENTRIES = app.node.try_get_context("synth_cache_max_entries")
+OUTPUTS_MODE = app.node.try_get_context("outputs_mode") or "outputs"
+OPTIMIZE_SCPS = str(app.node.try_get_context("optimize_scps")).lower() == "true"
+PLACE_SCPS = str(app.node.try_get_context("place_scps")).lower() == "true"
+SCP_HOIST_MODE = app.node.try_get_context("scp_hoist_mode") or "none"
+# More workers than cores only adds interpreter/jsii startups
+PARALLEL_SYNTH = min(
+    int(app.node.try_get_context("parallel_synth") or 0), os.cpu_count() or 1
+)
+SYNTH_SHARDS = app.node.try_get_context("synth_shards")
+DEPLOY_ESTIMATE = str(app.node.try_get_context("deploy_estimate")).lower() == "true"
+DEPLOY_DURATIONS = app.node.try_get_context("deploy_durations")
 
+ORG_SPEC = load_org_spec(ORG_SPEC_PATH)
+if ACCOUNT_INVENTORY_PATH:
+    # Bulk import: accounts of the inventory are adopted instead of created
+    # (except the ones already deployed by the stack, which stay as they are)
+    if not MANAGED_ACCOUNTS_PATH:
+        print(
+            "--> WARNING: no managed_accounts_path, so accounts of the inventory "
+            "already deployed by the stack are also marked for import"
+        )
+    ORG_SPEC = apply_account_inventory(
+        ORG_SPEC,
+        load_account_inventory(ACCOUNT_INVENTORY_PATH),
+        load_managed_account_ids(MANAGED_ACCOUNTS_PATH)
+        if MANAGED_ACCOUNTS_PATH
+        else (),
+    )
+if PLACE_SCPS:
+    # Fewer SCP attachments (same effective SCPs of every account of the spec)
+    scp_placement = place_scps(ORG_SPEC, hoist_mode=SCP_HOIST_MODE)
+    ORG_SPEC = scp_placement.org_spec
+    print("--> SCP placement: {}".format(scp_placement.summary()))
+    for line in scp_placement.report():
+        print("    {}".format(line))
+    for warning in scp_placement.warnings():
+        print("--> WARNING: {}".format(warning))
+# SCP documents read once for the synth cache keys and all the stacks
+POLICY_LIBRARY = PolicyLibrary(ORG_SPEC.policies_dir)
+STACK_ENV = {
+    "account": os.getenv("CDK_DEFAULT_ACCOUNT"),
+    "region": os.getenv("CDK_DEFAULT_REGION"),
+}
+
+# Incremental synth: unchanged shards (only with sibling stacks) are restored
+# from the cache instead of being built again
+synth_cache, shard_keys, cached_shards = None, {}, []
+if SYNTH_CACHE and SHARDING_MODE == "stacks" and not DEPLOYMENT_ENVIRONMENTS:
+    synth_cache = SynthCache(
+        DEFAULT_SYNTH_CACHE_DIR,
+        max_entries=int(SYNTH_CACHE_MAX_ENTRIES or 0) or None,
+    )
+    shard_keys = shard_cache_keys(
+        ORG_SPEC,
+        schedule_account_lanes(
+            [account.construct_id for account in ORG_SPEC.accounts],
+            ACCOUNT_CREATION_LANES,
+        ),
+        salt={
+            "main_resources_name": MAIN_RESOURCES_NAME,
+            "deployment_environment": DEPLOYMENT_ENVIRONMENT,
+            "env": STACK_ENV,
+            "tags": app.node.try_get_context("tags"),
+            # The packed SCPs of every shard depend on the whole org
+            "scp_optimization": (
+                optimize_scps(ORG_SPEC, POLICY_LIBRARY).digest
+                if OPTIMIZE_SCPS
+                else None
+            ),
+            "outputs_mode": OUTPUTS_MODE,
+            "source": source_fingerprint(),
+        },
+    )
+    cached_shards = [path for path, key in shard_keys.items() if synth_cache.has(key)]
+    print(
+        "--> Synth cache: {} of {} shards restored from cache".format(
+            len(cached_shards), len(shard_keys)
+        )
+    )
 
-org_stack = OrganizationStack(
-    app,
-    MAIN_RESOURCES_NAME,
-    DEPLOYMENT_ENVIRONMENT,
-    env={
-        "account": os.getenv("CDK_DEFAULT_ACCOUNT"),
-        "region": os.getenv("CDK_DEFAULT_REGION"),
-    },
-    description="Stack for {} infrastructure in {} environment".format(
-        MAIN_RESOURCES_NAME, DEPLOYMENT_ENVIRONMENT
-    ),
-)
 
-add_tags_to_app(
-    app,
-    MAIN_RESOURCES_NAME,
-    DEPLOYMENT_ENVIRONMENT,
+# Parallel synth: other processes build the shards (only with sibling stacks),
+# while this one builds the main stack and the shards as placeholders
+shard_workers, placeholder_shards = None, cached_shards
+TOP_LEVEL_PATHS = [
+    ou.path for ou in ORG_SPEC.organizational_units if not ou.parent_path
+]
+if SYNTH_SHARDS is not None:
+    # Running as a worker of the parallel synth
+    placeholder_shards = [path for path in TOP_LEVEL_PATHS if path not in SYNTH_SHARDS]
+elif PARALLEL_SYNTH > 1 and SHARDING_MODE == "stacks" and not DEPLOYMENT_ENVIRONMENTS:
+    shard_groups = plan_shard_groups(
+        ORG_SPEC,
+        [path for path in TOP_LEVEL_PATHS if path not in cached_shards],
+        PARALLEL_SYNTH,
+    )
+    if shard_groups:
+        shard_workers = ShardWorkers(shard_groups, app.node.get_all_context())
+        placeholder_shards = TOP_LEVEL_PATHS
+        print(
+            "--> Parallel synth: {} shards in {} worker processes".format(
+                sum(len(group) for group in shard_groups), len(shard_groups)
+            )
+        )
+
+# The spec and the SCP documents are shared by all the stacks of the app
+STACK_OPTIONS = dict(
+    org_spec=ORG_SPEC,
+    account_creation_lanes=normalize_lanes(ACCOUNT_CREATION_LANES),
+    sharding_mode=SHARDING_MODE,
+    profiler=profiler,
+    policy_library=POLICY_LIBRARY,
+    optimize_policies=OPTIMIZE_SCPS,
+    outputs_mode=OUTPUTS_MODE,
+    env=STACK_ENV,
 )
 
-app.synth()
+
+def print_stack_summary(org_stack: OrganizationStack) -> None:
+    print(
+        "--> Account creation lanes: {} (critical path of {} account creations)".format(
+            len(org_stack.account_schedule.lanes),
+            org_stack.account_schedule.critical_path_length,
+        )
+    )
+    imported = sum(account.imported for account in org_stack.org_spec.accounts)
+    if imported:
+        print(
+            "--> Imported accounts: {} (adopted in the account creation lanes)".format(
+                imported
+            )
+        )
+    if org_stack.scp_optimization:
+        print("--> SCP optimizer: {}".format(org_stack.scp_optimization.summary()))
+    for policy_id in org_stack.unattached_policies:
+        print(
+            "--> WARNING: SCP '{}' is not attached to any target, so it is not "
+            "synthesized (a deployed SCP is deleted)".format(policy_id)
+        )
+
+
+if DEPLOYMENT_ENVIRONMENTS:
+    # Batch synth: one Stage per environment in a single process (so Python and
+    # jsii startup are paid once), each with its own nested cloud assembly at
+    # "cdk.out/assembly-<environment>"
+    if SYNTH_CACHE:
+        print("--> Synth cache is not used when synthesizing several environments")
+    for environment in DEPLOYMENT_ENVIRONMENTS:
+        stage = cdk.Stage(app, environment)
+        org_stack = OrganizationStack(
+            stage,
+            MAIN_RESOURCES_NAME,
+            environment,
+            description="Stack for {} infrastructure in {} environment".format(
+                MAIN_RESOURCES_NAME, environment
+            ),
+            base_tags=get_app_tags(stage, MAIN_RESOURCES_NAME, environment),
+            **STACK_OPTIONS,
+        )
+        print("--> Environment: {}".format(environment))
+        print_stack_summary(org_stack)
+        with profiler.phase("add_tags_to_app", app):
+            add_tags_to_app(stage, MAIN_RESOURCES_NAME, environment)
+else:
+    org_stack = OrganizationStack(
+        app,
+        MAIN_RESOURCES_NAME,
+        DEPLOYMENT_ENVIRONMENT,
+        cached_shards=placeholder_shards,
+        description="Stack for {} infrastructure in {} environment".format(
+            MAIN_RESOURCES_NAME, DEPLOYMENT_ENVIRONMENT
+        ),
+        base_tags=get_app_tags(app, MAIN_RESOURCES_NAME, DEPLOYMENT_ENVIRONMENT),
+        **STACK_OPTIONS,
+    )
+    print_stack_summary(org_stack)
+    with profiler.phase("add_tags_to_app", app):
+        add_tags_to_app(
+            app,
+            MAIN_RESOURCES_NAME,
+            DEPLOYMENT_ENVIRONMENT,
+        )
+
+with profiler.phase("app_synth", app):
+    cloud_assembly = app.synth()
+
+if shard_workers:
+    with profiler.phase("merge_shard_workers", app):
+        shard_workers.merge(
+            {path: shard.artifact_id for path, shard in org_stack.shards.items()},
+            cloud_assembly.directory,
+        )
+
+if synth_cache:
+    update_synth_cache(
+        synth_cache,
+        shard_keys,
+        {path: shard.artifact_id for path, shard in org_stack.shards.items()},
+        cached_shards,
+        cloud_assembly.directory,
+    )
+
+# Workers of the parallel synth only build a part of the shards
+if SYNTH_SHARDS is None:
+    with profiler.phase("assembly_fingerprints", app):
+        fingerprints = write_assembly_fingerprints(cloud_assembly.directory)
+    print("--> Assembly fingerprints: {} stacks".format(len(fingerprints)))
+
+if DEPLOY_ESTIMATE and SYNTH_SHARDS is None:
+    with profiler.phase("deploy_estimate", app):
+        estimates = write_deploy_estimates(cloud_assembly.directory, DEPLOY_DURATIONS)
+    for directory, estimate in estimates.items():
+        print("--> Deploy estimate ({}): {}".format(directory, estimate.summary()))
+
+report_file = profiler.write_report(cloud_assembly.directory)
+if report_file:
+    print("--> Synth profile report: {}".format(report_file))
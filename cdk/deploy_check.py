@@ -0,0 +1,73 @@
+################################################################################
+# DEPLOY SHORT-CIRCUIT (COMPARES THE ASSEMBLY WITH THE LAST DEPLOYMENT)
+# The synth writes the fingerprint of each stack to "cdk.out/fingerprints.json"
+# and the fingerprints of the last successful deployment are kept in a local
+# file (restored from the CI cache/artifacts), so unchanged stacks are skipped:
+# --> python cdk/deploy_check.py compare --deployed .deploy/fingerprints.json
+# --> cdk deploy --app cdk.out --exclusively <changed stacks>
+# --> python cdk/deploy_check.py record --deployed .deploy/fingerprints.json
+# In GitHub Actions, "compare" also sets the "changed" and "stacks" outputs.
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import argparse
+
+# Own imports
+from helpers.assembly_fingerprint import (
+    FINGERPRINT_FILE_NAME,
+    FINGERPRINT_FORMAT_VERSION,
+    changed_stacks,
+    load_fingerprints,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Deploy short-circuit of the app")
+    parser.add_argument("command", choices=("compare", "record"))
+    parser.add_argument(
+        "--assembly", default="cdk.out", help="Synthesized cloud assembly directory"
+    )
+    parser.add_argument(
+        "--deployed", required=True, help="Fingerprints of the last deployment"
+    )
+    parser.add_argument(
+        "--stacks", nargs="*", help="Deployed stacks to record (default: all)"
+    )
+    args = parser.parse_args(argv)
+
+    fingerprints = load_fingerprints(os.path.join(args.assembly, FINGERPRINT_FILE_NAME))
+    if not fingerprints:
+        parser.error("No fingerprints in {} (run cdk synth)".format(args.assembly))
+    deployed = load_fingerprints(args.deployed)
+
+    if args.command == "record":
+        for stack_id in fingerprints if args.stacks is None else args.stacks:
+            deployed[stack_id] = fingerprints[stack_id]
+        os.makedirs(os.path.dirname(os.path.abspath(args.deployed)), exist_ok=True)
+        with open(args.deployed, "w") as file:
+            json.dump(
+                {"version": FINGERPRINT_FORMAT_VERSION, "stacks": deployed},
+                file,
+                indent=2,
+            )
+            file.write("\n")
+        print("--> Recorded fingerprints of {} stacks".format(len(deployed)))
+        return 0
+
+    stacks = changed_stacks(fingerprints, deployed)
+    if stacks:
+        print("--> Changed stacks: {}".format(" ".join(stacks)))
+    else:
+        print("--> No stack changed since the last deployment")
+    if os.environ.get("GITHUB_OUTPUT"):
+        with open(os.environ["GITHUB_OUTPUT"], "a") as file:
+            file.write("changed={}\n".format("true" if stacks else "false"))
+            file.write("stacks={}\n".format(" ".join(stacks)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+################################################################################
+# OFFLINE DRIFT CHECK OF THE AWS ORGANIZATION (NO CDK SYNTH OR CREDENTIALS)
+# Compares the org spec with a snapshot of the live organization and prints the
+# OUs/accounts to create, move, rename and the orphans (not in the spec).
+# --> Export the snapshot once: python cdk/drift.py --export snapshot.json
+# --> Check the drift offline: python cdk/drift.py snapshot.json
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import argparse
+
+# Own imports
+from helpers.org_drift import diff_org
+from helpers.org_snapshot import export_org_snapshot, load_org_snapshot
+from helpers.org_spec import DEFAULT_ORG_SPEC_PATH, load_org_spec
+
+
+DEFAULT_CONTEXT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cdk.context.json"
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Offline drift check of the org spec against a snapshot"
+    )
+    parser.add_argument("snapshot", help="Organizations snapshot JSON file")
+    parser.add_argument("--spec", help="Org spec file (default: from the context)")
+    parser.add_argument(
+        "--context", default=DEFAULT_CONTEXT_PATH, help="CDK context JSON file"
+    )
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help="Export the snapshot of the live organization (needs credentials)",
+    )
+    parser.add_argument(
+        "--fail-on-drift", action="store_true", help="Exit with 1 if there is drift"
+    )
+    args = parser.parse_args(argv)
+
+    if args.export:
+        import boto3
+
+        with open(args.snapshot, "w") as file:
+            json.dump(export_org_snapshot(boto3.client("organizations")), file)
+        print("--> Snapshot exported to {}".format(args.snapshot))
+        return 0
+
+    with open(args.context, "r") as file:
+        context = json.load(file)
+    org_spec = load_org_spec(
+        args.spec or context.get("org_spec_path") or DEFAULT_ORG_SPEC_PATH
+    )
+    report = diff_org(org_spec, load_org_snapshot(args.snapshot))
+    for change in report.changes:
+        print(change)
+    print("--> Drift: {}".format(report.summary()))
+    return 1 if args.fail_on_drift and report.has_drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+################################################################################
+# ACCOUNT DEPENDENCIES OF THE SYNTHESIZED CLOUD ASSEMBLY
+# The accounts are created in the order CloudFormation actually waits for:
+# the "DependsOn" (and references) of the "Custom::Organizations_Account"
+# resources, through any resource between two accounts, and the dependencies
+# of the nested and top-level stacks between templates. They are read back
+# from the templates (pure Python, no jsii), so the static validator can also
+# check the dependencies that "add_cdk_accounts_dependencies" emitted in a synth.
+################################################################################
+
+# Built-in imports
+import os
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Own imports
+from helpers.account_inventory import ACCOUNT_RESOURCE_TYPE
+from helpers.cloud_assembly import nested_template_assets, nested_template_file
+from helpers.dependency_graph import DependencyGraph
+from helpers.deploy_estimator import NESTED_STACK_TYPE, template_dependencies
+
+
+def template_account_dependencies(
+    template: Dict[str, Any], account_ids: Iterable[str]
+) -> DependencyGraph:
+    """
+    Function to get the account dependencies of a single template (the
+    accounts of its nested stacks are not included).
+
+    :param template: (dict) the CloudFormation template.
+    :param account_ids: (Iterable[str]) construct IDs of the accounts of the spec.
+    :return: (DependencyGraph) account construct ID -> accounts it waits for.
+    """
+    collector = _AccountDependencies(account_ids, lambda resource: None)
+    collector.add_template(template, [])
+    return collector.graph
+
+
+def assembly_account_dependencies(
+    directory: str, account_ids: Iterable[str]
+) -> DependencyGraph:
+    """
+    Function to get the account dependencies of a cloud assembly (all its
+    stacks and nested stacks).
+
+    :param directory: (str) cloud assembly directory (usually "cdk.out").
+    :param account_ids: (Iterable[str]) construct IDs of the accounts of the spec.
+    :return: (DependencyGraph) account construct ID -> accounts it waits for
+        (every synthesized account is a node, with or without dependencies).
+    """
+    with open(os.path.join(directory, "manifest.json"), "r") as file:
+        artifacts = json.load(file).get("artifacts", {})
+    asset_paths = nested_template_assets(directory)
+
+    def load_nested(resource: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        template_file = nested_template_file(resource, asset_paths)
+        return _load_template(directory, template_file) if template_file else None
+
+    collector = _AccountDependencies(account_ids, load_nested)
+    stacks = DependencyGraph()
+    for artifact_id, artifact in artifacts.items():
+        if artifact["type"] != "aws:cloudformation:stack":
+            continue
+        stacks.add_node(artifact_id)
+        for dependency in artifact.get("dependencies", ()):
+            if artifacts.get(dependency, {}).get("type") == "aws:cloudformation:stack":
+                stacks.add_dependency(artifact_id, dependency)
+
+    # The accounts of a stack wait for the last accounts of the stacks it needs
+    last_accounts: Dict[str, List[str]] = {}
+    for artifact_id in stacks.topological_order():
+        last_accounts[artifact_id] = collector.add_template(
+            _load_template(
+                directory, artifacts[artifact_id]["properties"]["templateFile"]
+            ),
+            _merge(
+                last_accounts[dependency]
+                for dependency in stacks.dependencies(artifact_id)
+            ),
+        )
+    return collector.graph
+
+
+def _load_template(directory: str, template_file: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, template_file), "r") as file:
+        return json.load(file)
+
+
+def _merge(account_lists: Iterable[List[str]]) -> List[str]:
+    return list(
+        dict.fromkeys(account for accounts in account_lists for account in accounts)
+    )
+
+
+class _AccountDependencies:
+    """
+    Account dependencies collected from the templates, in deployment order.
+    """
+
+    def __init__(
+        self,
+        account_ids: Iterable[str],
+        load_nested: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+    ) -> None:
+        self.account_ids = set(account_ids)
+        self.load_nested = load_nested
+        self.graph = DependencyGraph()
+        # Position of each account in the order they were found
+        self._rank: Dict[str, int] = {}
+
+    def add_template(self, template: Dict[str, Any], waits: List[str]) -> List[str]:
+        """
+        Method to add the accounts of a template (and of its nested stacks).
+
+        :param template: (dict) the CloudFormation template.
+        :param waits: (list) accounts created before the template is deployed.
+        :return: (list) last accounts created by the template (no other of
+            its accounts waits for them), or "waits" if it has no accounts.
+        """
+        resources = template.get("Resources", {})
+        resource_graph = template_dependencies(template)
+        # Logical ID -> closest accounts each resource waits for
+        reached: Dict[str, List[str]] = {}
+        added: List[str] = []
+        for logical_id in resource_graph.topological_order():
+            resource = resources[logical_id]
+            closest = (
+                _merge(
+                    reached[dependency]
+                    for dependency in resource_graph.dependencies(logical_id)
+                )
+                or waits
+            )
+            if resource["Type"] == ACCOUNT_RESOURCE_TYPE:
+                account_id = self._account_id(logical_id, resource)
+                self._add_account(account_id, closest)
+                added.append(account_id)
+                reached[logical_id] = [account_id]
+            elif resource["Type"] == NESTED_STACK_TYPE:
+                nested = self.load_nested(resource)
+                last = self.add_template(nested, closest) if nested else closest
+                added.extend(last)
+                reached[logical_id] = last
+            else:
+                reached[logical_id] = closest
+
+        depended = {
+            dependency
+            for account_id in added
+            for dependency in self.graph.dependencies(account_id)
+        }
+        return [
+            account_id for account_id in added if account_id not in depended
+        ] or waits
+
+    def _account_id(self, logical_id: str, resource: Dict[str, Any]) -> str:
+        # The account construct is in the path of its custom resource
+        path = resource.get("Metadata", {}).get("aws:cdk:path", "")
+        for segment in reversed(path.split("/")):
+            if segment in self.account_ids:
+                return segment
+        return logical_id
+
+    def _add_account(self, account_id: str, dependencies: List[str]) -> None:
+        self._rank.setdefault(account_id, len(self._rank))
+        self.graph.add_node(account_id)
+        # Latest created first, so the first dependency is the chain link
+        for dependency in sorted(
+            dependencies, key=lambda account: self._rank[account], reverse=True
+        ):
+            self.graph.add_dependency(account_id, dependency)
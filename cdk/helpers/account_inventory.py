@@ -0,0 +1,106 @@
+################################################################################
+# ACCOUNT INVENTORY (BULK IMPORT OF PRE-EXISTING ACCOUNTS)
+# The inventory is the JSON output of "aws organizations list-accounts" (or any
+# JSON with an "Accounts" list of objects with an "Email"). Spec accounts found
+# in the inventory are marked for import up front ("import_on_duplicate" and
+# "retain" removal policy). Accounts already deployed by the stack (from its
+# outputs or resources) are left as they are, so their resources don't change.
+################################################################################
+
+# Built-in imports
+import re
+import json
+import dataclasses
+from typing import Any, Dict, Iterable, Set
+
+# Own imports
+from helpers.org_spec import OrgSpec
+
+
+ACCOUNT_RESOURCE_TYPE = "Custom::Organizations_Account"
+
+_ACCOUNT_ID = re.compile(r"^\d{12}$")
+
+
+def load_account_inventory(path: str) -> Dict[str, str]:
+    """
+    Function to load an account inventory file.
+
+    :param path: (str) path to the inventory JSON file.
+    :return: (dict) lowercase email -> account ID ("" if unknown).
+    """
+    with open(path, "r") as file:
+        document = json.load(file)
+    try:
+        return {
+            account["Email"].lower(): account.get("Id", "")
+            for account in document["Accounts"]
+        }
+    except (KeyError, TypeError):
+        raise ValueError(
+            "Invalid account inventory '{}', expected the output of "
+            "'aws organizations list-accounts'".format(path)
+        ) from None
+
+
+def load_managed_account_ids(path: str) -> Set[str]:
+    """
+    Function to load the IDs of the accounts already deployed by the stack,
+    from the outputs file of "cdk deploy --outputs-file" (account ID outputs)
+    or from the output of "aws cloudformation list-stack-resources" (or a list
+    of them, e.g. also for the nested stacks of the account creation lanes).
+
+    :param path: (str) path to the outputs or stack resources JSON file.
+    :return: (set) account IDs.
+    """
+    with open(path, "r") as file:
+        document = json.load(file)
+    account_ids = set()
+    for part in document if isinstance(document, list) else [document]:
+        if "StackResourceSummaries" in part:
+            account_ids.update(
+                resource.get("PhysicalResourceId", "")
+                for resource in part["StackResourceSummaries"]
+                if resource.get("ResourceType") == ACCOUNT_RESOURCE_TYPE
+            )
+        else:
+            account_ids.update(_output_values(part))
+    return {account_id for account_id in account_ids if _ACCOUNT_ID.match(account_id)}
+
+
+def _output_values(outputs: Any) -> Iterable[str]:
+    # Outputs file: stack name -> output key -> value
+    for stack_outputs in outputs.values():
+        if isinstance(stack_outputs, dict):
+            yield from (str(value) for value in stack_outputs.values())
+
+
+def apply_account_inventory(
+    org_spec: OrgSpec,
+    inventory: Dict[str, str],
+    managed_account_ids: Iterable[str] = (),
+) -> OrgSpec:
+    """
+    Function to mark the spec accounts found in the inventory as imported,
+    except the ones already deployed by the stack.
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :param inventory: (dict) lowercase email -> account ID.
+    :param managed_account_ids: (Iterable[str]) IDs of the accounts already deployed by the stack.
+    :return: (OrgSpec) a new spec with the imported accounts marked.
+    """
+    managed = set(managed_account_ids)
+    accounts = tuple(
+        dataclasses.replace(
+            account,
+            imported=True,
+            import_on_duplicate=True,
+            # Adopted accounts must never be closed by a stack deletion
+            removal_policy=account.removal_policy or "retain",
+        )
+        if account.email.lower() in inventory
+        and inventory[account.email.lower()] not in managed
+        else account
+        for account in org_spec.accounts
+    )
+    return dataclasses.replace(org_spec, accounts=accounts)
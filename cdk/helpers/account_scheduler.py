@@ -0,0 +1,93 @@
+################################################################################
+# ACCOUNT CREATION SCHEDULER
+# AWS Organizations limits how many "CreateAccount" requests can be in progress
+# at the same time. Accounts are split in K independent lanes: inside each lane
+# accounts are created one after the other, and the lanes run in parallel.
+# With K=1 this is the original single serial dependency chain. Imported
+# accounts still send a "CreateAccount" request (that fails as duplicated and
+# then adopts the account), so they are scheduled in the same lanes.
+################################################################################
+
+# Built-in imports
+from dataclasses import dataclass
+from typing import Any, Dict, Sequence, Tuple
+
+# Own imports
+from helpers.dependency_graph import DependencyGraph
+
+
+DEFAULT_ACCOUNT_CREATION_LANES = 1
+
+
+@dataclass(frozen=True)
+class AccountSchedule:
+    """
+    Result of the account lanes scheduling.
+    """
+
+    lanes: Tuple[Tuple[str, ...], ...]
+    lane_index: Dict[str, int]
+    graph: DependencyGraph
+    critical_path: Tuple[str, ...]
+
+    @property
+    def critical_path_length(self) -> int:
+        """
+        Number of account creations that have to run one after the other.
+        """
+        return len(self.critical_path)
+
+
+def normalize_lanes(value: Any) -> int:
+    """
+    Function to get a valid number of lanes from a CDK context value. Missing
+    or invalid values fall back to the single serial chain (K=1).
+
+    :param value: (Any) raw value (e.g. from "account_creation_lanes" context).
+    :return: (int) number of lanes (>= 1).
+    """
+    try:
+        lanes = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_ACCOUNT_CREATION_LANES
+    return max(lanes, DEFAULT_ACCOUNT_CREATION_LANES)
+
+
+def schedule_account_lanes(account_ids: Sequence[str], lanes: Any) -> AccountSchedule:
+    """
+    Function to split the accounts (in creation order) into contiguous and
+    balanced lanes, and build their dependency graph. Contiguous lanes keep
+    accounts of the same OU together.
+
+    :param account_ids: (Sequence[str]) account construct ids in creation order.
+    :param lanes: (Any) desired number of lanes (normalized with "normalize_lanes").
+    :return: (AccountSchedule) the lanes, dependency graph and critical path.
+    """
+    lanes_count = min(normalize_lanes(lanes), max(len(account_ids), 1))
+    lane_size, remainder = divmod(len(account_ids), lanes_count)
+
+    scheduled_lanes = []
+    start = 0
+    for index in range(lanes_count):
+        end = start + lane_size + (1 if index < remainder else 0)
+        scheduled_lanes.append(tuple(account_ids[start:end]))
+        start = end
+
+    graph = DependencyGraph()
+    lane_index = {}
+    for index, lane in enumerate(scheduled_lanes):
+        for position, account_id in enumerate(lane):
+            lane_index[account_id] = index
+            graph.add_node(account_id)
+            if position > 0:
+                graph.add_dependency(account_id, lane[position - 1])
+
+    # Also validates that the graph has no cycles
+    _, critical_path = graph.critical_path()
+
+    return AccountSchedule(
+        lanes=tuple(scheduled_lanes),
+        lane_index=lane_index,
+        graph=graph,
+        critical_path=tuple(critical_path),
+    )
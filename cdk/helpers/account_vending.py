@@ -0,0 +1,501 @@
+################################################################################
+# ASYNC ACCOUNT VENDING (OPTIONAL, WITH THE AWS ORGANIZATIONS APIS)
+# CloudFormation creates the accounts one resource at a time along the chains
+# of "add_cdk_accounts_dependencies". The vending engine creates the accounts
+# of the same org spec directly, ahead of the deployment:
+# --> "CreateAccount" requests are submitted up to "max_in_progress" at a time
+# --> The requests in progress are polled in batches (one paginated
+#     "ListCreateAccountStatus" per round for all of them), backing off while
+#     nothing finishes
+# --> New accounts are moved into the OU of the spec
+# Every step is appended to a local journal (each request before it is sent),
+# so an interrupted run resumes where it stopped and adopts the requests it
+# sent instead of requesting the accounts twice. The vended accounts are then
+# adopted by the stack through the account inventory.
+################################################################################
+
+# Built-in imports
+import os
+import json
+import time
+import asyncio
+import functools
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+# Own imports
+from helpers.org_snapshot import OrgSnapshot, export_org_snapshot, parse_org_snapshot
+from helpers.org_spec import AccountSpec, OrgSpec
+from helpers.org_tags import resolve_org_tags
+
+
+# Concurrent account creations allowed by AWS Organizations (adjustable quota)
+DEFAULT_MAX_IN_PROGRESS = 5
+
+DEFAULT_MIN_POLL_SECONDS = 5.0
+
+DEFAULT_MAX_POLL_SECONDS = 60.0
+
+POLL_BACKOFF_FACTOR = 2.0
+
+THROTTLING_ERROR_CODES = ("TooManyRequestsException", "ThrottlingException")
+
+MAX_THROTTLING_RETRIES = 8
+
+THROTTLING_BASE_SECONDS = 0.5
+
+# Clock difference tolerated between this host and AWS when adopting requests
+REQUEST_CLOCK_SKEW_SECONDS = 300.0
+
+# Journal states of an account ("moved", "existing" and "failed" are final)
+REQUESTING, REQUESTED, CREATED, MOVED, EXISTING, FAILED = (
+    "requesting",
+    "requested",
+    "created",
+    "moved",
+    "existing",
+    "failed",
+)
+
+
+class VendingJournal:
+    """
+    Class for the append-only journal of the vending (JSON lines). Each line
+    has the whole state of an account, so the last one of each account wins,
+    and lines are flushed to disk one by one to survive interruptions.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path (str): Path to the journal file (created if missing).
+        """
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Partial last line of an interrupted run
+                        continue
+                    self.entries[entry["account"]] = entry
+
+    def state(self, construct_id: str) -> Optional[str]:
+        return self.entries.get(construct_id, {}).get("state")
+
+    def record(self, construct_id: str, state: str, **values) -> Dict[str, Any]:
+        """
+        Method to append the new state of an account (keeping its previous
+        values, e.g. the request ID once the account is created).
+        """
+        entry = dict(self.entries.get(construct_id, {}), **values)
+        entry.update(account=construct_id, state=state)
+        with open(self.path, "a") as file:
+            file.write(json.dumps(entry, sort_keys=True) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.entries[construct_id] = entry
+        return entry
+
+
+@dataclass
+class VendingReport:
+    """
+    Result of a vending run (accounts by their construct ID).
+    """
+
+    created: List[str] = field(default_factory=list)
+    moved: List[str] = field(default_factory=list)
+    existing: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    api_calls: Counter = field(default_factory=Counter)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def accounts_per_minute(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return len(self.created) * 60 / self.elapsed_seconds
+
+    def summary(self) -> str:
+        return (
+            "{} created, {} moved, {} existing, {} failed in {:.1f}s "
+            "({} API calls)".format(
+                len(self.created),
+                len(self.moved),
+                len(self.existing),
+                len(self.failed),
+                self.elapsed_seconds,
+                sum(self.api_calls.values()),
+            )
+        )
+
+
+def vendable_accounts(org_spec: OrgSpec) -> List[AccountSpec]:
+    """
+    Function to get the accounts that the stack would create (in the order
+    of the spec), i.e. all of them except the "imported" ones.
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    """
+    return [
+        account_spec for account_spec in org_spec.accounts if not account_spec.imported
+    ]
+
+
+def vended_inventory(org_spec: OrgSpec, journal: VendingJournal) -> Dict[str, Any]:
+    """
+    Function to get the account inventory of the vended accounts (the format
+    of "account_inventory.py"), so the stack adopts them instead of creating.
+    Only the accounts created by the journal are included: "existing" ones
+    were already in the organization, maybe deployed by the stack, and must
+    not be marked for import.
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :param journal: (VendingJournal) journal of the vending runs.
+    """
+    accounts = []
+    for account_spec in org_spec.accounts:
+        entry = journal.entries.get(account_spec.construct_id, {})
+        if entry.get("state") in (CREATED, MOVED):
+            accounts.append(
+                {
+                    "Id": entry["account_id"],
+                    "Name": account_spec.account_name,
+                    "Email": account_spec.email,
+                }
+            )
+    return {"Accounts": accounts}
+
+
+class AccountVendingOrchestrator:
+    """
+    Class to create the accounts of the org spec with the AWS Organizations
+    APIs (the blocking boto3 calls run in a thread pool, driven by asyncio).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        org_spec: OrgSpec,
+        journal: VendingJournal,
+        max_in_progress: int = DEFAULT_MAX_IN_PROGRESS,
+        min_poll_seconds: float = DEFAULT_MIN_POLL_SECONDS,
+        max_poll_seconds: float = DEFAULT_MAX_POLL_SECONDS,
+        base_tags: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """
+        :param client (boto3 client): "organizations" client of the management account.
+        :param org_spec (OrgSpec): Parsed organization spec (the OUs must exist already).
+        :param journal (VendingJournal): Journal to resume from and record the progress.
+        :param max_in_progress (int): Max account creations in progress at the same time.
+        :param min_poll_seconds (float): Interval between status polls while accounts finish.
+        :param max_poll_seconds (float): Max interval between polls after backing off.
+        :param base_tags (Mapping): Tags applied to the whole app (merged with the spec tags).
+        """
+        if max_in_progress < 1:
+            raise ValueError("max_in_progress must be at least 1")
+        self.client = client
+        self.org_spec = org_spec
+        self.journal = journal
+        self.max_in_progress = max_in_progress
+        self.min_poll_seconds = min_poll_seconds
+        self.max_poll_seconds = max_poll_seconds
+        self.base_tags = dict(base_tags or {})
+        self.org_tags = resolve_org_tags(org_spec, base_tags)
+
+    def vend(self) -> VendingReport:
+        """
+        Method to vend all the accounts of the spec (blocks until all of them
+        are moved into their OU or failed).
+        """
+        return asyncio.run(self.vend_async())
+
+    async def vend_async(self) -> VendingReport:
+        """
+        Coroutine version of "vend".
+        """
+        start = time.perf_counter()
+        self._report = VendingReport()
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._recent_requests: Optional[asyncio.Task] = None
+        self._slots = asyncio.Semaphore(self.max_in_progress)
+        # One thread per creation in progress, plus the poller
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_progress + 1)
+        try:
+            snapshot = parse_org_snapshot(
+                await self._run("ExportOrgSnapshot", export_org_snapshot, self.client)
+            )
+            self._snapshot = snapshot
+            self._ou_ids = self._resolve_ou_ids(snapshot)
+            await asyncio.gather(
+                *[
+                    self._vend_account(account_spec)
+                    for account_spec in vendable_accounts(self.org_spec)
+                ]
+            )
+        finally:
+            if self._poller:
+                self._poller.cancel()
+            self._executor.shutdown(wait=False)
+        self._report.elapsed_seconds = time.perf_counter() - start
+        return self._report
+
+    def _resolve_ou_ids(self, snapshot: OrgSnapshot) -> Dict[str, str]:
+        """
+        Method to map the OU paths of the spec to the IDs of the live OUs.
+        """
+        ou_ids = {"": snapshot.root_id}
+        missing = []
+        for ou_spec in self.org_spec.organizational_units:
+            parent_id = ou_ids.get(ou_spec.parent_path)
+            ou = snapshot.children.get((parent_id, ou_spec.name))
+            if ou:
+                ou_ids[ou_spec.path] = ou.ou_id
+            else:
+                missing.append(ou_spec.path)
+        if missing:
+            raise ValueError(
+                "Missing OUs in the organization (deploy them first): {}".format(
+                    ", ".join(missing)
+                )
+            )
+        return ou_ids
+
+    async def _vend_account(self, account_spec: AccountSpec) -> None:
+        construct_id = account_spec.construct_id
+        state = self.journal.state(construct_id)
+        if state in (MOVED, EXISTING):
+            self._report.existing.append(construct_id)
+            return
+
+        if state in (None, FAILED, REQUESTING, REQUESTED):
+            async with self._slots:
+                if state != REQUESTED:
+                    state = await self._request_account(account_spec)
+                if state == REQUESTED:
+                    state = await self._wait_for_account(account_spec)
+            if state in (EXISTING, FAILED):
+                return
+
+        entry = self.journal.entries[construct_id]
+        destination_id = self._ou_ids[account_spec.ou_path]
+        source_id = self._snapshot.root_id
+        account = self._snapshot.accounts.get(entry["account_id"])
+        if account:
+            # Created in a previous run, and maybe moved before an interruption
+            source_id = account.parent_id
+        if source_id != destination_id:
+            try:
+                await self._call(
+                    "move_account",
+                    AccountId=entry["account_id"],
+                    SourceParentId=source_id,
+                    DestinationParentId=destination_id,
+                )
+            except Exception as error:
+                if not _error_code(error):
+                    raise
+                # Still "created" in the journal, so the next run moves it
+                self._report.failed[construct_id] = _error_code(error)
+                return
+        self.journal.record(construct_id, MOVED, parent_id=destination_id)
+        self._report.moved.append(construct_id)
+
+    async def _request_account(self, account_spec: AccountSpec) -> str:
+        construct_id = account_spec.construct_id
+        account = self._snapshot.accounts_by_email.get(account_spec.email.lower())
+        if self.journal.state(construct_id) == REQUESTING:
+            # Interrupted after sending the request, but maybe before AWS got it
+            state = await self._adopt_request(account_spec, account)
+            if state:
+                return state
+        elif account:
+            # Not created by the vending, so it is left in its current OU
+            self.journal.record(construct_id, EXISTING, account_id=account.account_id)
+            self._report.existing.append(construct_id)
+            return EXISTING
+
+        tags = {**self.base_tags, **self.org_tags.accounts[construct_id]}
+        self.journal.record(construct_id, REQUESTING, requested_at=time.time())
+        try:
+            response = await self._call(
+                "create_account",
+                Email=account_spec.email,
+                AccountName=account_spec.account_name,
+                RoleName=account_spec.role_name,
+                IamUserAccessToBilling="ALLOW",
+                Tags=[{"Key": key, "Value": value} for key, value in tags.items()],
+            )
+        except Exception as error:
+            if not _error_code(error):
+                raise
+            # Rejected request (e.g. quota): the next run retries it
+            self.journal.record(construct_id, FAILED, reason=_error_code(error))
+            self._report.failed[construct_id] = _error_code(error)
+            return FAILED
+        self.journal.record(
+            construct_id,
+            REQUESTED,
+            request_id=response["CreateAccountStatus"]["Id"],
+        )
+        return REQUESTED
+
+    async def _adopt_request(
+        self, account_spec: AccountSpec, account: Any
+    ) -> Optional[str]:
+        """
+        Coroutine to adopt the request of an account journaled as "requesting"
+        (sent by an interrupted run): its account if it already exists (found
+        by email), or else its "IN_PROGRESS" or "SUCCEEDED" request. Request
+        statuses have no email, so they are matched by the account name and
+        the time of the request, and a succeeded one by the email of its
+        account. Returns None when the request never reached AWS.
+        """
+        construct_id = account_spec.construct_id
+        if account:
+            # Created by this journal, so it is still moved into its OU
+            self.journal.record(construct_id, CREATED, account_id=account.account_id)
+            self._report.created.append(construct_id)
+            return CREATED
+
+        if not self._recent_requests:
+            self._recent_requests = asyncio.ensure_future(self._list_recent_requests())
+        requested_at = self.journal.entries[construct_id].get("requested_at", 0)
+        for status in await self._recent_requests:
+            if status["AccountName"] != account_spec.account_name or (
+                status["RequestedTimestamp"].timestamp()
+                < requested_at - REQUEST_CLOCK_SKEW_SECONDS
+            ):
+                continue
+            if status["State"] == "SUCCEEDED":
+                response = await self._call(
+                    "describe_account", AccountId=status["AccountId"]
+                )
+                if response["Account"]["Email"].lower() != account_spec.email.lower():
+                    continue
+            self.journal.record(construct_id, REQUESTED, request_id=status["Id"])
+            return REQUESTED
+        return None
+
+    async def _list_recent_requests(self) -> List[Dict[str, Any]]:
+        """
+        Coroutine to list the account creation requests in progress or
+        succeeded (listed once per run, only when a request is adopted).
+        """
+        statuses = []
+        kwargs: Dict[str, Any] = {"States": ["IN_PROGRESS", "SUCCEEDED"]}
+        while True:
+            response = await self._call("list_create_account_status", **kwargs)
+            statuses.extend(response["CreateAccountStatuses"])
+            if not response.get("NextToken"):
+                return statuses
+            kwargs["NextToken"] = response["NextToken"]
+
+    async def _wait_for_account(self, account_spec: AccountSpec) -> str:
+        construct_id = account_spec.construct_id
+        request_id = self.journal.entries[construct_id]["request_id"]
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[request_id] = future
+        if not self._poller or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_statuses())
+        status = await future
+
+        if status["State"] == "FAILED":
+            reason = status.get("FailureReason", "UNKNOWN")
+            self.journal.record(construct_id, FAILED, reason=reason)
+            self._report.failed[construct_id] = reason
+            return FAILED
+        self.journal.record(construct_id, CREATED, account_id=status["AccountId"])
+        self._report.created.append(construct_id)
+        return CREATED
+
+    async def _poll_statuses(self) -> None:
+        """
+        Coroutine that polls the status of all the requests in progress with
+        one listing per round, and only describes the requests that left the
+        "IN_PROGRESS" state. The interval doubles while nothing finishes.
+        """
+        try:
+            await self._poll_rounds()
+        except Exception as error:
+            # The accounts waiting for their status fail instead of hanging
+            for future in self._waiters.values():
+                future.set_exception(error)
+            self._waiters.clear()
+
+    async def _poll_rounds(self) -> None:
+        interval = self.min_poll_seconds
+        while self._waiters:
+            await asyncio.sleep(interval)
+            in_progress = set()
+            kwargs: Dict[str, Any] = {"States": ["IN_PROGRESS"]}
+            while True:
+                response = await self._call("list_create_account_status", **kwargs)
+                in_progress.update(
+                    status["Id"] for status in response["CreateAccountStatuses"]
+                )
+                if not response.get("NextToken"):
+                    break
+                kwargs["NextToken"] = response["NextToken"]
+
+            finished = [
+                request_id
+                for request_id in self._waiters
+                if request_id not in in_progress
+            ]
+            statuses = await asyncio.gather(
+                *[
+                    self._call(
+                        "describe_create_account_status",
+                        CreateAccountRequestId=request_id,
+                    )
+                    for request_id in finished
+                ]
+            )
+            resolved = 0
+            for request_id, response in zip(finished, statuses):
+                status = response["CreateAccountStatus"]
+                if status["State"] != "IN_PROGRESS":
+                    self._waiters.pop(request_id).set_result(status)
+                    resolved += 1
+            if resolved:
+                interval = self.min_poll_seconds
+            else:
+                interval = min(interval * POLL_BACKOFF_FACTOR, self.max_poll_seconds)
+
+    async def _call(self, operation: str, **kwargs) -> Dict[str, Any]:
+        """
+        Coroutine to call an AWS Organizations API, retrying when throttled.
+        """
+        method = getattr(self.client, operation)
+        for attempt in range(MAX_THROTTLING_RETRIES + 1):
+            try:
+                return await self._run(operation, method, **kwargs)
+            except Exception as error:
+                if _error_code(error) not in THROTTLING_ERROR_CODES or (
+                    attempt == MAX_THROTTLING_RETRIES
+                ):
+                    raise
+            await asyncio.sleep(THROTTLING_BASE_SECONDS * 2**attempt)
+
+    async def _run(self, name: str, function, *args, **kwargs) -> Any:
+        self._report.api_calls[name] += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(function, *args, **kwargs)
+        )
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    """
+    Function to get the error code of a botocore "ClientError" (None for any
+    other error), without importing botocore.
+    """
+    response = getattr(error, "response", None)
+    if not isinstance(response, dict):
+        return None
+    return response.get("Error", {}).get("Code")
@@ -1,22 +1,41 @@
+from typing import Dict
+
 import aws_cdk as cdk
+from constructs import Construct
+
+from helpers.org_tags import app_tags
+
+
+def get_app_tags(
+    app: Construct, main_resources_name: str, deployment_environment: str
+) -> Dict[str, str]:
+    """
+    Function to get the custom tags applied to the whole app.
+
+    :param app: (aws_cdk.App) to read the tags of the CDK context from.
+    :param main_resources_name: (str) the main solution name being deployed.
+    :param deployment_environment: (str) value of the tag "environment".
+    """
+    return app_tags(
+        main_resources_name,
+        deployment_environment,
+        app.node.try_get_context("tags"),
+    )
 
 
 def add_tags_to_app(
-    app: cdk.App, main_resources_name: str, deployment_environment: str
+    app: Construct, main_resources_name: str, deployment_environment: str
 ) -> None:
     """
     Function to add custom tags to app in a centralized fashion.
 
-    :param app: (aws_cdk.App) to apply tags to.
+    :param app: (aws_cdk.App) to apply tags to (or a Stage of the app).
     :param main_resources_name: (str) the main solution name being deployed.
     :param deployment_environment: (str) value of the tag "environment".
     """
 
     app_tags = cdk.Tags.of(app)
-    app_tags.add("MainResourcesName", main_resources_name)
-    app_tags.add("Environment", deployment_environment)
-
-    # Add tags from CDK context
-    context_tags = app.node.try_get_context("tags")
-    for key in context_tags:
-        app_tags.add(key, context_tags[key])
+    for key, value in get_app_tags(
+        app, main_resources_name, deployment_environment
+    ).items():
+        app_tags.add(key, value)
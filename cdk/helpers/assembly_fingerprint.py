@@ -0,0 +1,200 @@
+################################################################################
+# CLOUD ASSEMBLY FINGERPRINTS (DEPLOY SHORT-CIRCUIT OF UNCHANGED STACKS)
+# Each stack of "cdk.out" gets a content hash of what CloudFormation would
+# deploy: its template (and nested stack templates), environment and stack
+# properties. The templates are normalized first, so the noise of a synth is
+# ignored: key order and formatting, "DependsOn" order, the metadata keys of the
+# CDK ("aws:cdk:*" such as the construct path, and "aws:asset:*" asset paths)
+# and the "CDKMetadata" resource (versions). Other resource metadata (e.g.
+# "AWS::CloudFormation::Init") is deployed, so it is kept.
+# Comparing the fingerprints with the ones of the last deployment tells which
+# stacks really changed, so the others skip the changeset round-trip.
+# --> Written to "cdk.out/fingerprints.json" on every synth
+# --> python cdk/deploy_check.py compare / record (see ".github/workflows")
+################################################################################
+
+# Built-in imports
+import os
+import re
+import json
+import hashlib
+from typing import Any, Dict, List, Mapping
+
+# Own imports
+from helpers.cloud_assembly import nested_template_assets
+
+FINGERPRINT_FORMAT_VERSION = 1
+
+FINGERPRINT_FILE_NAME = "fingerprints.json"
+
+NOISE_RESOURCE_TYPES = ("AWS::CDK::Metadata",)
+
+NOISE_CONDITIONS = ("CDKMetadataAvailable",)
+
+NOISE_METADATA_PREFIXES = ("aws:cdk:", "aws:asset:")
+
+# Stack properties of the assembly manifest that change the deployment
+STACK_PROPERTIES = (
+    "stackName",
+    "tags",
+    "terminationProtection",
+    "parameters",
+    "notificationArns",
+)
+
+_ASSET_HASH = re.compile(r"[0-9a-f]{64}")
+
+
+def normalize_template(template: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Function to drop the synth noise of a template (CDK metadata keys of the
+    resources, "CDKMetadata" resource/condition) and sort its "DependsOn" lists.
+
+    :param template: (dict) the CloudFormation template.
+    :return: (dict) a normalized copy of the template.
+    """
+    normalized = dict(template)
+    resources = {}
+    for logical_id, resource in template.get("Resources", {}).items():
+        if resource.get("Type") in NOISE_RESOURCE_TYPES:
+            continue
+        resource = dict(resource)
+        metadata = {
+            key: value
+            for key, value in resource.pop("Metadata", {}).items()
+            if not key.startswith(NOISE_METADATA_PREFIXES)
+        }
+        if metadata:
+            resource["Metadata"] = metadata
+        if isinstance(resource.get("DependsOn"), list):
+            resource["DependsOn"] = sorted(resource["DependsOn"])
+        resources[logical_id] = resource
+    normalized["Resources"] = resources
+    conditions = {
+        name: condition
+        for name, condition in template.get("Conditions", {}).items()
+        if name not in NOISE_CONDITIONS
+    }
+    normalized.pop("Conditions", None)
+    if conditions:
+        normalized["Conditions"] = conditions
+    return normalized
+
+
+def fingerprint_assembly(directory: str) -> Dict[str, str]:
+    """
+    Function to get the fingerprint of each stack of a cloud assembly (and of
+    its nested assemblies of the stages), by the name that selects the stack
+    in the CDK CLI (e.g. "prod/org-stack" for the stacks of a stage).
+
+    :param directory: (str) cloud assembly directory (usually "cdk.out").
+    :return: (dict) stack name -> fingerprint (SHA-256).
+    """
+    with open(os.path.join(directory, "manifest.json"), "r") as file:
+        manifest = json.load(file)
+    artifacts = manifest.get("artifacts", {})
+
+    # Nested stack templates are file assets, referenced by their source hash
+    template_assets = nested_template_assets(directory)
+
+    nested_fingerprints: Dict[str, str] = {}
+
+    def template_fingerprint(file_name: str, extra: Mapping[str, Any]) -> str:
+        with open(os.path.join(directory, file_name), "r") as file:
+            content = json.dumps(
+                {"template": normalize_template(json.load(file)), **extra},
+                sort_keys=True,
+                separators=(",", ":"),
+            )
+        # The hash of a nested template changes with its metadata, so it is
+        # replaced by the fingerprint of its normalized content
+        content = _ASSET_HASH.sub(
+            lambda match: nested_fingerprint(match.group(0)), content
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def nested_fingerprint(asset_hash: str) -> str:
+        if asset_hash not in template_assets:
+            return asset_hash
+        if asset_hash not in nested_fingerprints:
+            nested_fingerprints[asset_hash] = template_fingerprint(
+                template_assets[asset_hash], {}
+            )
+        return nested_fingerprints[asset_hash]
+
+    fingerprints = {}
+    for artifact_id, artifact in artifacts.items():
+        properties = artifact.get("properties", {})
+        if artifact["type"] == "aws:cloudformation:stack":
+            fingerprints[
+                artifact.get("displayName", artifact_id)
+            ] = template_fingerprint(
+                properties["templateFile"],
+                {
+                    "environment": artifact.get("environment"),
+                    "properties": {
+                        key: properties[key]
+                        for key in STACK_PROPERTIES
+                        if key in properties
+                    },
+                },
+            )
+        elif artifact["type"] == "cdk:cloud-assembly":
+            fingerprints.update(
+                fingerprint_assembly(
+                    os.path.join(directory, properties["directoryName"])
+                )
+            )
+    return fingerprints
+
+
+def write_assembly_fingerprints(directory: str) -> Dict[str, str]:
+    """
+    Function to write the fingerprints of the stacks of a cloud assembly to
+    "fingerprints.json" in the assembly directory.
+
+    :param directory: (str) cloud assembly directory (usually "cdk.out").
+    :return: (dict) stack name -> fingerprint.
+    """
+    fingerprints = fingerprint_assembly(directory)
+    with open(os.path.join(directory, FINGERPRINT_FILE_NAME), "w") as file:
+        json.dump(
+            {"version": FINGERPRINT_FORMAT_VERSION, "stacks": fingerprints},
+            file,
+            indent=2,
+        )
+        file.write("\n")
+    return fingerprints
+
+
+def load_fingerprints(path: str) -> Dict[str, str]:
+    """
+    Function to load a fingerprints file (missing files, or files of another
+    format version, have no fingerprints, so every stack is deployed).
+
+    :param path: (str) path to the fingerprints JSON file.
+    """
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r") as file:
+        document = json.load(file)
+    if document.get("version") != FINGERPRINT_FORMAT_VERSION:
+        return {}
+    return document.get("stacks", {})
+
+
+def changed_stacks(
+    fingerprints: Mapping[str, str], deployed: Mapping[str, str]
+) -> List[str]:
+    """
+    Function to get the stacks whose fingerprint differs from the deployed one
+    (in the order of the assembly).
+
+    :param fingerprints: (Mapping) fingerprints of the synthesized stacks.
+    :param deployed: (Mapping) fingerprints of the last deployment.
+    """
+    return [
+        stack_id
+        for stack_id, fingerprint in fingerprints.items()
+        if deployed.get(stack_id) != fingerprint
+    ]
@@ -0,0 +1,66 @@
+################################################################################
+# CLOUD ASSEMBLY FILES (SHARED BY THE POST-SYNTH TOOLS)
+# Nested stack templates are not artifacts of the assembly manifest: they are
+# file assets of the asset manifests, referenced from the parent template by
+# their source hash (in the S3 object key of "TemplateURL"). The deploy
+# estimator and the assembly fingerprints resolve them the same way here.
+################################################################################
+
+# Built-in imports
+import os
+import re
+import json
+from typing import Any, Dict, List, Optional
+
+NESTED_TEMPLATE_SUFFIX = ".template.json"
+
+_ASSET_OBJECT_KEY = re.compile(r"([0-9a-f]{64})\.json$")
+
+
+def nested_template_assets(directory: str) -> Dict[str, str]:
+    """
+    Function to get the nested stack templates of a cloud assembly (file
+    assets with a template as source), by their asset hash.
+
+    :param directory: (str) cloud assembly directory (usually "cdk.out").
+    :return: (dict) asset hash -> template file (relative to the directory).
+    """
+    with open(os.path.join(directory, "manifest.json"), "r") as file:
+        artifacts = json.load(file).get("artifacts", {})
+    template_assets: Dict[str, str] = {}
+    for artifact in artifacts.values():
+        if artifact["type"] != "cdk:asset-manifest":
+            continue
+        with open(os.path.join(directory, artifact["properties"]["file"]), "r") as file:
+            for asset_hash, asset in json.load(file).get("files", {}).items():
+                path = asset["source"].get("path", "")
+                if path.endswith(NESTED_TEMPLATE_SUFFIX):
+                    template_assets[asset_hash] = path
+    return template_assets
+
+
+def nested_template_file(
+    resource: Dict[str, Any], asset_paths: Dict[str, str]
+) -> Optional[str]:
+    """
+    Function to get the template file of a nested stack resource.
+
+    :param resource: (dict) the "AWS::CloudFormation::Stack" resource.
+    :param asset_paths: (dict) the result of "nested_template_assets".
+    :return: (str) template file (relative to the assembly directory) or None.
+    """
+    asset_path = resource.get("Metadata", {}).get("aws:asset:path")
+    if asset_path:
+        return asset_path
+    strings: List[Any] = [resource.get("Properties", {}).get("TemplateURL")]
+    while strings:
+        value = strings.pop()
+        if isinstance(value, dict):
+            strings.extend(value.values())
+        elif isinstance(value, list):
+            strings.extend(value)
+        elif isinstance(value, str):
+            match = _ASSET_OBJECT_KEY.search(value)
+            if match and match.group(1) in asset_paths:
+                return asset_paths[match.group(1)]
+    return None
@@ -0,0 +1,152 @@
+################################################################################
+# DEPENDENCY GRAPH (PURE PYTHON, NO CDK/JSII CALLS)
+# Small DAG helper used to plan the order in which AWS Organizations resources
+# are created (cycle detection, topological order and critical path).
+################################################################################
+
+# Built-in imports
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class DependencyGraph:
+    """
+    Class that represents a directed graph where each node lists the nodes it
+    depends on (which must be created before it). Insertion order is kept, so
+    every result is deterministic.
+    """
+
+    def __init__(self) -> None:
+        self._dependencies: Dict[str, List[str]] = {}
+
+    def add_node(self, node: str) -> None:
+        """
+        Method to add a node without dependencies (no-op if it already exists).
+        """
+        self._dependencies.setdefault(node, [])
+
+    def add_dependency(self, node: str, dependency: str) -> None:
+        """
+        Method to declare that "node" can only be created after "dependency".
+        """
+        self.add_node(dependency)
+        dependencies = self._dependencies.setdefault(node, [])
+        if dependency not in dependencies:
+            dependencies.append(dependency)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._dependencies)
+
+    def dependencies(self, node: str) -> List[str]:
+        return list(self._dependencies.get(node, ()))
+
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (node, dependency) tuples.
+        """
+        for node, dependencies in self._dependencies.items():
+            for dependency in dependencies:
+                yield node, dependency
+
+    def topological_order(self) -> List[str]:
+        """
+        Method that returns the nodes sorted so that every dependency comes
+        before its dependents (Kahn's algorithm, O(V + E)).
+
+        :raises ValueError: if the graph has a cycle.
+        """
+        pending = {node: len(deps) for node, deps in self._dependencies.items()}
+        dependents: Dict[str, List[str]] = {node: [] for node in self._dependencies}
+        for node, dependency in self.edges():
+            dependents[dependency].append(node)
+
+        queue = deque(node for node, count in pending.items() if count == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for dependent in dependents[node]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    queue.append(dependent)
+
+        if len(order) != len(pending):
+            cyclic = [node for node, count in pending.items() if count > 0]
+            raise ValueError(
+                "Dependency cycle detected between: {}".format(", ".join(cyclic))
+            )
+        return order
+
+    def critical_path(
+        self,
+        durations: Optional[Dict[str, float]] = None,
+        default_duration: float = 1.0,
+    ) -> Tuple[float, List[str]]:
+        """
+        Method that computes the longest (critical) path of the graph.
+
+        :param durations: (dict) optional duration of each node.
+        :param default_duration: (float) duration of nodes missing in "durations".
+        :return: (tuple) total duration of the critical path and its nodes.
+        """
+        durations = durations or {}
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for node in self.topological_order():
+            start, previous[node] = 0.0, None
+            for dependency in self._dependencies[node]:
+                if finish[dependency] > start:
+                    start, previous[node] = finish[dependency], dependency
+            finish[node] = start + durations.get(node, default_duration)
+
+        if not finish:
+            return 0.0, []
+
+        node = max(finish, key=finish.get)
+        length = finish[node]
+        path = []
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        return length, path[::-1]
+
+    def schedule(
+        self,
+        durations: Optional[Dict[str, float]] = None,
+        default_duration: float = 1.0,
+    ) -> Dict[str, Tuple[float, float, float]]:
+        """
+        Method that computes when each node runs if everything starts as soon
+        as its dependencies finish (forward pass), and how much it could be
+        delayed without delaying the whole graph (backward pass).
+
+        :param durations: (dict) optional duration of each node.
+        :param default_duration: (float) duration of nodes missing in "durations".
+        :return: (dict) node -> (earliest start, earliest finish, slack). The
+            nodes with no slack are the ones on a critical path.
+        """
+        durations = durations or {}
+        order = self.topological_order()
+        duration = {node: durations.get(node, default_duration) for node in order}
+        start: Dict[str, float] = {}
+        for node in order:
+            start[node] = max(
+                (start[dep] + duration[dep] for dep in self._dependencies[node]),
+                default=0.0,
+            )
+        total = max((start[node] + duration[node] for node in order), default=0.0)
+
+        latest_finish = {node: total for node in order}
+        for node in reversed(order):
+            latest_start = latest_finish[node] - duration[node]
+            for dependency in self._dependencies[node]:
+                latest_finish[dependency] = min(latest_finish[dependency], latest_start)
+        return {
+            node: (
+                start[node],
+                start[node] + duration[node],
+                latest_finish[node] - duration[node] - start[node],
+            )
+            for node in order
+        }
@@ -0,0 +1,433 @@
+################################################################################
+# DEPLOY-TIME ESTIMATOR (CRITICAL PATH OF THE SYNTHESIZED RESOURCES GRAPH)
+# CloudFormation creates each resource as soon as the resources it depends on
+# ("DependsOn", "Ref", "Fn::GetAtt" and "Fn::Sub") are created. The estimator
+# rebuilds that graph from the templates of the cloud assembly, so it includes
+# the account chains of "add_cdk_accounts_dependencies", the OU parent links and
+# the "DependencyChain" of cdk-organizations. With per-resource-type durations,
+# it computes the critical path, the total wall time and what runs in parallel.
+# Nested stacks take the estimate of their own template, and the stacks of the
+# assembly are deployed in the order of their dependencies.
+# --> Enable with the "deploy_estimate" CDK context value (JSON/DOT in cdk.out)
+# --> Override durations with the "deploy_durations" CDK context value (seconds
+#     by resource type or logical ID)
+################################################################################
+
+# Built-in imports
+import os
+import re
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# Own imports
+from helpers.cloud_assembly import nested_template_assets, nested_template_file
+from helpers.dependency_graph import DependencyGraph
+
+
+# Typical durations (seconds) of the resources of the org stacks. Account
+# creations dominate: AWS Organizations creates them asynchronously.
+DEFAULT_DURATIONS = {
+    "AWS::CloudFormation::Stack": 30,
+    "AWS::IAM::Policy": 20,
+    "AWS::IAM::Role": 20,
+    "AWS::Lambda::Function": 30,
+    "AWS::SSM::Parameter": 5,
+    "Custom::Organizations_Account": 240,
+    "Custom::Organizations_EnableAwsServiceAccess": 15,
+    "Custom::Organizations_EnablePolicyType": 15,
+    "Custom::Organizations_Organization": 30,
+    "Custom::Organizations_OrganizationalUnitProvider": 15,
+    "Custom::Organizations_Policy": 10,
+    "Custom::Organizations_PolicyAttachment": 10,
+    "Custom::Organizations_Root": 10,
+    "Custom::Organizations_TagResource": 10,
+}
+
+DEFAULT_RESOURCE_DURATION = 10
+
+# Changeset creation and execution of each (non nested) stack
+STACK_OVERHEAD = 30
+
+ESTIMATE_FILE_NAME = "deploy-estimate"
+
+NESTED_STACK_TYPE = "AWS::CloudFormation::Stack"
+
+_SUB_REFERENCE = re.compile(r"\$\{([A-Za-z0-9]+)(?:\.[^}]*)?\}")
+
+# Floating point tolerance to tell if a resource has no slack
+_EPSILON = 1e-6
+
+
+@dataclass(frozen=True)
+class ResourceEstimate:
+    """
+    Estimated deployment of a resource (seconds from the start of its stack).
+    """
+
+    logical_id: str
+    resource_type: str
+    duration: float
+    start: float
+    finish: float
+    slack: float
+
+    @property
+    def critical(self) -> bool:
+        return self.slack < _EPSILON
+
+
+@dataclass
+class StackEstimate:
+    """
+    Estimated deployment of a stack template (nested stacks are separate).
+    """
+
+    name: str
+    template_file: str
+    total_seconds: float
+    resources: Dict[str, ResourceEstimate]
+    dependencies: List[Tuple[str, str]]
+    critical_path: List[str]
+    nested_stacks: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def max_parallelism(self) -> int:
+        """
+        Max number of resources of the template being deployed at once.
+        """
+        events = sorted(
+            [(resource.start, 1) for resource in self.resources.values()]
+            + [(resource.finish, -1) for resource in self.resources.values()]
+        )
+        running = peak = 0
+        for _, change in events:
+            running += change
+            peak = max(peak, running)
+        return peak
+
+    def parallel_waves(self) -> List[List[str]]:
+        """
+        Method to group the resources that start at the same time.
+        """
+        waves: Dict[float, List[str]] = {}
+        for resource in self.resources.values():
+            waves.setdefault(round(resource.start, 3), []).append(resource.logical_id)
+        return [waves[start] for start in sorted(waves)]
+
+
+@dataclass
+class DeployEstimate:
+    """
+    Estimated deployment of the stacks of a cloud assembly.
+    """
+
+    total_seconds: float
+    stacks: Dict[str, StackEstimate]
+    stack_schedule: Dict[str, Tuple[float, float, float]]
+    critical_stacks: List[str]
+
+    def critical_path(self) -> List[str]:
+        """
+        Method to get the critical path ("stack/logical ID"), with the critical
+        path of the nested stacks expanded in place.
+        """
+
+        def expand(stack: StackEstimate) -> Iterator[str]:
+            for logical_id in stack.critical_path:
+                yield "{}/{}".format(stack.name, logical_id)
+                if logical_id in stack.nested_stacks:
+                    yield from expand(self.stacks[stack.nested_stacks[logical_id]])
+
+        return [
+            entry
+            for name in self.critical_stacks
+            for entry in expand(self.stacks[name])
+        ]
+
+    def summary(self) -> str:
+        resources = sum(len(stack.resources) for stack in self.stacks.values())
+        return "{} for {} resources in {} templates ({} on the critical path)".format(
+            format_duration(self.total_seconds),
+            resources,
+            len(self.stacks),
+            len(self.critical_path()),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": self.total_seconds,
+            "critical_path": self.critical_path(),
+            "stacks": {
+                name: {
+                    "start": self.stack_schedule[name][0],
+                    "finish": self.stack_schedule[name][1],
+                    "slack": self.stack_schedule[name][2],
+                }
+                for name in self.stack_schedule
+            },
+            "templates": {
+                stack.name: {
+                    "template_file": stack.template_file,
+                    "total_seconds": stack.total_seconds,
+                    "max_parallelism": stack.max_parallelism,
+                    "critical_path": stack.critical_path,
+                    "parallel_waves": stack.parallel_waves(),
+                    "resources": {
+                        resource.logical_id: {
+                            "type": resource.resource_type,
+                            "duration": resource.duration,
+                            "start": resource.start,
+                            "finish": resource.finish,
+                            "slack": resource.slack,
+                        }
+                        for resource in stack.resources.values()
+                    },
+                }
+                for stack in self.stacks.values()
+            },
+        }
+
+    def to_dot(self) -> str:
+        """
+        Method to export the resources graph in Graphviz DOT format (one
+        cluster per template, critical path in red).
+        """
+        lines = ["digraph deploy {", "  rankdir=LR;", "  node [shape=box];"]
+        for index, stack in enumerate(self.stacks.values()):
+            lines.append("  subgraph cluster_{} {{".format(index))
+            lines.append(
+                "    label={};".format(
+                    json.dumps(
+                        "{} ({})".format(
+                            stack.name, format_duration(stack.total_seconds)
+                        )
+                    )
+                )
+            )
+            critical = set(stack.critical_path)
+            for resource in stack.resources.values():
+                lines.append(
+                    "    {} [label={}{}];".format(
+                        json.dumps("{}/{}".format(stack.name, resource.logical_id)),
+                        json.dumps(
+                            "{}\n{}\n{:g}s".format(
+                                resource.logical_id,
+                                resource.resource_type,
+                                resource.duration,
+                            )
+                        ),
+                        ", color=red" if resource.logical_id in critical else "",
+                    )
+                )
+            lines.append("  }")
+            for node, dependency in stack.dependencies:
+                lines.append(
+                    "  {} -> {}{};".format(
+                        json.dumps("{}/{}".format(stack.name, dependency)),
+                        json.dumps("{}/{}".format(stack.name, node)),
+                        (
+                            " [color=red]"
+                            if node in critical and dependency in critical
+                            else ""
+                        ),
+                    )
+                )
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return "{}h {:02d}m {:02d}s".format(hours, minutes, seconds)
+    return "{}m {:02d}s".format(minutes, seconds)
+
+
+def template_dependencies(template: Dict[str, Any]) -> DependencyGraph:
+    """
+    Function to build the dependency graph of the resources of a template.
+
+    :param template: (dict) the CloudFormation template.
+    :return: (DependencyGraph) logical ID -> logical IDs it depends on.
+    """
+    resources = template.get("Resources", {})
+    graph = DependencyGraph()
+    for logical_id, resource in resources.items():
+        graph.add_node(logical_id)
+        depends_on = resource.get("DependsOn", [])
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        references = set(depends_on)
+        _collect_references(resource.get("Properties", {}), references)
+        for dependency in sorted(references):
+            if dependency in resources and dependency != logical_id:
+                graph.add_dependency(logical_id, dependency)
+    return graph
+
+
+def _collect_references(value: Any, references: Set[str]) -> None:
+    # Iterative walk, templates of thousands of accounts are deeply nested
+    pending = [value]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key == "Ref" and isinstance(item, str):
+                    references.add(item)
+                elif key == "Fn::GetAtt":
+                    target = item[0] if isinstance(item, list) else item
+                    if isinstance(target, str):
+                        references.add(target.split(".", 1)[0])
+                elif key == "Fn::Sub":
+                    template = item[0] if isinstance(item, list) else item
+                    if isinstance(template, str):
+                        references.update(_SUB_REFERENCE.findall(template))
+                    if isinstance(item, list):
+                        pending.extend(item[1:])
+                else:
+                    pending.append(item)
+        elif isinstance(value, list):
+            pending.extend(value)
+
+
+def estimate_assembly(
+    directory: str, durations: Optional[Dict[str, float]] = None
+) -> DeployEstimate:
+    """
+    Function to estimate the deployment of the stacks of a cloud assembly.
+
+    :param directory: (str) cloud assembly directory (usually "cdk.out").
+    :param durations: (dict) seconds by resource type or logical ID (merged
+        with DEFAULT_DURATIONS, logical IDs take precedence).
+    :return: (DeployEstimate) the estimate of every stack and template.
+    """
+    durations = {**DEFAULT_DURATIONS, **(durations or {})}
+    with open(os.path.join(directory, "manifest.json"), "r") as file:
+        artifacts = json.load(file).get("artifacts", {})
+
+    # Nested stack templates are file assets, referenced by their hash
+    asset_paths = nested_template_assets(directory)
+
+    stacks: Dict[str, StackEstimate] = {}
+    stack_graph = DependencyGraph()
+    stack_durations = {}
+    for artifact_id, artifact in artifacts.items():
+        if artifact["type"] != "aws:cloudformation:stack":
+            continue
+        stack = _estimate_template(
+            directory,
+            artifact_id,
+            artifact["properties"]["templateFile"],
+            durations,
+            asset_paths,
+            stacks,
+        )
+        stack_durations[artifact_id] = stack.total_seconds + STACK_OVERHEAD
+        stack_graph.add_node(artifact_id)
+        for dependency in artifact.get("dependencies", ()):
+            if artifacts.get(dependency, {}).get("type") == "aws:cloudformation:stack":
+                stack_graph.add_dependency(artifact_id, dependency)
+
+    stack_schedule = stack_graph.schedule(stack_durations)
+    total_seconds, critical_stacks = stack_graph.critical_path(stack_durations)
+    return DeployEstimate(
+        total_seconds=total_seconds,
+        stacks=stacks,
+        stack_schedule=stack_schedule,
+        critical_stacks=critical_stacks,
+    )
+
+
+def _estimate_template(
+    directory: str,
+    name: str,
+    template_file: str,
+    durations: Dict[str, float],
+    asset_paths: Dict[str, str],
+    stacks: Dict[str, StackEstimate],
+) -> StackEstimate:
+    with open(os.path.join(directory, template_file), "r") as file:
+        template = json.load(file)
+    resources = template.get("Resources", {})
+
+    resource_durations: Dict[str, float] = {}
+    nested_stacks: Dict[str, str] = {}
+    for logical_id, resource in resources.items():
+        duration = durations.get(
+            logical_id,
+            durations.get(resource["Type"], DEFAULT_RESOURCE_DURATION),
+        )
+        nested_file = (
+            nested_template_file(resource, asset_paths)
+            if resource["Type"] == NESTED_STACK_TYPE
+            else None
+        )
+        if nested_file:
+            nested_name = "{}/{}".format(name, logical_id)
+            nested = _estimate_template(
+                directory, nested_name, nested_file, durations, asset_paths, stacks
+            )
+            nested_stacks[logical_id] = nested_name
+            duration += nested.total_seconds
+        resource_durations[logical_id] = duration
+
+    graph = template_dependencies(template)
+    schedule = graph.schedule(resource_durations)
+    total_seconds, critical_path = graph.critical_path(resource_durations)
+    stacks[name] = StackEstimate(
+        name=name,
+        template_file=template_file,
+        total_seconds=total_seconds,
+        resources={
+            logical_id: ResourceEstimate(
+                logical_id=logical_id,
+                resource_type=resources[logical_id]["Type"],
+                duration=resource_durations[logical_id],
+                start=start,
+                finish=finish,
+                slack=slack,
+            )
+            for logical_id, (start, finish, slack) in schedule.items()
+        },
+        dependencies=list(graph.edges()),
+        critical_path=critical_path,
+        nested_stacks=nested_stacks,
+    )
+    return stacks[name]
+
+
+def write_deploy_estimates(
+    directory: str, durations: Optional[Dict[str, float]] = None
+) -> Dict[str, DeployEstimate]:
+    """
+    Function to write the estimate of a cloud assembly (and of its nested
+    assemblies) as "deploy-estimate.json" and "deploy-estimate.dot".
+
+    :param directory: (str) cloud assembly directory (usually "cdk.out").
+    :param durations: (dict) seconds by resource type or logical ID.
+    :return: (dict) assembly directory -> estimate.
+    """
+    with open(os.path.join(directory, "manifest.json"), "r") as file:
+        artifacts = json.load(file).get("artifacts", {})
+
+    estimates = {}
+    estimate = estimate_assembly(directory, durations)
+    # The root assembly of a batch synth only has the nested assemblies
+    if estimate.stacks:
+        with open(os.path.join(directory, ESTIMATE_FILE_NAME + ".json"), "w") as file:
+            json.dump(estimate.to_dict(), file, indent=1)
+        with open(os.path.join(directory, ESTIMATE_FILE_NAME + ".dot"), "w") as file:
+            file.write(estimate.to_dot())
+        estimates[directory] = estimate
+
+    for artifact in artifacts.values():
+        if artifact["type"] == "cdk:cloud-assembly":
+            estimates.update(
+                write_deploy_estimates(
+                    os.path.join(directory, artifact["properties"]["directoryName"]),
+                    durations,
+                )
+            )
+    return estimates
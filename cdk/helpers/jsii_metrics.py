@@ -0,0 +1,54 @@
+################################################################################
+# JSII METRICS
+# Every call from Python to the CDK constructs (create, get, set, invoke, ...)
+# is a JSON round-trip to the jsii Node.js kernel process. Counting them is a
+# good proxy of the synth cost that is independent of the machine speed.
+################################################################################
+
+# Built-in imports
+import threading
+from typing import Optional
+
+
+class JsiiCallCounter:
+    """
+    Context manager that counts the jsii kernel round-trips made while active.
+
+    Example:
+        with JsiiCallCounter() as counter:
+            OrganizationStack(app, "org", "prod")
+        print(counter.calls)
+    """
+
+    _lock = threading.Lock()
+    _active = []
+    _original_send = None
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __enter__(self) -> "JsiiCallCounter":
+        # Imported here, so importing the helpers does not load jsii
+        from jsii._kernel.providers import process
+
+        with self._lock:
+            if not JsiiCallCounter._active:
+                JsiiCallCounter._original_send = process._NodeProcess.send
+                process._NodeProcess.send = _counting_send
+            JsiiCallCounter._active.append(self)
+        return self
+
+    def __exit__(self, *exc_info) -> Optional[bool]:
+        from jsii._kernel.providers import process
+
+        with self._lock:
+            JsiiCallCounter._active.remove(self)
+            if not JsiiCallCounter._active:
+                process._NodeProcess.send = JsiiCallCounter._original_send
+        return None
+
+
+def _counting_send(node_process, request, response_type):
+    for counter in JsiiCallCounter._active:
+        counter.calls += 1
+    return JsiiCallCounter._original_send(node_process, request, response_type)
@@ -0,0 +1,207 @@
+################################################################################
+# OFFLINE DRIFT ENGINE (DESIRED ORG SPEC VS SNAPSHOT OF THE LIVE ORGANIZATION)
+# Compares the org spec (the model built by the "OrganizationStack") with an
+# Organizations snapshot in a single O(n) pass, without credentials or jsii:
+# --> OUs are matched by name under their (already matched) parent
+# --> Accounts are matched by email (unique in AWS Organizations)
+################################################################################
+
+# Built-in imports
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Own imports
+from helpers.org_snapshot import OrgSnapshot, SnapshotOrganizationalUnit
+from helpers.org_spec import OrgSpec
+
+
+CHANGE_KINDS = ("create", "move", "rename", "orphan")
+
+CHANGE_SYMBOLS = {"create": "+", "move": ">", "rename": "~", "orphan": "-"}
+
+
+@dataclass(frozen=True)
+class DriftChange:
+    """
+    Difference between the org spec and the snapshot.
+    """
+
+    kind: str
+    resource_type: str
+    name: str
+    detail: str = ""
+
+    def __str__(self) -> str:
+        return "{} {} {} {}{}".format(
+            CHANGE_SYMBOLS[self.kind],
+            self.kind,
+            self.resource_type,
+            self.name,
+            ": {}".format(self.detail) if self.detail else "",
+        )
+
+
+@dataclass
+class DriftReport:
+    """
+    Result of the drift engine, with the changes in CHANGE_KINDS order.
+    """
+
+    changes: List[DriftChange] = field(default_factory=list)
+
+    @property
+    def has_drift(self) -> bool:
+        return bool(self.changes)
+
+    def of_kind(self, kind: str) -> List[DriftChange]:
+        return [change for change in self.changes if change.kind == kind]
+
+    def summary(self) -> str:
+        return ", ".join(
+            "{} {}".format(len(self.of_kind(kind)), kind) for kind in CHANGE_KINDS
+        )
+
+
+def diff_org(org_spec: OrgSpec, snapshot: OrgSnapshot) -> DriftReport:
+    """
+    Function to compare the desired organization with the snapshot.
+
+    :param org_spec: (OrgSpec) the parsed organization spec (desired state).
+    :param snapshot: (OrgSnapshot) the indexed snapshot (live state).
+    :return: (DriftReport) creations, moves, renames and orphans.
+    """
+    changes: List[DriftChange] = []
+
+    # Names of the desired OUs under each parent (renames can't steal them)
+    desired_names: Dict[str, set] = {}
+    for ou_spec in org_spec.organizational_units:
+        desired_names.setdefault(ou_spec.parent_path, set()).add(ou_spec.name)
+    # Emails of the accounts in the subtree of each desired OU (O(n * depth))
+    accounts_by_ou: Dict[str, List[str]] = {}
+    for account_spec in org_spec.accounts:
+        ou_path = account_spec.ou_path
+        while ou_path:
+            accounts_by_ou.setdefault(ou_path, []).append(account_spec.email.lower())
+            ou_path = ou_path.rpartition("/")[0]
+
+    # OUs in pre-order, so each parent is matched before its children
+    matched_ous: Dict[str, str] = {"": snapshot.root_id}
+    matched_ou_ids = {snapshot.root_id}
+    for ou_spec in org_spec.organizational_units:
+        parent_id = matched_ous.get(ou_spec.parent_path)
+        if parent_id is None:
+            changes.append(DriftChange("create", "ou", ou_spec.path))
+            continue
+        snapshot_ou = snapshot.children.get((parent_id, ou_spec.name))
+        if snapshot_ou is None:
+            snapshot_ou = _find_renamed_ou(
+                snapshot,
+                parent_id,
+                accounts_by_ou.get(ou_spec.path, []),
+                desired_names[ou_spec.parent_path],
+                matched_ou_ids,
+            )
+            if snapshot_ou is None:
+                changes.append(DriftChange("create", "ou", ou_spec.path))
+                continue
+            changes.append(
+                DriftChange(
+                    "rename",
+                    "ou",
+                    ou_spec.path,
+                    "'{}' -> '{}'".format(snapshot_ou.name, ou_spec.name),
+                )
+            )
+        matched_ous[ou_spec.path] = snapshot_ou.ou_id
+        matched_ou_ids.add(snapshot_ou.ou_id)
+
+    matched_accounts = set()
+    for account_spec in org_spec.accounts:
+        snapshot_account = snapshot.accounts_by_email.get(account_spec.email.lower())
+        if snapshot_account is None:
+            changes.append(
+                DriftChange(
+                    "create",
+                    "account",
+                    account_spec.construct_id,
+                    "in '{}'".format(account_spec.ou_path or "root"),
+                )
+            )
+            continue
+        matched_accounts.add(snapshot_account.account_id)
+        desired_parent_id = matched_ous.get(account_spec.ou_path)
+        if snapshot_account.parent_id != desired_parent_id:
+            changes.append(
+                DriftChange(
+                    "move",
+                    "account",
+                    account_spec.construct_id,
+                    "{} from '{}' to '{}'".format(
+                        snapshot_account.account_id,
+                        snapshot.path(snapshot_account.parent_id) or "root",
+                        account_spec.ou_path or "root",
+                    ),
+                )
+            )
+        if snapshot_account.name != account_spec.account_name:
+            changes.append(
+                DriftChange(
+                    "rename",
+                    "account",
+                    account_spec.construct_id,
+                    "'{}' -> '{}'".format(
+                        snapshot_account.name, account_spec.account_name
+                    ),
+                )
+            )
+
+    for ou in snapshot.organizational_units.values():
+        if ou.ou_id not in matched_ou_ids:
+            changes.append(
+                DriftChange("orphan", "ou", snapshot.path(ou.ou_id), ou.ou_id)
+            )
+    for account in snapshot.accounts.values():
+        if (
+            account.account_id not in matched_accounts
+            and account.account_id != snapshot.management_account_id
+        ):
+            changes.append(
+                DriftChange(
+                    "orphan",
+                    "account",
+                    account.name,
+                    "{} in '{}'".format(
+                        account.account_id, snapshot.path(account.parent_id) or "root"
+                    ),
+                )
+            )
+
+    order = {kind: index for index, kind in enumerate(CHANGE_KINDS)}
+    return DriftReport(sorted(changes, key=lambda change: order[change.kind]))
+
+
+def _find_renamed_ou(
+    snapshot: OrgSnapshot,
+    parent_id: str,
+    account_emails: List[str],
+    desired_names: set,
+    matched_ou_ids: set,
+) -> Optional[SnapshotOrganizationalUnit]:
+    """
+    Function to find the snapshot OU (under the same parent) that holds most of
+    the accounts of the subtree of a desired OU missing by name (i.e. renamed).
+    """
+    candidates = Counter()
+    for email in account_emails:
+        account = snapshot.accounts_by_email.get(email)
+        ou = account and snapshot.organizational_units.get(account.parent_id)
+        # Walk up to the ancestor of the account that is a child of the parent
+        while ou and ou.parent_id != parent_id:
+            ou = snapshot.organizational_units.get(ou.parent_id)
+        if ou and ou.name not in desired_names and ou.ou_id not in matched_ou_ids:
+            candidates[ou.ou_id] += 1
+    if not candidates:
+        return None
+    ou_id, _ = candidates.most_common(1)[0]
+    return snapshot.organizational_units[ou_id]
@@ -0,0 +1,75 @@
+################################################################################
+# SYNTHETIC ORGANIZATION GENERATOR
+# Generates org spec documents of any size and depth (same format as the
+# "stacks/org_spec.json" file), for benchmarks and scaling tests. Everything is
+# deterministic, so two runs with the same parameters produce the same spec.
+################################################################################
+
+# Built-in imports
+import os
+from typing import Dict, List
+
+# Own imports
+from helpers.org_spec import OrgSpec, parse_org_spec
+
+
+STACKS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "stacks")
+
+
+def generate_org_document(accounts: int, depth: int = 3, fanout: int = 4) -> Dict:
+    """
+    Function to generate an org spec document with a balanced OU tree and the
+    accounts spread (round-robin) across the leaf OUs.
+
+    :param accounts: (int) number of accounts.
+    :param depth: (int) number of OU levels below the root (>= 1).
+    :param fanout: (int) number of child OUs of each OU (>= 1).
+    :return: (dict) the org spec document.
+    """
+    root = {
+        "policies": ["PolicyDenyLeave", "PolicyAllowSpecificRegions"],
+        "organizational_units": [],
+    }
+    # Build the tree level by level ("x" separates the index of each level)
+    level = [("", root)]
+    for _ in range(max(depth, 1)):
+        next_level = []
+        for prefix, node in level:
+            for index in range(max(fanout, 1)):
+                suffix = "{}{}".format(prefix, index)
+                child = {"id": "OU{}".format(suffix), "name": "ou-{}".format(suffix)}
+                node.setdefault("organizational_units", []).append(child)
+                next_level.append((suffix + "x", child))
+        level = next_level
+    leaves: List[Dict] = [node for _, node in level]
+
+    for index in range(accounts):
+        leaf = leaves[index % len(leaves)]
+        leaf.setdefault("accounts", []).append(
+            {
+                "id": "Account{:05d}".format(index),
+                "account_name": "account-{:05d}".format(index),
+                "email": "org+account-{:05d}@example.com".format(index),
+            }
+        )
+
+    return {
+        "policies": {
+            "PolicyDenyLeave": {
+                "document": "scp_prevent_leaving_org",
+                "policy_name": "PreventLeavingOrganization",
+            },
+            "PolicyAllowSpecificRegions": {
+                "document": "scp_allow_specific_regions",
+                "policy_name": "AllowSpecificRegions",
+            },
+        },
+        "root": root,
+    }
+
+
+def generate_org_spec(accounts: int, depth: int = 3, fanout: int = 4) -> OrgSpec:
+    """
+    Function to generate a parsed org spec (see "generate_org_document").
+    """
+    return parse_org_spec(generate_org_document(accounts, depth, fanout), STACKS_DIR)
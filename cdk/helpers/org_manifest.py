@@ -0,0 +1,117 @@
+################################################################################
+# ORGANIZATION MANIFEST (COMPACT OU PATH -> ACCOUNT NAME -> ACCOUNT ID MAP)
+# Instead of one CloudFormation output per account (200 outputs limit), the
+# "manifest" outputs mode publishes the org map as compact JSON in SSM String
+# parameters under a single path (split in chunks under the 4 KB limit):
+# --> /<stack name>/<environment>/org-manifest/<label>/<n>  =  {"ou": {"name": "id"}}
+# "OrgManifest" rebuilds the map from the parameters for O(1) lookups.
+################################################################################
+
+# Built-in imports
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+OUTPUTS_MODES = ("outputs", "manifest")
+
+# Environments of a batch synth can be deployed to the same account
+MANIFEST_PATH = "/{}/{}/org-manifest"
+
+# Max size of a standard tier SSM parameter
+MAX_MANIFEST_CHUNK_SIZE = 4096
+
+# Account IDs are only known at deploy time (12 digits)
+ACCOUNT_ID_SIZE = 12
+
+
+def manifest_path(stack_name: str, deployment_environment: str) -> str:
+    return MANIFEST_PATH.format(stack_name, deployment_environment)
+
+
+def chunk_manifest(
+    entries: Iterable[Tuple[str, str, Any]],
+    max_size: int = MAX_MANIFEST_CHUNK_SIZE,
+) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Function to split the manifest entries in chunks whose JSON (once the
+    account IDs are resolved) fits in "max_size" characters.
+
+    :param entries: (Iterable) tuples of OU path, account name and account ID.
+    :param max_size: (int) max size of the JSON of each chunk.
+    :return: (list) the chunks ({ou_path: {account_name: account_id}}).
+    """
+    chunks: List[Dict[str, Dict[str, Any]]] = []
+    chunk: Dict[str, Dict[str, Any]] = {}
+    size = len("{}")
+    for ou_path, account_name, account_id in entries:
+        # Conservative size: '"name":"id",' (and '"ou":{},' for a new OU)
+        account_size = len(json.dumps(account_name)) + ACCOUNT_ID_SIZE + 4
+        ou_size = len(json.dumps(ou_path)) + 4
+        entry_size = account_size + (0 if ou_path in chunk else ou_size)
+        if chunk and size + entry_size > max_size:
+            chunks.append(chunk)
+            chunk, size = {}, len("{}")
+            entry_size = account_size + ou_size
+        chunk.setdefault(ou_path, {})[account_name] = account_id
+        size += entry_size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class OrgManifest:
+    """
+    Class to resolve accounts of the organization manifest in O(1).
+    """
+
+    def __init__(self, organizational_units: Dict[str, Dict[str, str]]) -> None:
+        """
+        :param organizational_units (dict): OU path -> account name -> account ID.
+        """
+        self.organizational_units = organizational_units
+        self._accounts: Dict[str, Tuple[str, str]] = {
+            account_name: (account_id, ou_path)
+            for ou_path, accounts in organizational_units.items()
+            for account_name, account_id in accounts.items()
+        }
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Dict[str, Dict[str, str]]]) -> "OrgManifest":
+        organizational_units: Dict[str, Dict[str, str]] = {}
+        for chunk in chunks:
+            for ou_path, accounts in chunk.items():
+                organizational_units.setdefault(ou_path, {}).update(accounts)
+        return cls(organizational_units)
+
+    @classmethod
+    def from_ssm(
+        cls, client: Any, stack_name: str, deployment_environment: str
+    ) -> "OrgManifest":
+        """
+        Method to load the manifest published by the "OrganizationStack".
+
+        :param client: (boto3 client) "ssm" client.
+        :param stack_name: (str) name of the "OrganizationStack".
+        :param deployment_environment: (str) deployment environment of the stack.
+        """
+        paginator = client.get_paginator("get_parameters_by_path")
+        return cls.from_chunks(
+            json.loads(parameter["Value"])
+            for page in paginator.paginate(
+                Path=manifest_path(stack_name, deployment_environment),
+                Recursive=True,
+            )
+            for parameter in page["Parameters"]
+        )
+
+    def account_id(self, account_name: str) -> str:
+        return self._accounts[account_name][0]
+
+    def ou_path(self, account_name: str) -> str:
+        return self._accounts[account_name][1]
+
+    def accounts(self, ou_path: str) -> Dict[str, str]:
+        """
+        Method to get the accounts (name -> ID) directly inside an OU.
+        """
+        return dict(self.organizational_units.get(ou_path, {}))
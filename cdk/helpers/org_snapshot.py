@@ -0,0 +1,174 @@
+################################################################################
+# ORGANIZATIONS SNAPSHOT (INDEXED IN-MEMORY TREE OF THE LIVE ORGANIZATION)
+# A snapshot is a JSON file with the responses of the AWS Organizations APIs:
+# --> "Roots": "list-roots"
+# --> "OrganizationalUnits": "list-organizational-units-for-parent" (+ParentId)
+# --> "Accounts": "list-accounts" (+ParentId, from "list-accounts-for-parent")
+# --> "Organization": "describe-organization" (optional, skips the management account)
+# It can be exported once with "export_org_snapshot" and then used offline.
+################################################################################
+
+# Built-in imports
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class SnapshotOrganizationalUnit:
+    """
+    Organizational Unit (OU) of the snapshot.
+    """
+
+    ou_id: str
+    name: str
+    parent_id: str
+
+
+@dataclass(frozen=True)
+class SnapshotAccount:
+    """
+    AWS Account of the snapshot.
+    """
+
+    account_id: str
+    name: str
+    email: str
+    parent_id: str
+    status: str = "ACTIVE"
+
+
+class OrgSnapshot:
+    """
+    Class that indexes a snapshot of the organization by ID, by (parent, name)
+    and by email, so every lookup of the drift engine is O(1).
+    """
+
+    def __init__(
+        self,
+        root_id: str,
+        organizational_units: List[SnapshotOrganizationalUnit],
+        accounts: List[SnapshotAccount],
+        management_account_id: Optional[str] = None,
+    ) -> None:
+        """
+        :param root_id (str): ID of the organization root.
+        :param organizational_units (list): OUs of the organization.
+        :param accounts (list): accounts of the organization.
+        :param management_account_id (str): ID of the management account.
+        """
+        self.root_id = root_id
+        self.management_account_id = management_account_id
+        self.organizational_units = {ou.ou_id: ou for ou in organizational_units}
+        self.accounts = {account.account_id: account for account in accounts}
+        self.children: Dict[Tuple[str, str], SnapshotOrganizationalUnit] = {
+            (ou.parent_id, ou.name): ou for ou in organizational_units
+        }
+        self.accounts_by_email = {
+            account.email.lower(): account for account in accounts
+        }
+        self._paths: Dict[str, str] = {root_id: ""}
+
+    def path(self, parent_id: str) -> str:
+        """
+        Method to get the OU path ("workloads/finance") of an OU or root ID.
+        Paths are memoized, so computing all of them is O(n).
+        """
+        missing = []
+        node_id = parent_id
+        while node_id not in self._paths:
+            if node_id not in self.organizational_units:
+                raise ValueError("Unknown parent '{}' in snapshot".format(node_id))
+            missing.append(node_id)
+            node_id = self.organizational_units[node_id].parent_id
+        for ou_id in reversed(missing):
+            ou = self.organizational_units[ou_id]
+            parent_path = self._paths[ou.parent_id]
+            self._paths[ou_id] = (
+                "{}/{}".format(parent_path, ou.name) if parent_path else ou.name
+            )
+        return self._paths[parent_id]
+
+
+def load_org_snapshot(path: str) -> OrgSnapshot:
+    """
+    Function to load a snapshot JSON file.
+
+    :param path: (str) path to the snapshot file.
+    """
+    with open(path, "r") as file:
+        return parse_org_snapshot(json.load(file))
+
+
+def parse_org_snapshot(document: Dict[str, Any]) -> OrgSnapshot:
+    """
+    Function to parse a snapshot document (see format at the top of the file).
+
+    :param document: (dict) the snapshot document.
+    """
+    roots = document.get("Roots", [])
+    if len(roots) != 1:
+        raise ValueError("Snapshot must have exactly one root in 'Roots'")
+    root_id = roots[0]["Id"]
+    try:
+        organizational_units = [
+            SnapshotOrganizationalUnit(
+                ou_id=ou["Id"], name=ou["Name"], parent_id=ou["ParentId"]
+            )
+            for ou in document.get("OrganizationalUnits", [])
+        ]
+        accounts = [
+            SnapshotAccount(
+                account_id=account["Id"],
+                name=account["Name"],
+                email=account["Email"],
+                parent_id=account.get("ParentId", root_id),
+                status=account.get("Status", "ACTIVE"),
+            )
+            for account in document.get("Accounts", [])
+        ]
+    except KeyError as error:
+        raise ValueError("Missing key {} in snapshot".format(error)) from None
+    organization = document.get("Organization", {})
+    return OrgSnapshot(
+        root_id,
+        organizational_units,
+        accounts,
+        management_account_id=organization.get("MasterAccountId"),
+    )
+
+
+def export_org_snapshot(client: Any) -> Dict[str, Any]:
+    """
+    Function to export the snapshot document of the live organization.
+
+    :param client: (boto3 client) "organizations" client with read access.
+    :return: (dict) the snapshot document (to be saved as JSON).
+    """
+
+    def paginate(operation: str, key: str, **kwargs) -> List[Dict[str, Any]]:
+        paginator = client.get_paginator(operation)
+        return [item for page in paginator.paginate(**kwargs) for item in page[key]]
+
+    roots = paginate("list_roots", "Roots")
+    document = {
+        "Organization": client.describe_organization()["Organization"],
+        "Roots": roots,
+        "OrganizationalUnits": [],
+        "Accounts": [],
+    }
+    pending = [root["Id"] for root in roots]
+    while pending:
+        parent_id = pending.pop()
+        for ou in paginate(
+            "list_organizational_units_for_parent",
+            "OrganizationalUnits",
+            ParentId=parent_id,
+        ):
+            document["OrganizationalUnits"].append(dict(ou, ParentId=parent_id))
+            pending.append(ou["Id"])
+        for account in paginate(
+            "list_accounts_for_parent", "Accounts", ParentId=parent_id
+        ):
+            document["Accounts"].append(dict(account, ParentId=parent_id))
+    return json.loads(json.dumps(document, default=str))
@@ -0,0 +1,242 @@
+################################################################################
+# ORGANIZATION SPEC (DECLARATIVE DEFINITION OF OUs, ACCOUNTS AND SCPs)
+# The spec is parsed once into a compact, immutable tree. OUs are flattened in
+# pre-order (parents always before children) and accounts in depth-first order,
+# so the CDK stack can be built in a single linear pass over both tuples.
+################################################################################
+
+# Built-in imports
+import os
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_ORG_SPEC_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "stacks",
+    "org_spec.json",
+)
+
+DEFAULT_ROLE_NAME = "OrganizationAccountAccessRole"
+
+DEFAULT_POLICIES_DIR = "policies"
+
+VALID_REMOVAL_POLICIES = ("destroy", "retain", "snapshot")
+
+
+@dataclass(frozen=True)
+class PolicySpec:
+    """
+    Service Control Policy (SCP) declared in the spec. The "document" is the
+    name of the policy in the policy library ("file" is its resolved path).
+    """
+
+    construct_id: str
+    policy_name: str
+    description: str
+    document: str
+    file: str
+
+
+@dataclass(frozen=True)
+class AccountSpec:
+    """
+    AWS Account declared in the spec. Accounts "imported" already exist (e.g.
+    from the account inventory), so they are adopted instead of created, but
+    still in the creation lanes (the import also sends a "CreateAccount").
+    """
+
+    construct_id: str
+    account_name: str
+    email: str
+    ou_path: str
+    role_name: str = DEFAULT_ROLE_NAME
+    output_id: Optional[str] = None
+    removal_policy: Optional[str] = None
+    import_on_duplicate: bool = False
+    policies: Tuple[str, ...] = ()
+    imported: bool = False
+    tags: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass(frozen=True)
+class OrganizationalUnitSpec:
+    """
+    Organizational Unit (OU) declared in the spec. The "path" is the slash
+    separated list of OU names from the root (e.g. "workloads/finance/prod").
+    """
+
+    construct_id: str
+    name: str
+    path: str
+    parent_path: str
+    policies: Tuple[str, ...] = ()
+    tags: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass(frozen=True)
+class OrgSpec:
+    """
+    Parsed organization spec. The root is identified by the empty path "".
+    """
+
+    policies: Tuple[PolicySpec, ...]
+    root_policies: Tuple[str, ...]
+    organizational_units: Tuple[OrganizationalUnitSpec, ...]
+    accounts: Tuple[AccountSpec, ...]
+    policies_dir: str = ""
+    root_tags: Tuple[Tuple[str, str], ...] = ()
+
+
+def load_org_spec(path: str = DEFAULT_ORG_SPEC_PATH) -> OrgSpec:
+    """
+    Function to load and parse an organization spec JSON file.
+
+    :param path: (str) path to the spec file.
+    :return: (OrgSpec) the parsed spec.
+    """
+    with open(path, "r") as file:
+        document = json.load(file)
+    return parse_org_spec(document, os.path.dirname(os.path.abspath(path)))
+
+
+def parse_org_spec(document: Dict, base_dir: str) -> OrgSpec:
+    """
+    Function to parse an organization spec document into an OrgSpec tree.
+
+    :param document: (dict) the spec document (already decoded from JSON).
+    :param base_dir: (str) directory used to resolve the policy library directory.
+    :return: (OrgSpec) the parsed spec.
+    """
+    defaults = document.get("defaults", {})
+    default_role_name = defaults.get("role_name", DEFAULT_ROLE_NAME)
+    policies_dir = os.path.join(
+        base_dir, document.get("policies_dir", DEFAULT_POLICIES_DIR)
+    )
+
+    policies = []
+    for construct_id, policy in document.get("policies", {}).items():
+        _require(
+            policy, ("document", "policy_name"), "policy '{}'".format(construct_id)
+        )
+        policies.append(
+            PolicySpec(
+                construct_id=construct_id,
+                policy_name=policy["policy_name"],
+                description=policy.get("description", ""),
+                document=policy["document"],
+                file=os.path.join(policies_dir, policy["document"] + ".json"),
+            )
+        )
+    policy_ids = {policy.construct_id for policy in policies}
+
+    root = document.get("root", {})
+    organizational_units: List[OrganizationalUnitSpec] = []
+    accounts: List[AccountSpec] = []
+    construct_ids = set(policy_ids)
+
+    def check_policies(node: Dict, where: str) -> Tuple[str, ...]:
+        node_policies = tuple(node.get("policies", ()))
+        for policy_id in node_policies:
+            if policy_id not in policy_ids:
+                raise ValueError(
+                    "Unknown policy '{}' referenced by {}".format(policy_id, where)
+                )
+        return node_policies
+
+    def check_construct_id(construct_id: str, where: str) -> None:
+        if construct_id in construct_ids:
+            raise ValueError(
+                "Duplicate construct id '{}' in {}".format(construct_id, where)
+            )
+        construct_ids.add(construct_id)
+
+    # Iterative depth-first walk (explicit stack avoids recursion limits)
+    stack = [("", root)]
+    while stack:
+        path, node = stack.pop()
+        where = "OU '{}'".format(path) if path else "root"
+
+        for account in node.get("accounts", ()):
+            _require(account, ("id", "account_name", "email"), where)
+            check_construct_id(account["id"], where)
+            removal_policy = account.get("removal_policy")
+            if removal_policy is not None:
+                removal_policy = removal_policy.lower()
+                if removal_policy not in VALID_REMOVAL_POLICIES:
+                    raise ValueError(
+                        "Invalid removal_policy '{}' for account '{}'".format(
+                            account["removal_policy"], account["id"]
+                        )
+                    )
+            accounts.append(
+                AccountSpec(
+                    construct_id=account["id"],
+                    account_name=account["account_name"],
+                    email=account["email"],
+                    ou_path=path,
+                    role_name=account.get("role_name", default_role_name),
+                    output_id=account.get("output_id"),
+                    removal_policy=removal_policy,
+                    import_on_duplicate=bool(account.get("import_on_duplicate", False)),
+                    policies=check_policies(
+                        account, "account '{}'".format(account["id"])
+                    ),
+                    imported=bool(account.get("imported", False)),
+                    tags=_parse_tags(account, "account '{}'".format(account["id"])),
+                )
+            )
+
+        children = node.get("organizational_units", ())
+        for child in children:
+            _require(child, ("id", "name"), where)
+            check_construct_id(child["id"], where)
+        # Push children in reverse, so they are popped in declaration order
+        for child in reversed(children):
+            child_path = "{}/{}".format(path, child["name"]) if path else child["name"]
+            stack.append((child_path, child))
+
+        if path:
+            organizational_units.append(
+                OrganizationalUnitSpec(
+                    construct_id=node["id"],
+                    name=node["name"],
+                    path=path,
+                    parent_path=path.rsplit("/", 1)[0] if "/" in path else "",
+                    policies=check_policies(node, where),
+                    tags=_parse_tags(node, where),
+                )
+            )
+
+    seen_paths = set()
+    for ou in organizational_units:
+        if ou.path in seen_paths:
+            raise ValueError("Duplicate OU path '{}'".format(ou.path))
+        seen_paths.add(ou.path)
+
+    return OrgSpec(
+        policies=tuple(policies),
+        root_policies=check_policies(root, "root"),
+        organizational_units=tuple(organizational_units),
+        accounts=tuple(accounts),
+        policies_dir=policies_dir,
+        root_tags=_parse_tags(root, "root"),
+    )
+
+
+def _parse_tags(node: Dict, where: str) -> Tuple[Tuple[str, str], ...]:
+    tags = node.get("tags", {})
+    if not isinstance(tags, dict) or not all(
+        isinstance(value, str) for value in tags.values()
+    ):
+        raise ValueError("Tags of {} must be an object of strings".format(where))
+    return tuple(sorted(tags.items()))
+
+
+def _require(node: Dict, keys: Tuple[str, ...], where: str) -> None:
+    missing = [key for key in keys if key not in node]
+    if missing:
+        raise ValueError(
+            "Missing required key(s) {} in {}".format(", ".join(missing), where)
+        )
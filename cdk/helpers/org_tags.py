@@ -0,0 +1,141 @@
+################################################################################
+# HIERARCHICAL ORGANIZATION TAGS (RESOLVED ONCE ALONG THE OU TREE)
+# Tags in AWS Organizations are not inherited, so the "tags" of the root, OUs
+# and accounts of the org spec (e.g. cost center, owner, data classification)
+# are merged down the tree in a single pre-order pass (children override their
+# parents) and set directly on each resource, instead of one tag aspect per key.
+# The merged tags (plus the app tags) are validated against the quotas:
+# --> https://docs.aws.amazon.com/organizations/latest/userguide/orgs_reference_limits.html
+################################################################################
+
+# Built-in imports
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Tuple
+
+# Own imports
+from helpers.org_spec import OrgSpec
+
+
+MAX_TAGS_PER_RESOURCE = 50
+
+MAX_TAG_KEY_LENGTH = 128
+
+MAX_TAG_VALUE_LENGTH = 256
+
+RESERVED_TAG_PREFIX = "aws:"
+
+# Higher than the default priority of "cdk.Tags" (100), so the tags of the
+# spec override the app tags with the same key
+SPEC_TAG_PRIORITY = 200
+
+
+@dataclass
+class OrgTags:
+    """
+    Effective tags of the org spec resources (the root is the path "").
+    """
+
+    organizational_units: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    accounts: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+    @property
+    def root(self) -> Dict[str, str]:
+        return self.organizational_units.get("", {})
+
+
+def app_tags(
+    main_resources_name: str,
+    deployment_environment: str,
+    context_tags: Optional[Mapping[str, str]] = None,
+) -> Dict[str, str]:
+    """
+    Function to get the tags applied to the whole app (see "add_tags.py").
+
+    :param main_resources_name: (str) the main solution name being deployed.
+    :param deployment_environment: (str) value of the tag "environment".
+    :param context_tags: (Mapping) tags of the "tags" CDK context value.
+    """
+    return {
+        "MainResourcesName": main_resources_name,
+        "Environment": deployment_environment,
+        **(context_tags or {}),
+    }
+
+
+def validate_tags(tags: Mapping[str, str], where: str) -> None:
+    """
+    Function to validate the keys and values of a set of tags.
+
+    :param tags: (Mapping) tag key -> tag value.
+    :param where: (str) description of the tagged node (for the errors).
+    """
+    for key, value in tags.items():
+        if not key or len(key) > MAX_TAG_KEY_LENGTH:
+            raise ValueError(
+                "Tag key '{}' of {} must have 1 to {} characters".format(
+                    key, where, MAX_TAG_KEY_LENGTH
+                )
+            )
+        if len(value) > MAX_TAG_VALUE_LENGTH:
+            raise ValueError(
+                "Tag '{}' of {} exceeds {} characters".format(
+                    key, where, MAX_TAG_VALUE_LENGTH
+                )
+            )
+        if key.lower().startswith(RESERVED_TAG_PREFIX):
+            raise ValueError(
+                "Tag key '{}' of {} uses the reserved prefix '{}'".format(
+                    key, where, RESERVED_TAG_PREFIX
+                )
+            )
+
+
+def resolve_org_tags(
+    org_spec: OrgSpec, base_tags: Optional[Mapping[str, str]] = None
+) -> OrgTags:
+    """
+    Function to merge the tags of the spec down the OU tree, in O(n).
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :param base_tags: (Mapping) tags applied to the whole app (only counted
+        against the quota, as they are already applied by "cdk.Tags").
+    :return: (OrgTags) the effective spec tags of each OU and account.
+    """
+    validate_tags(base_tags or {}, "the app")
+    base_keys = set(base_tags or {})
+    if len(base_keys) > MAX_TAGS_PER_RESOURCE:
+        raise ValueError(
+            "The app has {} tags (max {} per resource)".format(
+                len(base_keys), MAX_TAGS_PER_RESOURCE
+            )
+        )
+    org_tags = OrgTags()
+
+    def resolve(parent: Dict[str, str], own: Tuple, where: str) -> Dict[str, str]:
+        if not own:
+            return parent
+        validate_tags(dict(own), where)
+        tags = {**parent, **dict(own)}
+        if len(base_keys.union(tags)) > MAX_TAGS_PER_RESOURCE:
+            raise ValueError(
+                "{} would have {} tags (max {} per resource)".format(
+                    where, len(base_keys.union(tags)), MAX_TAGS_PER_RESOURCE
+                )
+            )
+        return tags
+
+    org_tags.organizational_units[""] = resolve({}, org_spec.root_tags, "Root")
+    # OUs are in pre-order, so the parent tags are always resolved first
+    for ou_spec in org_spec.organizational_units:
+        org_tags.organizational_units[ou_spec.path] = resolve(
+            org_tags.organizational_units[ou_spec.parent_path],
+            ou_spec.tags,
+            "OU '{}'".format(ou_spec.path),
+        )
+    for account_spec in org_spec.accounts:
+        org_tags.accounts[account_spec.construct_id] = resolve(
+            org_tags.organizational_units[account_spec.ou_path],
+            account_spec.tags,
+            "Account '{}'".format(account_spec.construct_id),
+        )
+    return org_tags
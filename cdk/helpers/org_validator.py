@@ -0,0 +1,363 @@
+################################################################################
+# STATIC VALIDATOR OF THE ORG MODEL (PURE PYTHON, BEFORE ANY SYNTH)
+# Checks the org spec with hash-indexed lookups (O(n) on thousands of accounts)
+# for the mistakes that otherwise show up after a slow synth or mid-deploy:
+# --> Duplicated account emails/names and OU names reused under a parent
+# --> AWS Organizations quotas (names, emails, SCP sizes/attachments and tags)
+# --> Missing links of the account creation chains (more concurrent
+#     "CreateAccount" requests than the account creation lanes), from the lanes
+#     of "add_cdk_accounts_dependencies" and optionally also from the templates
+#     of a synthesized assembly ("helpers/account_dependencies.py")
+# It never imports jsii, so it can run from tests and pre-commit hooks.
+################################################################################
+
+# Built-in imports
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional
+
+# Own imports
+from helpers.account_dependencies import assembly_account_dependencies
+from helpers.account_inventory import apply_account_inventory
+from helpers.account_scheduler import normalize_lanes, schedule_account_lanes
+from helpers.dependency_graph import DependencyGraph
+from helpers.org_spec import OrgSpec, load_org_spec, parse_org_spec
+from helpers.org_tags import resolve_org_tags
+from helpers.policy_library import PolicyLibrary
+from helpers.scp_optimizer import (
+    MAX_SCP_SIZE,
+    MAX_SCPS_PER_TARGET,
+    RESERVED_SCPS_PER_TARGET,
+    optimize_scps,
+    spec_attachments,
+)
+from helpers.scp_placement import place_scps
+
+
+MAX_ACCOUNT_NAME_LENGTH = 50
+
+MAX_OU_NAME_LENGTH = 128
+
+MIN_EMAIL_LENGTH, MAX_EMAIL_LENGTH = 6, 64
+
+_EMAIL = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    """
+    Problem found in the org model ("error" fails the validation).
+    """
+
+    severity: str
+    code: str
+    message: str
+
+    def __str__(self) -> str:
+        return "{} [{}] {}".format(self.severity.upper(), self.code, self.message)
+
+
+@dataclass
+class ValidationReport:
+    """
+    Result of the validation, with the issues in the order they were found.
+    """
+
+    issues: List[ValidationIssue] = field(default_factory=list)
+
+    @property
+    def errors(self) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.severity == "error"]
+
+    @property
+    def warnings(self) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.severity == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def error(self, code: str, message: str) -> None:
+        self.issues.append(ValidationIssue("error", code, message))
+
+    def warning(self, code: str, message: str) -> None:
+        self.issues.append(ValidationIssue("warning", code, message))
+
+    def summary(self) -> str:
+        return "{} errors, {} warnings".format(len(self.errors), len(self.warnings))
+
+
+def validate_org_spec_file(path: str, **options) -> ValidationReport:
+    """
+    Function to validate an org spec file (parse errors are reported too).
+
+    :param path: (str) path to the spec file.
+    :param options: keyword arguments of "validate_org".
+    """
+    try:
+        org_spec = load_org_spec(path)
+    except (OSError, ValueError, KeyError) as error:
+        report = ValidationReport()
+        report.error("spec", "Invalid org spec {}: {}".format(path, error))
+        return report
+    return validate_org(org_spec, **options)
+
+
+def validate_org_document(document: Dict, base_dir: str, **options) -> ValidationReport:
+    """
+    Function to validate an org spec document (parse errors are reported too).
+
+    :param document: (dict) the spec document.
+    :param base_dir: (str) directory used to resolve the policy library directory.
+    :param options: keyword arguments of "validate_org".
+    """
+    try:
+        org_spec = parse_org_spec(document, base_dir)
+    except (ValueError, KeyError, TypeError) as error:
+        report = ValidationReport()
+        report.error("spec", "Invalid org spec: {}".format(error))
+        return report
+    return validate_org(org_spec, **options)
+
+
+def validate_org(
+    org_spec: OrgSpec,
+    policy_library: Optional[PolicyLibrary] = None,
+    account_creation_lanes: int = 1,
+    optimize_policies: bool = False,
+    place_policies: bool = False,
+    scp_hoist_mode: Optional[str] = None,
+    base_tags: Optional[Mapping[str, str]] = None,
+    account_dependencies: Optional[DependencyGraph] = None,
+    cloud_assembly: Optional[str] = None,
+    account_inventory: Optional[Mapping[str, str]] = None,
+    managed_account_ids: Iterable[str] = (),
+) -> ValidationReport:
+    """
+    Function to validate the parsed org model with the same options as the
+    "OrganizationStack".
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :param policy_library: (PolicyLibrary) SCP documents (default: "policies_dir").
+    :param account_creation_lanes: (int) number of account creation lanes.
+    :param optimize_policies: (bool) validate the SCPs after the optimizer.
+    :param place_policies: (bool) validate the SCP attachments after the placement.
+    :param scp_hoist_mode: (str) hoist mode of the placement ("none", "ous" or "root").
+    :param base_tags: (Mapping) tags applied to the whole app.
+    :param account_dependencies: (DependencyGraph) account dependencies to check (default: the lanes of "add_cdk_accounts_dependencies").
+    :param cloud_assembly: (str) synthesized cloud assembly whose account dependencies are also checked (optional, after a synth).
+    :param account_inventory: (Mapping) lowercase email -> ID of the accounts to import.
+    :param managed_account_ids: (Iterable[str]) IDs of the accounts already deployed by the stack.
+    :return: (ValidationReport) the errors and warnings found.
+    """
+    report = ValidationReport()
+    if account_inventory:
+        org_spec = apply_account_inventory(
+            org_spec, account_inventory, managed_account_ids
+        )
+    if place_policies:
+        org_spec = place_scps(org_spec, hoist_mode=scp_hoist_mode).org_spec
+    _check_organizational_units(org_spec, report)
+    _check_accounts(org_spec, report)
+    lanes = normalize_lanes(account_creation_lanes)
+    if account_dependencies is None:
+        # Same lanes as the stack (imported accounts share them)
+        account_dependencies = schedule_account_lanes(
+            [account_spec.construct_id for account_spec in org_spec.accounts], lanes
+        ).graph
+    _check_account_dependencies(org_spec, account_dependencies, lanes, report)
+    if cloud_assembly:
+        try:
+            synthesized = assembly_account_dependencies(
+                cloud_assembly,
+                [account_spec.construct_id for account_spec in org_spec.accounts],
+            )
+        except (OSError, ValueError, KeyError) as error:
+            report.error("account-chain", "Invalid cloud assembly: {}".format(error))
+        else:
+            _check_account_dependencies(org_spec, synthesized, lanes, report)
+    try:
+        policy_library = policy_library or PolicyLibrary(org_spec.policies_dir)
+    except OSError as error:
+        report.error("scp", "Invalid policies directory: {}".format(error))
+    else:
+        _check_policies(org_spec, policy_library, optimize_policies, report)
+    try:
+        resolve_org_tags(org_spec, base_tags)
+    except ValueError as error:
+        report.error("tags", str(error))
+    return report
+
+
+def _check_organizational_units(org_spec: OrgSpec, report: ValidationReport) -> None:
+    names_by_parent: Dict[tuple, str] = {}
+    for ou_spec in org_spec.organizational_units:
+        if not 1 <= len(ou_spec.name) <= MAX_OU_NAME_LENGTH:
+            report.error(
+                "ou-name",
+                "OU '{}' name must have 1 to {} characters".format(
+                    ou_spec.path, MAX_OU_NAME_LENGTH
+                ),
+            )
+        # OU names are case insensitive in AWS Organizations
+        key = (ou_spec.parent_path, ou_spec.name.lower())
+        if key in names_by_parent:
+            report.error(
+                "duplicate-ou",
+                "OU name '{}' is used twice under '{}' ({} and {})".format(
+                    ou_spec.name,
+                    ou_spec.parent_path or "root",
+                    names_by_parent[key],
+                    ou_spec.construct_id,
+                ),
+            )
+        else:
+            names_by_parent[key] = ou_spec.construct_id
+
+
+def _check_accounts(org_spec: OrgSpec, report: ValidationReport) -> None:
+    emails: Dict[str, str] = {}
+    names: Dict[str, str] = {}
+    for account_spec in org_spec.accounts:
+        construct_id = account_spec.construct_id
+        email = account_spec.email.lower()
+        if email in emails:
+            report.error(
+                "duplicate-email",
+                "Email '{}' is used by accounts '{}' and '{}'".format(
+                    account_spec.email, emails[email], construct_id
+                ),
+            )
+        else:
+            emails[email] = construct_id
+        if account_spec.account_name in names:
+            report.error(
+                "duplicate-account-name",
+                "Account name '{}' is used by accounts '{}' and '{}'".format(
+                    account_spec.account_name,
+                    names[account_spec.account_name],
+                    construct_id,
+                ),
+            )
+        else:
+            names[account_spec.account_name] = construct_id
+        if not _EMAIL.match(email) or not (
+            MIN_EMAIL_LENGTH <= len(email) <= MAX_EMAIL_LENGTH
+        ):
+            report.error(
+                "email",
+                "Account '{}' has an invalid email '{}'".format(
+                    construct_id, account_spec.email
+                ),
+            )
+        if not 1 <= len(account_spec.account_name) <= MAX_ACCOUNT_NAME_LENGTH:
+            report.error(
+                "account-name",
+                "Account '{}' name must have 1 to {} characters".format(
+                    construct_id, MAX_ACCOUNT_NAME_LENGTH
+                ),
+            )
+
+
+def _check_account_dependencies(
+    org_spec: OrgSpec,
+    graph: DependencyGraph,
+    lanes: int,
+    report: ValidationReport,
+) -> None:
+    """
+    Function to check that the account dependencies never allow more than one
+    "CreateAccount" request per lane at the same time (imported accounts also
+    call it). The dependencies are seen as a forest (first dependency of each
+    account), whose leaves bound the accounts that can be created at once:
+    one per account without dependencies, plus one per extra dependent.
+    """
+    account_ids = [account_spec.construct_id for account_spec in org_spec.accounts]
+    synthesized = set(graph.nodes)
+    missing = [
+        account_id for account_id in account_ids if account_id not in synthesized
+    ]
+    unknown = synthesized.difference(account_ids)
+    if missing or unknown:
+        report.warning(
+            "account-chain",
+            "The account dependencies were not checked, the synthesized accounts "
+            "do not match the spec ({} missing, {} not in the spec): run cdk "
+            "synth again".format(len(missing), len(unknown)),
+        )
+        return
+    try:
+        graph.topological_order()
+    except ValueError as error:
+        report.error("account-chain", str(error))
+        return
+
+    dependents: Dict[str, int] = {}
+    independent = []
+    for account_id in account_ids:
+        dependencies = graph.dependencies(account_id)
+        if dependencies:
+            dependents[dependencies[0]] = dependents.get(dependencies[0], 0) + 1
+        else:
+            independent.append(account_id)
+    concurrent = len(independent) + sum(
+        count - 1 for count in dependents.values() if count > 1
+    )
+    if concurrent > lanes:
+        report.error(
+            "account-chain",
+            "Up to {} accounts can be created at the same time, over the {} "
+            "creation lanes (accounts without dependencies: {})".format(
+                concurrent, lanes, ", ".join(independent)
+            ),
+        )
+
+
+def _check_policies(
+    org_spec: OrgSpec,
+    policy_library: PolicyLibrary,
+    optimize_policies: bool,
+    report: ValidationReport,
+) -> None:
+    attachments = spec_attachments(org_spec)
+    attached = {policy_id for ids in attachments.values() for policy_id in ids}
+    documents_ok = True
+    for policy_spec in org_spec.policies:
+        if policy_spec.construct_id not in attached:
+            report.warning(
+                "scp-unused",
+                "SCP '{}' is not attached to any target".format(
+                    policy_spec.construct_id
+                ),
+            )
+        try:
+            size = len(policy_library.content(policy_spec.document))
+        except (OSError, ValueError) as error:
+            report.error("scp", "SCP '{}': {}".format(policy_spec.construct_id, error))
+            documents_ok = False
+            continue
+        # The optimizer can compact the SCPs, so only their final size matters
+        if size > MAX_SCP_SIZE and not optimize_policies:
+            report.error(
+                "scp-size",
+                "SCP '{}' has {} characters (max {})".format(
+                    policy_spec.construct_id, size, MAX_SCP_SIZE
+                ),
+            )
+
+    if optimize_policies:
+        if documents_ok:
+            try:
+                optimize_scps(org_spec, policy_library)
+            except ValueError as error:
+                report.error("scp-size", str(error))
+        return
+    max_per_target = MAX_SCPS_PER_TARGET - RESERVED_SCPS_PER_TARGET
+    for target, policy_ids in attachments.items():
+        if len(set(policy_ids)) > max_per_target:
+            report.error(
+                "scp-count",
+                "Target '{}' has {} SCPs attached (max {})".format(
+                    target, len(set(policy_ids)), max_per_target
+                ),
+            )
@@ -0,0 +1,125 @@
+################################################################################
+# PARALLEL SHARD SYNTH (PROCESS POOL OVER THE SIBLING SHARD STACKS)
+# With "sharding_mode=stacks", the shards only depend on the values exported by
+# the main stack, so they can be built in separate processes (each one with its
+# own Python interpreter and jsii kernel). Every worker runs the same CDK app
+# with a subset of shards ("synth_shards" context) into its own directory, and
+# the main process builds the others as placeholders (same as cached shards).
+# The shard artifacts of the workers are then merged into the main assembly,
+# in the order of the main manifest (deterministic, whatever finishes first).
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Own imports
+from helpers.org_spec import OrgSpec
+from helpers.synth_cache import SynthCache
+
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app.py")
+
+
+def plan_shard_groups(
+    org_spec: OrgSpec, shard_paths: Sequence[str], workers: int
+) -> List[List[str]]:
+    """
+    Function to split the shards in balanced groups (one per worker), using
+    the number of OUs and accounts of each shard as its cost (longest
+    processing time first).
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :param shard_paths: (Sequence[str]) top-level OU paths to build.
+    :param workers: (int) max number of worker processes.
+    :return: (list) groups of shard paths (in spec order).
+    """
+    costs = {path: 0 for path in shard_paths}
+    for spec in org_spec.organizational_units:
+        top_level_path = spec.path.split("/", 1)[0]
+        if top_level_path in costs:
+            costs[top_level_path] += 1
+    for spec in org_spec.accounts:
+        top_level_path = spec.ou_path.split("/", 1)[0]
+        if top_level_path in costs:
+            costs[top_level_path] += 1
+
+    groups: List[Tuple[int, List[str]]] = [
+        (0, []) for _ in range(min(max(workers, 1), len(shard_paths)))
+    ]
+    for path in sorted(shard_paths, key=lambda path: -costs[path]):
+        index = min(range(len(groups)), key=lambda index: groups[index][0])
+        cost, paths = groups[index]
+        groups[index] = (cost + costs[path], paths + [path])
+
+    order = {path: index for index, path in enumerate(shard_paths)}
+    planned = [sorted(paths, key=order.get) for _, paths in groups if paths]
+    return sorted(planned, key=lambda paths: order[paths[0]])
+
+
+class ShardWorkers:
+    """
+    Class that runs the CDK app once per group of shards in parallel
+    subprocesses, and merges the shard artifacts into the main assembly.
+    """
+
+    def __init__(self, groups: List[List[str]], context: Dict[str, Any]) -> None:
+        """
+        :param groups (list): groups of shard paths (one subprocess per group).
+        :param context (dict): CDK context of the main app.
+        """
+        self.groups = groups
+        self.directory = tempfile.mkdtemp(prefix="cdk-parallel-synth-")
+        self.processes: List[Tuple[subprocess.Popen, str]] = []
+        for index, group in enumerate(groups):
+            outdir = os.path.join(self.directory, "worker{}".format(index))
+            # Workers build their shards only (no synth cache, no nested pool)
+            worker_context = dict(
+                context, synth_shards=group, parallel_synth=0, synth_cache=False
+            )
+            env = dict(
+                os.environ,
+                CDK_OUTDIR=outdir,
+                CDK_CONTEXT_JSON=json.dumps(worker_context),
+            )
+            env.pop("SYNTH_PROFILE", None)
+            # Logs go to a file, so a chatty worker can never block on a pipe
+            with open(outdir + ".log", "w") as log_file:
+                process = subprocess.Popen(
+                    [sys.executable, APP_FILE],
+                    env=env,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                )
+            self.processes.append((process, outdir))
+
+    def merge(self, shard_artifact_ids: Dict[str, str], outdir: str) -> None:
+        """
+        Method to wait for the workers and copy the artifacts of their shards
+        into the main cloud assembly.
+
+        :param shard_artifact_ids (dict): top-level OU path -> stack artifact ID.
+        :param outdir (str): main cloud assembly directory (usually "cdk.out").
+        """
+        errors = []
+        for process, worker_outdir in self.processes:
+            if process.wait() != 0:
+                with open(worker_outdir + ".log", "r", errors="replace") as log_file:
+                    errors.append(log_file.read().strip())
+        if errors:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            raise RuntimeError("Parallel shard synth failed:\n" + "\n".join(errors))
+
+        # The cache entry format is reused to move the artifacts of each shard
+        staging = SynthCache(os.path.join(self.directory, "staging"))
+        for group, (_, worker_outdir) in zip(self.groups, self.processes):
+            for index, path in enumerate(group):
+                key = "{}-{}".format(os.path.basename(worker_outdir), index)
+                staging.store_stack(key, worker_outdir, shard_artifact_ids[path])
+                staging.restore_stack(key, outdir)
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,62 @@
+################################################################################
+# POLICY LIBRARY (SCP DOCUMENTS LOADED LAZILY FROM A DIRECTORY)
+# The policies directory is scanned once. Each document is parsed and minified
+# the first time it is requested and then memoized, so an SCP attached at many
+# OUs (or used by many stacks sharing the library) is only read once.
+################################################################################
+
+# Built-in imports
+import os
+import json
+from typing import Any, Dict, List
+
+
+class PolicyLibrary:
+    """
+    Class that hands out the SCP documents of a policies directory by name
+    (the file name without the ".json" extension).
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        :param directory (str): Directory with the SCP JSON documents.
+        """
+        self.directory = directory
+        self._paths: Dict[str, str] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    self._paths[entry.name[: -len(".json")]] = entry.path
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._contents: Dict[str, str] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self._paths)
+
+    def path(self, name: str) -> str:
+        if name not in self._paths:
+            raise ValueError(
+                "Policy document '{}' not found in {}".format(name, self.directory)
+            )
+        return self._paths[name]
+
+    def document(self, name: str) -> Dict[str, Any]:
+        """
+        Method to get the parsed policy document (parsed only once).
+        """
+        if name not in self._documents:
+            with open(self.path(name), "r") as file:
+                self._documents[name] = json.load(file)
+        return self._documents[name]
+
+    def content(self, name: str) -> str:
+        """
+        Method to get the minified JSON content of the policy (serialized only
+        once), ready to be used as the "content" of an SCP.
+        """
+        if name not in self._contents:
+            self._contents[name] = json.dumps(
+                self.document(name), separators=(",", ":")
+            )
+        return self._contents[name]
@@ -0,0 +1,597 @@
+################################################################################
+# EFFECTIVE SCP EVALUATOR (OFFLINE "IS THIS ACTION ALLOWED HERE?" QUERIES)
+# SCPs are attached to the root, OUs and accounts, and inherited down the OU
+# tree. The tree is walked once to get the SCPs of every account (level by
+# level), and accounts with the same SCPs share one effective set. Statements
+# are compiled once and indexed by service prefix, and decisions are memoized
+# per SCP, so bulk and what-if checks (e.g. 1,000 accounts x 500 actions) only
+# evaluate each distinct (SCP, action, region) once. When an SCP document or
+# an attachment changes, only the affected subtree is recomputed.
+# Evaluation (as AWS Organizations does):
+# --> An action is denied if any SCP from the root down to the account denies it
+# --> With "full_aws_access" (the default "FullAWSAccess" SCP of every target)
+#     allows are implicit. Otherwise every level needs an SCP that allows it.
+# --> A resource of "*" is "any resource": only statements for all resources apply
+# --> Without a requested region, statements with an "aws:RequestedRegion"
+#     condition can't be decided, so the decision is "region-dependent"
+################################################################################
+
+# Built-in imports
+import re
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+# Own imports
+from helpers.org_spec import OrgSpec
+from helpers.policy_library import PolicyLibrary
+from helpers.scp_optimizer import (
+    ROOT_TARGET,
+    account_target,
+    ou_target,
+    spec_attachments,
+)
+
+
+REGION_CONDITION_KEY = "aws:requestedregion"
+
+# Condition operators on strings (ARNs are compared as strings), as functions
+# of the policy values that return a matcher of the request values
+_STRING_OPERATORS = {
+    "stringequals": lambda values: frozenset(values).__contains__,
+    "stringequalsignorecase": lambda values: _equals_ignore_case(values),
+    "stringlike": lambda values: _wildcard_regex(values).fullmatch,
+    "arnequals": lambda values: frozenset(values).__contains__,
+    "arnlike": lambda values: _wildcard_regex(values).fullmatch,
+}
+
+_NEGATED_PREFIX = {"stringnot": "string", "arnnot": "arn"}
+
+
+@dataclass(frozen=True)
+class ScpDecision:
+    """
+    Result of an "is this action allowed?" query (truthy when allowed). A
+    region-dependent decision is not allowed until a region is given.
+    """
+
+    allowed: bool
+    reason: str
+    policy_id: Optional[str] = None
+    region_dependent: bool = False
+
+    def __bool__(self) -> bool:
+        return self.allowed
+
+
+@dataclass
+class WhatIfReport:
+    """
+    Decisions that change with a what-if change of SCP documents, by account
+    (construct ID) as sets of (action, region) pairs.
+    """
+
+    affected_accounts: List[str] = field(default_factory=list)
+    newly_denied: Dict[str, FrozenSet[Tuple[str, str]]] = field(default_factory=dict)
+    newly_allowed: Dict[str, FrozenSet[Tuple[str, str]]] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return (
+            "{} accounts under the changed SCPs, {} accounts with newly denied "
+            "and {} with newly allowed actions".format(
+                len(self.affected_accounts),
+                len(self.newly_denied),
+                len(self.newly_allowed),
+            )
+        )
+
+
+class ScpEvaluator:
+    """
+    Class with the effective SCPs of every account of the org spec.
+    """
+
+    def __init__(
+        self,
+        org_spec: OrgSpec,
+        policy_library: Optional[PolicyLibrary] = None,
+        full_aws_access: bool = True,
+    ) -> None:
+        """
+        :param org_spec (OrgSpec): Parsed organization spec.
+        :param policy_library (PolicyLibrary): SCP documents. Defaults to the "policies_dir" of the spec.
+        :param full_aws_access (bool): Every target has the default "FullAWSAccess" SCP. Defaults to True.
+        """
+        self.org_spec = org_spec
+        self.policy_library = policy_library or PolicyLibrary(org_spec.policies_dir)
+        self.full_aws_access = full_aws_access
+        self._documents = {
+            policy_spec.construct_id: policy_spec.document
+            for policy_spec in org_spec.policies
+        }
+        self._policies: Dict[str, _CompiledPolicy] = {
+            policy_id: _CompiledPolicy(policy_id, self.policy_library.document(name))
+            for policy_id, name in self._documents.items()
+        }
+        self._attachments: Dict[str, Tuple[str, ...]] = dict(spec_attachments(org_spec))
+
+        # OU tree index (targets of "scp_optimizer"), built in a single pass
+        self._accounts: Dict[str, str] = {}
+        self._children: Dict[str, List[str]] = {ROOT_TARGET: []}
+        for ou_spec in org_spec.organizational_units:
+            parent = (
+                ou_target(ou_spec.parent_path) if ou_spec.parent_path else ROOT_TARGET
+            )
+            self._children[parent].append(ou_target(ou_spec.path))
+            self._children[ou_target(ou_spec.path)] = []
+        for account_spec in org_spec.accounts:
+            parent = (
+                ou_target(account_spec.ou_path) if account_spec.ou_path else ROOT_TARGET
+            )
+            self._children[parent].append(account_target(account_spec.construct_id))
+            self._accounts[account_spec.construct_id] = account_spec.construct_id
+            self._accounts[account_spec.account_name] = account_spec.construct_id
+
+        self._levels: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+        self._interned: Dict[Tuple, Tuple] = {}
+        self._resolve_subtree(ROOT_TARGET, ())
+
+    def copy(self) -> "ScpEvaluator":
+        """
+        Method to get an independent evaluator (e.g. for what-if changes) that
+        shares the tree index and the compiled SCPs until they change.
+        """
+        evaluator = copy.copy(self)
+        evaluator._policies = dict(self._policies)
+        evaluator._documents = dict(self._documents)
+        evaluator._attachments = dict(self._attachments)
+        evaluator._levels = dict(self._levels)
+        evaluator._interned = dict(self._interned)
+        return evaluator
+
+    def account_policies(self, account: str) -> Tuple[str, ...]:
+        """
+        Method to get the SCPs that apply to an account (from the root down).
+
+        :param account (str): Construct ID or name of the account.
+        """
+        levels = self._levels[account_target(self._account_id(account))]
+        return tuple(
+            dict.fromkeys(policy_id for level in levels for policy_id in level)
+        )
+
+    def is_allowed(
+        self,
+        account: str,
+        action: str,
+        region: Optional[str] = None,
+        resource: str = "*",
+        context: Optional[Mapping[str, Any]] = None,
+    ) -> ScpDecision:
+        """
+        Method to check if the SCPs allow an action in an account.
+
+        :param account (str): Construct ID or name of the account.
+        :param action (str): IAM action, e.g. "ec2:RunInstances".
+        :param region (str): Requested region ("aws:RequestedRegion").
+        :param resource (str): Resource ARN. Defaults to "*" (any resource).
+        :param context (Mapping): Other condition keys of the request.
+        """
+        levels = self._levels[account_target(self._account_id(account))]
+        return self._decide(levels, action, region, resource, context)
+
+    def denied(
+        self,
+        actions: Iterable[str],
+        regions: Iterable[Optional[str]],
+        accounts: Optional[Iterable[str]] = None,
+    ) -> Dict[str, FrozenSet[Tuple[str, Optional[str]]]]:
+        """
+        Method to get the denied (action, region) pairs of many accounts. Each
+        distinct set of SCPs is evaluated once, and its accounts share the result.
+
+        :param actions (Iterable): IAM actions to check.
+        :param regions (Iterable): Requested regions to check.
+        :param accounts (Iterable): Construct IDs or names (default: all accounts).
+        :return: (dict) account construct ID -> denied (action, region) pairs.
+        """
+        checks = [(action, region) for action in actions for region in regions]
+        if accounts is None:
+            accounts = [spec.construct_id for spec in self.org_spec.accounts]
+        by_levels: Dict[Tuple, FrozenSet[Tuple[str, Optional[str]]]] = {}
+        result = {}
+        for account in accounts:
+            construct_id = self._account_id(account)
+            levels = self._levels[account_target(construct_id)]
+            if levels not in by_levels:
+                by_levels[levels] = frozenset(
+                    (action, region)
+                    for action, region in checks
+                    if not self._decide(levels, action, region, "*", None)
+                )
+            result[construct_id] = by_levels[levels]
+        return result
+
+    def update_document(self, name: str, document: Dict[str, Any]) -> List[str]:
+        """
+        Method to change a policy library document (recompiles the SCPs that
+        use it, and invalidates only the subtrees they are attached to).
+
+        :param name (str): Name of the document in the policy library.
+        :param document (dict): New policy document.
+        :return: (list) construct IDs of the affected accounts.
+        """
+        affected: Dict[str, None] = {}
+        for policy_id, document_name in self._documents.items():
+            if document_name == name:
+                self._policies[policy_id] = _CompiledPolicy(policy_id, document)
+                affected.update(dict.fromkeys(self._policy_accounts(policy_id)))
+        return list(affected)
+
+    def set_attachments(self, target: str, policy_ids: Iterable[str]) -> List[str]:
+        """
+        Method to change the SCPs attached to a target, recomputing only the
+        effective SCPs of its subtree.
+
+        :param target (str): "root", "ou:<path>" or "account:<construct ID>".
+        :param policy_ids (Iterable): SCP construct IDs attached to the target.
+        :return: (list) construct IDs of the affected accounts.
+        """
+        if target not in self._levels:
+            raise ValueError("Unknown SCP target '{}'".format(target))
+        policy_ids = tuple(policy_ids)
+        unknown = [
+            policy_id for policy_id in policy_ids if policy_id not in self._policies
+        ]
+        if unknown:
+            raise ValueError("Unknown SCPs: {}".format(", ".join(unknown)))
+        self._attachments[target] = policy_ids
+        parent_levels = self._levels[target][:-1]
+        return self._resolve_subtree(target, parent_levels)
+
+    def what_if(
+        self,
+        documents: Mapping[str, Dict[str, Any]],
+        actions: Iterable[str],
+        regions: Iterable[Optional[str]],
+    ) -> WhatIfReport:
+        """
+        Method to get the decisions that change if some policy documents are
+        replaced (this evaluator is not modified).
+
+        :param documents (Mapping): Document name -> new policy document.
+        :param actions (Iterable): IAM actions to check.
+        :param regions (Iterable): Requested regions to check.
+        """
+        actions, regions = list(actions), list(regions)
+        changed = self.copy()
+        affected: Dict[str, None] = {}
+        for name, document in documents.items():
+            affected.update(dict.fromkeys(changed.update_document(name, document)))
+        before = self.denied(actions, regions, affected)
+        after = changed.denied(actions, regions, affected)
+        report = WhatIfReport(affected_accounts=list(affected))
+        # Accounts with the same SCPs share their sets, so each diff is done once
+        diffs: Dict[Tuple[int, int], Tuple[FrozenSet, FrozenSet]] = {}
+        for account in affected:
+            key = (id(before[account]), id(after[account]))
+            if key not in diffs:
+                diffs[key] = (
+                    after[account] - before[account],
+                    before[account] - after[account],
+                )
+            newly_denied, newly_allowed = diffs[key]
+            if newly_denied:
+                report.newly_denied[account] = newly_denied
+            if newly_allowed:
+                report.newly_allowed[account] = newly_allowed
+        return report
+
+    def _account_id(self, account: str) -> str:
+        if account not in self._accounts:
+            raise ValueError("Unknown account '{}'".format(account))
+        return self._accounts[account]
+
+    def _resolve_subtree(self, target: str, parent_levels: Tuple) -> List[str]:
+        """
+        Method to compute the SCPs of each level for a target and its subtree
+        (in pre-order). Equal levels are interned, so accounts with the same
+        SCPs share one tuple (and one entry in the bulk checks).
+        """
+        accounts = []
+        pending = [(target, parent_levels)]
+        while pending:
+            node, parent_levels = pending.pop()
+            levels = parent_levels + (self._attachments.get(node, ()),)
+            self._levels[node] = self._interned.setdefault(levels, levels)
+            if node.startswith("account:"):
+                accounts.append(node[len("account:") :])
+            for child in self._children.get(node, ()):
+                pending.append((child, levels))
+        return accounts
+
+    def _policy_accounts(self, policy_id: str) -> List[str]:
+        accounts: Dict[str, None] = {}
+        for target, policy_ids in self._attachments.items():
+            if policy_id in policy_ids:
+                for account in self._subtree_accounts(target):
+                    accounts[account] = None
+        return list(accounts)
+
+    def _subtree_accounts(self, target: str) -> List[str]:
+        accounts, pending = [], [target]
+        while pending:
+            node = pending.pop()
+            if node.startswith("account:"):
+                accounts.append(node[len("account:") :])
+            pending.extend(self._children.get(node, ()))
+        return accounts
+
+    def _decide(
+        self,
+        levels: Tuple[Tuple[str, ...], ...],
+        action: str,
+        region: Optional[str],
+        resource: str,
+        context: Optional[Mapping[str, Any]],
+    ) -> ScpDecision:
+        # SCP (and "Sid") that decides it depending on the requested region
+        region_policy: Optional[Tuple[str, str]] = None
+        for level in levels:
+            for policy_id in level:
+                policy = self._policies[policy_id]
+                sid = policy.denies(action, region, resource, context)
+                if sid is not None:
+                    return ScpDecision(
+                        False,
+                        "Denied by {}{}".format(
+                            policy_id, " ({})".format(sid) if sid else ""
+                        ),
+                        policy_id,
+                    )
+                region_sid = policy.region_denies(action, region, resource, context)
+                if region_policy is None and region_sid is not None:
+                    region_policy = (policy_id, region_sid)
+        if not self.full_aws_access:
+            for index, level in enumerate(levels):
+                allows = {
+                    policy_id: self._policies[policy_id].allows(
+                        action, region, resource, context
+                    )
+                    for policy_id in level
+                }
+                if True in allows.values():
+                    continue
+                if None not in allows.values():
+                    return ScpDecision(
+                        False, "No SCP allows it at level {}".format(index)
+                    )
+                if region_policy is None:
+                    policy_id = next(
+                        p for p, allowed in allows.items() if allowed is None
+                    )
+                    region_policy = (policy_id, "")
+        if region_policy:
+            policy_id, sid = region_policy
+            return ScpDecision(
+                False,
+                "Depends on the requested region ({}{} has a condition on "
+                "aws:RequestedRegion)".format(
+                    policy_id, " ({})".format(sid) if sid else ""
+                ),
+                policy_id,
+                region_dependent=True,
+            )
+        return ScpDecision(True, "Allowed")
+
+
+class _Statement:
+    """
+    Compiled SCP statement (actions, resources and conditions).
+    """
+
+    def __init__(self, statement: Dict[str, Any]) -> None:
+        self.sid = statement.get("Sid", "")
+        self.not_action = "NotAction" in statement
+        action_patterns = _as_list(
+            statement.get("NotAction" if self.not_action else "Action", [])
+        )
+        self.actions = _wildcard_regex(action_patterns, ignore_case=True)
+        # Services of the actions, or None if it can match any service
+        self.services: Optional[Tuple[str, ...]] = None
+        if not self.not_action and all(
+            ":" in pattern and not re.search(r"[*?]", pattern.split(":", 1)[0])
+            for pattern in action_patterns
+        ):
+            self.services = tuple(
+                {pattern.split(":", 1)[0].lower() for pattern in action_patterns}
+            )
+        self.not_resource = "NotResource" in statement
+        self.resource_patterns = _as_list(
+            statement.get("NotResource" if self.not_resource else "Resource", "*")
+        )
+        self.resources = _wildcard_regex(self.resource_patterns)
+        conditions = [
+            (key.lower(), _compile_condition(operator, key, values))
+            for operator, keys in statement.get("Condition", {}).items()
+            for key, values in keys.items()
+        ]
+        self.conditions = [condition for _, condition in conditions]
+        self.region_conditioned = any(
+            key == REGION_CONDITION_KEY for key, _ in conditions
+        )
+        self.other_conditions = [
+            condition for key, condition in conditions if key != REGION_CONDITION_KEY
+        ]
+
+    def applies(self, action: str, resource: str) -> bool:
+        """
+        Method to check the action and resource of the statement (without
+        its conditions).
+        """
+        if bool(self.actions.fullmatch(action)) == self.not_action:
+            return False
+        if resource == "*":
+            # Only statements for every resource apply to "any resource"
+            return not self.not_resource and "*" in self.resource_patterns
+        return bool(self.resources.fullmatch(resource)) != self.not_resource
+
+    def matches(self, action: str, resource: str, context: Mapping[str, Any]) -> bool:
+        return self.applies(action, resource) and all(
+            condition(context) for condition in self.conditions
+        )
+
+    def matches_with_any_region(
+        self, action: str, resource: str, context: Mapping[str, Any]
+    ) -> bool:
+        """
+        Method to check if the statement matches for some requested region
+        (only its region conditions are left out).
+        """
+        return self.applies(action, resource) and all(
+            condition(context) for condition in self.other_conditions
+        )
+
+
+class _CompiledPolicy:
+    """
+    SCP with its statements indexed by service, and memoized decisions.
+    """
+
+    def __init__(self, policy_id: str, document: Dict[str, Any]) -> None:
+        self.policy_id = policy_id
+        self._statements: Dict[str, Dict[Optional[str], List[_Statement]]] = {
+            "Deny": {},
+            "Allow": {},
+        }
+        for statement in _as_list(document.get("Statement", [])):
+            compiled = _Statement(statement)
+            index = self._statements[statement.get("Effect", "Allow")]
+            for service in compiled.services or (None,):
+                index.setdefault(service, []).append(compiled)
+        self._decisions: Dict[
+            Tuple, Tuple[Optional[str], Optional[str], Optional[bool]]
+        ] = {}
+
+    def denies(self, action, region, resource, context) -> Optional[str]:
+        """
+        Method to get the "Sid" of the statement that denies the action ("" if
+        it has no "Sid"), or None if the SCP does not deny it.
+        """
+        return self._decide(action, region, resource, context)[0]
+
+    def region_denies(self, action, region, resource, context) -> Optional[str]:
+        """
+        Method to get the "Sid" of a statement that denies the action in some
+        regions, when no region is requested (None otherwise).
+        """
+        return self._decide(action, region, resource, context)[1]
+
+    def allows(self, action, region, resource, context) -> Optional[bool]:
+        """
+        Method to check if the SCP allows the action (None if it depends on
+        the region, when no region is requested).
+        """
+        return self._decide(action, region, resource, context)[2]
+
+    def _decide(
+        self, action, region, resource, context
+    ) -> Tuple[Optional[str], Optional[str], Optional[bool]]:
+        key = (action.lower(), region, resource)
+        if not context and key in self._decisions:
+            return self._decisions[key]
+        request = {k.lower(): value for k, value in (context or {}).items()}
+        if region is not None:
+            request[REGION_CONDITION_KEY] = region
+        # Without a requested region, the statements on it are left undecided
+        region_unknown = REGION_CONDITION_KEY not in request
+        service = key[0].split(":", 1)[0]
+
+        deny_sid = region_deny_sid = None
+        for statement in self._candidates("Deny", service):
+            if region_unknown and statement.region_conditioned:
+                if region_deny_sid is None and statement.matches_with_any_region(
+                    key[0], resource, request
+                ):
+                    region_deny_sid = statement.sid
+            elif statement.matches(key[0], resource, request):
+                deny_sid = statement.sid
+                break
+
+        allowed: Optional[bool] = False
+        for statement in self._candidates("Allow", service):
+            if region_unknown and statement.region_conditioned:
+                if statement.matches_with_any_region(key[0], resource, request):
+                    allowed = None
+            elif statement.matches(key[0], resource, request):
+                allowed = True
+                break
+
+        decision = (deny_sid, region_deny_sid, allowed)
+        if not context:
+            self._decisions[key] = decision
+        return decision
+
+    def _candidates(self, effect: str, service: str) -> List[_Statement]:
+        index = self._statements[effect]
+        return index.get(service, []) + index.get(None, [])
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, list) else [value]
+
+
+def _wildcard_regex(patterns: List[str], ignore_case: bool = False):
+    return re.compile(
+        "|".join(
+            re.escape(pattern).replace(r"\*", ".*").replace(r"\?", ".")
+            for pattern in patterns
+        )
+        or "(?!)",
+        re.IGNORECASE if ignore_case else 0,
+    )
+
+
+def _equals_ignore_case(values: List[str]):
+    lowered = frozenset(value.lower() for value in values)
+    return lambda value: value.lower() in lowered
+
+
+def _compile_condition(operator: str, key: str, values: Any):
+    """
+    Function to compile a condition of a statement (one operator and key)
+    into a function of the request context (lowercase keys).
+    """
+    name = operator.lower()
+    if_exists = name.endswith("ifexists")
+    if if_exists:
+        name = name[: -len("ifexists")]
+    key = key.lower()
+    values = [str(value) for value in _as_list(values)]
+
+    if name == "null":
+        return lambda context: (key not in context) == (values[0].lower() == "true")
+    if name == "bool":
+        return lambda context: (
+            if_exists
+            if key not in context
+            else str(context[key]).lower() in [value.lower() for value in values]
+        )
+
+    negated = False
+    for prefix, positive in _NEGATED_PREFIX.items():
+        if name.startswith(prefix):
+            name, negated = positive + name[len(prefix) :], True
+    if name not in _STRING_OPERATORS:
+        raise ValueError("Unsupported SCP condition operator '{}'".format(operator))
+    match = _STRING_OPERATORS[name](values)
+
+    def condition(context: Mapping[str, Any]) -> bool:
+        if key not in context:
+            # Negated operators match when the key is missing
+            return if_exists or negated
+        requested = [str(value) for value in _as_list(context[key])]
+        matched = any(match(value) for value in requested)
+        return matched != negated
+
+    return condition
@@ -0,0 +1,360 @@
+################################################################################
+# SCP SIZE OPTIMIZER (PURE PYTHON, RUNS AT SYNTH TIME)
+# AWS Organizations limits each SCP to 5,120 characters and each target (root,
+# OU or account) to 5 attached SCPs (one of them is the default "FullAWSAccess").
+# The optimizer minifies the documents, merges statements that only differ in
+# their "Action" list and packs the logical SCPs attached to exactly the same
+# targets into as few physical SCPs as possible (same effective permissions,
+# as SCPs attached to the same target are evaluated together).
+################################################################################
+
+# Built-in imports
+import re
+import json
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+# Own imports
+from helpers.org_spec import OrgSpec, PolicySpec
+from helpers.policy_library import PolicyLibrary
+
+
+MAX_SCP_SIZE = 5120
+
+MAX_SCPS_PER_TARGET = 5
+
+# The "FullAWSAccess" SCP is attached by AWS to every target by default
+RESERVED_SCPS_PER_TARGET = 1
+
+ROOT_TARGET = "root"
+
+POLICY_VERSION = "2012-10-17"
+
+MAX_POLICY_NAME_LENGTH = 128
+
+MAX_POLICY_DESCRIPTION_LENGTH = 512
+
+_WILDCARDS = re.compile(r"[*?]")
+
+
+@dataclass(frozen=True)
+class OptimizedPolicy:
+    """
+    Physical SCP created by the optimizer (one or more packed logical SCPs).
+    """
+
+    construct_id: str
+    policy_name: str
+    description: str
+    content: str
+    members: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ScpOptimization:
+    """
+    Result of the SCP optimization: physical policies and their attachments.
+    """
+
+    policies: Dict[str, OptimizedPolicy]
+    attachments: Dict[str, Tuple[str, ...]]
+    original_bytes: int
+    optimized_bytes: int
+    logical_policies: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.optimized_bytes
+
+    @property
+    def digest(self) -> str:
+        """
+        Stable hash of the packing of the whole org: the physical SCPs (their
+        "PolicyBundle" IDs depend on all the targets) and their attachments.
+        """
+        packing = {
+            "policies": {
+                construct_id: [
+                    policy.policy_name,
+                    policy.description,
+                    policy.content,
+                    policy.members,
+                ]
+                for construct_id, policy in self.policies.items()
+            },
+            "attachments": self.attachments,
+        }
+        document = json.dumps(packing, sort_keys=True)
+        return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+    def summary(self) -> str:
+        return (
+            "{} logical SCPs packed into {} physical SCPs, " "{} bytes saved ({} -> {})"
+        ).format(
+            self.logical_policies,
+            len(self.policies),
+            self.bytes_saved,
+            self.original_bytes,
+            self.optimized_bytes,
+        )
+
+
+def ou_target(path: str) -> str:
+    return "ou:{}".format(path)
+
+
+def account_target(construct_id: str) -> str:
+    return "account:{}".format(construct_id)
+
+
+def spec_attachments(org_spec: OrgSpec) -> Dict[str, Tuple[str, ...]]:
+    """
+    Function to get the logical SCPs attached to each target of the spec.
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :return: (dict) target -> logical policy construct ids.
+    """
+    attachments = {ROOT_TARGET: org_spec.root_policies}
+    for ou_spec in org_spec.organizational_units:
+        attachments[ou_target(ou_spec.path)] = ou_spec.policies
+    for account_spec in org_spec.accounts:
+        attachments[account_target(account_spec.construct_id)] = account_spec.policies
+    return {target: tuple(ids) for target, ids in attachments.items() if ids}
+
+
+def optimize_scps(
+    org_spec: OrgSpec,
+    policy_library: PolicyLibrary,
+    max_size: int = MAX_SCP_SIZE,
+    max_per_target: int = MAX_SCPS_PER_TARGET - RESERVED_SCPS_PER_TARGET,
+) -> ScpOptimization:
+    """
+    Function to compact and pack the SCPs of the spec.
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :param policy_library: (PolicyLibrary) library with the SCP documents.
+    :param max_size: (int) max characters of each physical SCP.
+    :param max_per_target: (int) max physical SCPs attached to each target.
+    :return: (ScpOptimization) the physical policies and their attachments.
+    :raises ValueError: if a single SCP or the SCPs of a target can't fit.
+    """
+    policy_specs = {spec.construct_id: spec for spec in org_spec.policies}
+    attachments = spec_attachments(org_spec)
+
+    # Logical SCPs attached to exactly the same targets can be packed together
+    targets_of: Dict[str, List[str]] = {}
+    for target, policy_ids in attachments.items():
+        for policy_id in dict.fromkeys(policy_ids):
+            targets_of.setdefault(policy_id, []).append(target)
+    groups: Dict[Tuple[str, ...], List[str]] = {}
+    for policy_id, targets in targets_of.items():
+        groups.setdefault(tuple(targets), []).append(policy_id)
+
+    original_bytes = 0
+    statements: Dict[str, List[Dict[str, Any]]] = {}
+    for policy_id in targets_of:
+        name = policy_specs[policy_id].document
+        document = policy_library.document(name)
+        # Size of the minified document embedded without the optimizer
+        original_bytes += len(policy_library.content(name))
+        statements[policy_id] = merge_statements(document.get("Statement", []))
+        if _document_size(statements[policy_id]) > max_size:
+            raise ValueError(
+                "SCP '{}' is over {} characters even after compacting it".format(
+                    policy_id, max_size
+                )
+            )
+
+    policies: Dict[str, OptimizedPolicy] = {}
+    physical_of: Dict[str, str] = {}
+    for policy_ids in groups.values():
+        for bundle, bundle_statements in _pack(policy_ids, statements, max_size):
+            policy = _build_policy(
+                [policy_specs[policy_id] for policy_id in bundle], bundle_statements
+            )
+            policies[policy.construct_id] = policy
+            physical_of.update({policy_id: policy.construct_id for policy_id in bundle})
+
+    optimized_attachments = {}
+    for target, policy_ids in attachments.items():
+        physical_ids = tuple(
+            dict.fromkeys(physical_of[policy_id] for policy_id in policy_ids)
+        )
+        if len(physical_ids) > max_per_target:
+            raise ValueError(
+                "Target '{}' needs {} SCPs after packing (max {})".format(
+                    target, len(physical_ids), max_per_target
+                )
+            )
+        optimized_attachments[target] = physical_ids
+
+    return ScpOptimization(
+        policies=policies,
+        attachments=optimized_attachments,
+        original_bytes=original_bytes,
+        optimized_bytes=sum(len(policy.content) for policy in policies.values()),
+        logical_policies=len(targets_of),
+    )
+
+
+def merge_statements(statements: Any) -> List[Dict[str, Any]]:
+    """
+    Function to merge the statements that only differ in their "Action" list
+    (e.g. "Deny" statements with the same "Condition" and "Resource"), in a
+    single pass. Actions covered by a wildcard of the same list are dropped.
+
+    :param statements: (list or dict) the "Statement" of a policy document.
+    :return: (list) the merged statements (in order of first appearance).
+    """
+    if isinstance(statements, dict):
+        statements = [statements]
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    result: List[Dict[str, Any]] = []
+    sids = set()
+    for statement in statements:
+        statement = dict(statement)
+        for key in ("Action", "NotAction"):
+            if key in statement:
+                statement[key] = _as_list(statement[key])
+        for key in ("Resource", "NotResource"):
+            if isinstance(statement.get(key), list) and len(statement[key]) == 1:
+                statement[key] = statement[key][0]
+        if "Action" in statement and "NotAction" not in statement:
+            rest = {k: v for k, v in statement.items() if k not in ("Sid", "Action")}
+            merge_key = json.dumps(rest, sort_keys=True)
+            if merge_key in merged:
+                merged[merge_key]["Action"].extend(statement["Action"])
+                continue
+            merged[merge_key] = statement
+        # Sids must be unique inside a policy (and they are optional)
+        if "Sid" in statement:
+            if statement["Sid"] in sids:
+                del statement["Sid"]
+            else:
+                sids.add(statement["Sid"])
+        result.append(statement)
+
+    for statement in result:
+        for key in ("Action", "NotAction"):
+            if key in statement:
+                actions = _drop_covered_actions(statement[key])
+                statement[key] = actions[0] if len(actions) == 1 else actions
+    return result
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, list) else [value]
+
+
+def _drop_covered_actions(actions: List[str]) -> List[str]:
+    """
+    Function to drop duplicated actions and the ones already matched by another
+    wildcard action of the list (e.g. "s3:GetObject" when "s3:*" is present).
+    """
+    unique = list(dict.fromkeys(actions))
+    patterns = [action for action in unique if _WILDCARDS.search(action)]
+    if not patterns:
+        return unique
+
+    # Trailing "*" patterns also cover the wildcard actions with their prefix
+    prefixes = tuple(
+        pattern[:-1].lower()
+        for pattern in patterns
+        if pattern.endswith("*") and not _WILDCARDS.search(pattern[:-1])
+    )
+    regex = re.compile(
+        "|".join(
+            re.escape(pattern.lower()).replace(r"\*", ".*").replace(r"\?", ".")
+            for pattern in patterns
+        )
+    )
+
+    result = []
+    for action in unique:
+        lowered = action.lower()
+        if _WILDCARDS.search(action):
+            covered = any(
+                lowered.startswith(prefix) and lowered != prefix + "*"
+                for prefix in prefixes
+            )
+        else:
+            covered = regex.fullmatch(lowered) is not None
+        if not covered:
+            result.append(action)
+    return result
+
+
+def _minify(statements: List[Dict[str, Any]]) -> str:
+    return json.dumps(
+        {"Version": POLICY_VERSION, "Statement": statements}, separators=(",", ":")
+    )
+
+
+def _document_size(statements: List[Dict[str, Any]]) -> int:
+    return len(_minify(statements))
+
+
+def _pack(
+    policy_ids: List[str],
+    statements: Dict[str, List[Dict[str, Any]]],
+    max_size: int,
+) -> List[Tuple[List[str], List[Dict[str, Any]]]]:
+    """
+    Function to pack logical SCPs into bins of "max_size" characters (first fit
+    decreasing), merging the statements of each bin (so SCPs that share their
+    conditions take less space together than apart).
+
+    :return: (list) tuples with the members of each bin and their statements.
+    """
+    order = {policy_id: index for index, policy_id in enumerate(policy_ids)}
+    sizes = {
+        policy_id: _document_size(statements[policy_id]) for policy_id in policy_ids
+    }
+    bins: List[Tuple[List[str], List[Dict[str, Any]]]] = []
+    for policy_id in sorted(policy_ids, key=lambda policy_id: -sizes[policy_id]):
+        for index, (members, _) in enumerate(bins):
+            # Statements are merged in spec order, for stable outputs
+            candidate = sorted(members + [policy_id], key=order.get)
+            merged = merge_statements(
+                [statement for member in candidate for statement in statements[member]]
+            )
+            if _document_size(merged) <= max_size:
+                bins[index] = (candidate, merged)
+                break
+        else:
+            bins.append(([policy_id], statements[policy_id]))
+    return sorted(bins, key=lambda packed: order[packed[0][0]])
+
+
+def _build_policy(
+    policy_specs: List[PolicySpec], statements: List[Dict[str, Any]]
+) -> OptimizedPolicy:
+    content = _minify(statements)
+    if len(policy_specs) == 1:
+        policy_spec = policy_specs[0]
+        return OptimizedPolicy(
+            construct_id=policy_spec.construct_id,
+            policy_name=policy_spec.policy_name,
+            description=policy_spec.description,
+            content=content,
+            members=(policy_spec.construct_id,),
+        )
+
+    members = tuple(policy_spec.construct_id for policy_spec in policy_specs)
+    digest = hashlib.sha256("/".join(members).encode()).hexdigest()[:8]
+    policy_name = "-".join(policy_spec.policy_name for policy_spec in policy_specs)
+    if len(policy_name) > MAX_POLICY_NAME_LENGTH:
+        policy_name = "{}-{}".format(
+            policy_name[: MAX_POLICY_NAME_LENGTH - len(digest) - 1], digest
+        )
+    return OptimizedPolicy(
+        construct_id="PolicyBundle{}".format(digest),
+        policy_name=policy_name,
+        description="Packed SCPs: {}".format(
+            ", ".join(policy_spec.policy_name for policy_spec in policy_specs)
+        )[:MAX_POLICY_DESCRIPTION_LENGTH],
+        content=content,
+        members=members,
+    )
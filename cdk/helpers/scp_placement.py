@@ -0,0 +1,224 @@
+################################################################################
+# SCP ATTACHMENT PLACEMENT (PURE PYTHON, RUNS AT SYNTH TIME)
+# SCPs are inherited from the root down to the OUs and accounts, so an SCP
+# already attached to an ancestor is redundant on its descendants, and the same
+# SCP attached to every child of an OU can be attached once to that OU.
+# The placement rewrites the attachments of the spec with fewer attachment
+# points, so there are fewer "PolicyAttachment" resources and more room in the
+# per-target quota:
+# --> Inherited attachments are always dropped (same effective SCPs of every
+#     target, in the spec or not)
+# --> Hoisting is opt-in ("scp_hoist_mode" of "ous" or "root"): the accounts of
+#     the spec keep the same effective SCPs, but the accounts and OUs that are
+#     not in the spec and live under a hoisted OU (or the root) also get them
+# --> Enabled with the "place_scps" CDK context value (before "optimize_scps")
+################################################################################
+
+# Built-in imports
+import dataclasses
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+# Own imports
+from helpers.org_spec import OrgSpec
+from helpers.scp_optimizer import (
+    MAX_SCPS_PER_TARGET,
+    RESERVED_SCPS_PER_TARGET,
+    ROOT_TARGET,
+    account_target,
+    ou_target,
+    spec_attachments,
+)
+
+
+# Targets that an SCP can be hoisted to: none, the OUs, or the OUs and the root
+SCP_HOIST_MODES = ("none", "ous", "root")
+
+
+@dataclass(frozen=True)
+class ScpHoist:
+    """
+    Attachments of an SCP to every child of an OU (or of the root), replaced
+    by a single attachment to the OU itself.
+    """
+
+    policy_id: str
+    target: str
+    replaced: Tuple[str, ...]
+
+    def __str__(self) -> str:
+        return "{} -> {} (instead of {} targets: {})".format(
+            self.policy_id, self.target, len(self.replaced), ", ".join(self.replaced)
+        )
+
+    def warning(self) -> str:
+        return (
+            "SCP '{}' is hoisted to {}, so it also applies to the accounts and "
+            "OUs under it that are not in the spec".format(self.policy_id, self.target)
+        )
+
+
+@dataclass(frozen=True)
+class ScpPlacement:
+    """
+    Result of the SCP placement: the spec with the placed attachments, the
+    hoisted attachments and the ones dropped as already inherited.
+    """
+
+    org_spec: OrgSpec
+    hoists: Tuple[ScpHoist, ...]
+    inherited: Tuple[Tuple[str, str], ...]
+    original_attachments: int
+    placed_attachments: int
+
+    @property
+    def attachments_saved(self) -> int:
+        return self.original_attachments - self.placed_attachments
+
+    def summary(self) -> str:
+        return (
+            "{} SCP attachments placed as {} ({} saved: {} hoisted to a common "
+            "OU, {} already inherited)"
+        ).format(
+            self.original_attachments,
+            self.placed_attachments,
+            self.attachments_saved,
+            len(self.hoists),
+            len(self.inherited),
+        )
+
+    def report(self) -> List[str]:
+        """
+        Method to get one line per hoisted or inherited attachment.
+        """
+        return [str(hoist) for hoist in self.hoists] + [
+            "{} -> dropped from {} (inherited)".format(policy_id, target)
+            for target, policy_id in self.inherited
+        ]
+
+    def warnings(self) -> List[str]:
+        """
+        Method to get one warning per hoist, as each one widens an attachment
+        to the targets of the parent that are not in the spec.
+        """
+        return [hoist.warning() for hoist in self.hoists]
+
+
+def place_scps(
+    org_spec: OrgSpec,
+    max_per_target: int = MAX_SCPS_PER_TARGET - RESERVED_SCPS_PER_TARGET,
+    hoist_mode: Optional[str] = None,
+) -> ScpPlacement:
+    """
+    Function to place the SCP attachments of the spec on fewer targets:
+    attachments already inherited from an ancestor are dropped. With a hoist
+    mode, then (from the deepest OUs up) an SCP attached to every child of an
+    OU is hoisted to the OU (and with "root", to the root), while it has room
+    for it. The accounts of the spec keep their effective SCPs, but a hoist
+    also applies the SCP to the accounts and OUs under the parent that are
+    not in the spec (see "ScpPlacement.warnings").
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :param max_per_target: (int) max SCPs attached to each target.
+    :param hoist_mode: (str) one of "none" (default), "ous" or "root".
+    :return: (ScpPlacement) the spec with the placed attachments and a report.
+    """
+    hoist_mode = hoist_mode or "none"
+    if hoist_mode not in SCP_HOIST_MODES:
+        raise ValueError(
+            "Invalid SCP hoist mode '{}', must be one of: {}".format(
+                hoist_mode, ", ".join(SCP_HOIST_MODES)
+            )
+        )
+    attached: Dict[str, List[str]] = {
+        target: list(dict.fromkeys(policy_ids))
+        for target, policy_ids in spec_attachments(org_spec).items()
+    }
+    original_attachments = sum(len(policy_ids) for policy_ids in attached.values())
+
+    # Targets directly under each OU path (the root is the empty path)
+    children: Dict[str, List[str]] = {"": []}
+    for ou_spec in org_spec.organizational_units:
+        children.setdefault(ou_spec.path, [])
+        children[ou_spec.parent_path].append(ou_target(ou_spec.path))
+    for account_spec in org_spec.accounts:
+        children[account_spec.ou_path].append(account_target(account_spec.construct_id))
+
+    # OUs are in pre-order, so the SCPs of each parent are known before its
+    # children (attachments inherited from an ancestor are dropped)
+    inherited: List[Tuple[str, str]] = []
+
+    def drop_inherited(target: str, above: Set[str]) -> Set[str]:
+        kept = []
+        for policy_id in attached.get(target, ()):
+            if policy_id in above:
+                inherited.append((target, policy_id))
+            else:
+                kept.append(policy_id)
+        if target in attached:
+            attached[target] = kept
+        return above.union(kept)
+
+    effective = {"": set(attached.get(ROOT_TARGET, ()))}
+    for ou_spec in org_spec.organizational_units:
+        effective[ou_spec.path] = drop_inherited(
+            ou_target(ou_spec.path), effective[ou_spec.parent_path]
+        )
+    for account_spec in org_spec.accounts:
+        drop_inherited(
+            account_target(account_spec.construct_id), effective[account_spec.ou_path]
+        )
+
+    # The reversed pre-order visits the children before their parent, so the
+    # hoisted SCPs of the children can be hoisted again
+    hoists: List[ScpHoist] = []
+    paths = []
+    if hoist_mode != "none":
+        paths = [ou_spec.path for ou_spec in reversed(org_spec.organizational_units)]
+    if hoist_mode == "root":
+        paths.append("")
+    for path in paths:
+        child_targets = children[path]
+        # Hoisting the SCP of a single child only moves its attachment
+        if len(child_targets) < 2:
+            continue
+        target = ou_target(path) if path else ROOT_TARGET
+        placed = attached.setdefault(target, [])
+        first, others = child_targets[0], child_targets[1:]
+        for policy_id in list(attached.get(first, ())):
+            if len(placed) >= max_per_target:
+                break
+            if not all(policy_id in attached.get(child, ()) for child in others):
+                continue
+            placed.append(policy_id)
+            for child in child_targets:
+                attached[child].remove(policy_id)
+            hoists.append(ScpHoist(policy_id, target, tuple(child_targets)))
+
+    def placed_policies(target: str) -> Tuple[str, ...]:
+        return tuple(attached.get(target, ()))
+
+    placed_spec = dataclasses.replace(
+        org_spec,
+        root_policies=placed_policies(ROOT_TARGET),
+        organizational_units=tuple(
+            dataclasses.replace(
+                ou_spec, policies=placed_policies(ou_target(ou_spec.path))
+            )
+            for ou_spec in org_spec.organizational_units
+        ),
+        accounts=tuple(
+            dataclasses.replace(
+                account_spec,
+                policies=placed_policies(account_target(account_spec.construct_id)),
+            )
+            for account_spec in org_spec.accounts
+        ),
+    )
+    return ScpPlacement(
+        org_spec=placed_spec,
+        hoists=tuple(hoists),
+        inherited=tuple(inherited),
+        original_attachments=original_attachments,
+        placed_attachments=sum(len(policy_ids) for policy_ids in attached.values()),
+    )
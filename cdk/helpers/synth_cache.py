@@ -0,0 +1,312 @@
+################################################################################
+# INCREMENTAL SYNTH CACHE (CONTENT-ADDRESSED SHARD ARTIFACTS)
+# Each sibling shard stack (one per top-level OU, see "sharding_mode=stacks") is
+# keyed by a hash of its OU subtree spec, the SCP files it references and a
+# "salt" with everything else that changes the rendered template (CDK versions,
+# source code, context values). On a hit, the shard is synthesized as an empty
+# placeholder and its cached artifacts (template, asset manifest, assets and
+# cloud assembly manifest entries) are restored into "cdk.out" after synth.
+################################################################################
+
+# Built-in imports
+import os
+import json
+import shutil
+import hashlib
+from dataclasses import asdict
+from importlib import metadata
+from typing import Any, Dict, List, Optional
+
+# Own imports
+from helpers.account_scheduler import AccountSchedule
+from helpers.org_spec import OrgSpec
+
+
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_SYNTH_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    ".cdk.synth-cache",
+)
+
+CDK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SynthCache:
+    """
+    Class that stores the synthesized artifacts of a stack in a directory per
+    cache key. Entries are evicted in least recently used order when the cache
+    grows over "max_entries".
+    """
+
+    def __init__(self, directory: str, max_entries: Optional[int] = None) -> None:
+        """
+        :param directory (str): Directory where the cache entries are stored.
+        :param max_entries (int): Max number of entries to keep (None for unbounded).
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def has(self, key: str) -> bool:
+        return os.path.isfile(os.path.join(self._entry_dir(key), "entry.json"))
+
+    def evict(self, key: str) -> None:
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def store_stack(self, key: str, outdir: str, artifact_id: str) -> None:
+        """
+        Method to copy the artifacts of a synthesized stack into the cache.
+
+        :param key (str): Cache key of the stack.
+        :param outdir (str): Cloud assembly directory (usually "cdk.out").
+        :param artifact_id (str): Artifact ID of the stack in the assembly.
+        """
+        with open(os.path.join(outdir, "manifest.json"), "r") as file:
+            artifacts = json.load(file)["artifacts"]
+        stack_artifact = artifacts[artifact_id]
+        artifact_ids = [artifact_id] + [
+            dependency
+            for dependency in stack_artifact.get("dependencies", [])
+            if artifacts.get(dependency, {}).get("type") == "cdk:asset-manifest"
+        ]
+
+        files = [stack_artifact["properties"]["templateFile"]]
+        for asset_artifact_id in artifact_ids[1:]:
+            assets_file = artifacts[asset_artifact_id]["properties"]["file"]
+            files.append(assets_file)
+            with open(os.path.join(outdir, assets_file), "r") as file:
+                assets = json.load(file)
+            for asset in assets.get("files", {}).values():
+                files.append(asset["source"]["path"])
+
+        entry_dir = self._entry_dir(key)
+        staging_dir = entry_dir + ".tmp"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        for relative_path in dict.fromkeys(files):
+            source = os.path.join(outdir, relative_path)
+            target = os.path.join(staging_dir, "files", relative_path)
+            if os.path.isdir(source):
+                shutil.copytree(source, target)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(source, target)
+
+        with open(os.path.join(staging_dir, "entry.json"), "w") as file:
+            json.dump(
+                {
+                    "format": CACHE_FORMAT_VERSION,
+                    "artifacts": {id: artifacts[id] for id in artifact_ids},
+                },
+                file,
+            )
+
+        # Replace the entry atomically (a failed copy never leaves half entries)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(staging_dir, entry_dir)
+        self._enforce_max_entries()
+
+    def restore_stack(self, key: str, outdir: str) -> List[str]:
+        """
+        Method to restore the cached artifacts of a stack into the assembly,
+        overwriting the placeholder stack that was synthesized instead.
+
+        :param key (str): Cache key of the stack.
+        :param outdir (str): Cloud assembly directory (usually "cdk.out").
+        :return: (list) the restored artifact IDs.
+        """
+        entry_dir = self._entry_dir(key)
+        with open(os.path.join(entry_dir, "entry.json"), "r") as file:
+            entry = json.load(file)
+
+        files_dir = os.path.join(entry_dir, "files")
+        for relative_path in os.listdir(files_dir):
+            source = os.path.join(files_dir, relative_path)
+            target = os.path.join(outdir, relative_path)
+            if os.path.isdir(source):
+                if not os.path.exists(target):
+                    shutil.copytree(source, target)
+            else:
+                shutil.copy2(source, target)
+
+        manifest_path = os.path.join(outdir, "manifest.json")
+        with open(manifest_path, "r") as file:
+            manifest = json.load(file)
+        manifest["artifacts"].update(entry["artifacts"])
+        with open(manifest_path, "w") as file:
+            json.dump(manifest, file, indent=2)
+
+        # Mark the entry as recently used (for the LRU eviction)
+        os.utime(entry_dir)
+        return list(entry["artifacts"])
+
+    def _enforce_max_entries(self) -> None:
+        if not self.max_entries:
+            return
+        entries = [
+            entry.path
+            for entry in os.scandir(self.directory)
+            if entry.is_dir() and not entry.name.endswith(".tmp")
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for entry_dir in entries[self.max_entries :]:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+
+def source_fingerprint() -> str:
+    """
+    Function to hash the Python sources of the CDK app and the versions of the
+    CDK libraries (any change to them can change the rendered templates).
+    """
+    digest = hashlib.sha256()
+    for package in ("aws-cdk-lib", "pepperize-cdk-organizations"):
+        try:
+            digest.update(
+                "{}=={}\n".format(package, metadata.version(package)).encode()
+            )
+        except metadata.PackageNotFoundError:
+            digest.update("{}\n".format(package).encode())
+    for folder, _, files in sorted(os.walk(CDK_DIR)):
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(folder, name)
+                digest.update(os.path.relpath(path, CDK_DIR).encode())
+                with open(path, "rb") as file:
+                    digest.update(file.read())
+    return digest.hexdigest()
+
+
+def shard_cache_keys(
+    org_spec: OrgSpec, account_schedule: AccountSchedule, salt: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Function to compute the cache key of each top-level OU (shard).
+
+    :param org_spec: (OrgSpec) the parsed organization spec.
+    :param account_schedule: (AccountSchedule) the account creation lanes.
+    :param salt: (dict) JSON serializable values that affect every shard.
+    :return: (dict) top-level OU path -> cache key.
+    """
+    policy_specs = {policy.construct_id: policy for policy in org_spec.policies}
+    policy_hashes: Dict[str, str] = {}
+
+    def policy_hash(policy_id: str) -> str:
+        # Each SCP file is read and hashed only once, even if attached many times
+        if policy_id not in policy_hashes:
+            with open(policy_specs[policy_id].file, "rb") as file:
+                policy_hashes[policy_id] = hashlib.sha256(file.read()).hexdigest()
+        return policy_hashes[policy_id]
+
+    shards: Dict[str, Dict[str, Any]] = {}
+    shard_of_account: Dict[str, str] = {}
+    for ou in org_spec.organizational_units:
+        top_level_path = ou.path.split("/", 1)[0]
+        shard = shards.setdefault(
+            top_level_path, {"ous": [], "accounts": [], "policies": {}, "after": set()}
+        )
+        shard["ous"].append(asdict(ou))
+        for policy_id in ou.policies:
+            shard["policies"][policy_id] = policy_hash(policy_id)
+    for account in org_spec.accounts:
+        if not account.ou_path:
+            continue
+        top_level_path = account.ou_path.split("/", 1)[0]
+        shard_of_account[account.construct_id] = top_level_path
+        shards[top_level_path]["accounts"].append(asdict(account))
+        for policy_id in account.policies:
+            shards[top_level_path]["policies"][policy_id] = policy_hash(policy_id)
+
+    # Lanes crossing shards become stack dependencies of the shard
+    for account_id, dependency_id in account_schedule.graph.edges():
+        shard = shard_of_account.get(account_id)
+        dependency_shard = shard_of_account.get(dependency_id, "")
+        if shard is not None and dependency_shard != shard:
+            shards[shard]["after"].add(dependency_shard)
+
+    keys = {}
+    for top_level_path, shard in shards.items():
+        shard["after"] = sorted(shard["after"])
+        payload = json.dumps(
+            {
+                "format": CACHE_FORMAT_VERSION,
+                "salt": salt,
+                # Tags of the root are inherited by every shard
+                "root_tags": org_spec.root_tags,
+                "shard": shard,
+            },
+            sort_keys=True,
+            default=list,
+        )
+        keys[top_level_path] = hashlib.sha256(payload.encode()).hexdigest()
+    return keys
+
+
+def find_missing_imports(outdir: str, artifact_ids: List[str]) -> List[str]:
+    """
+    Function to find "Fn::ImportValue" names used by the given stacks that no
+    stack of the assembly exports (e.g. a stale cache entry).
+    """
+    with open(os.path.join(outdir, "manifest.json"), "r") as file:
+        artifacts = json.load(file)["artifacts"]
+
+    exports, imports = set(), set()
+    for artifact_id, artifact in artifacts.items():
+        if artifact.get("type") != "aws:cloudformation:stack":
+            continue
+        with open(os.path.join(outdir, artifact["properties"]["templateFile"])) as file:
+            template = json.load(file)
+        for output in template.get("Outputs", {}).values():
+            if "Export" in output:
+                exports.add(json.dumps(output["Export"]["Name"], sort_keys=True))
+        if artifact_id in artifact_ids:
+            _collect_imports(template, imports)
+    return sorted(imports - exports)
+
+
+def _collect_imports(node: Any, imports: set) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "Fn::ImportValue":
+                imports.add(json.dumps(value, sort_keys=True))
+            else:
+                _collect_imports(value, imports)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_imports(value, imports)
+
+
+def update_synth_cache(
+    synth_cache: SynthCache,
+    shard_keys: Dict[str, str],
+    shard_artifact_ids: Dict[str, str],
+    cached_shards: List[str],
+    outdir: str,
+) -> None:
+    """
+    Function to run after "app.synth()": restores the cached shards into the
+    assembly and stores the shards that were built.
+
+    :param synth_cache: (SynthCache) the cache.
+    :param shard_keys: (dict) top-level OU path -> cache key.
+    :param shard_artifact_ids: (dict) top-level OU path -> stack artifact ID.
+    :param cached_shards: (list) top-level OU paths built as placeholders.
+    :param outdir: (str) cloud assembly directory (usually "cdk.out").
+    """
+    restored_ids = []
+    for path in cached_shards:
+        restored_ids.extend(synth_cache.restore_stack(shard_keys[path], outdir))
+
+    missing_imports = find_missing_imports(outdir, restored_ids)
+    if missing_imports:
+        for path in cached_shards:
+            synth_cache.evict(shard_keys[path])
+        raise RuntimeError(
+            "Stale synth cache entries evicted (missing exports: {}), "
+            "please synth again".format(", ".join(missing_imports))
+        )
+
+    for path, key in shard_keys.items():
+        if path not in cached_shards:
+            synth_cache.store_stack(key, outdir, shard_artifact_ids[path])
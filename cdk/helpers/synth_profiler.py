@@ -0,0 +1,184 @@
+################################################################################
+# SYNTH PROFILER (OPT-IN INSTRUMENTATION OF THE CDK APP)
+# Times each construction phase of the "OrganizationStack" (and "app.synth()"),
+# counts the jsii round-trips and the constructs created by each phase, and can
+# capture a full cProfile/pyinstrument profile. The report is written as JSON
+# into the cloud assembly directory ("cdk.out/synth-profile.json").
+# --> Enable with the "synth_profile" CDK context value or SYNTH_PROFILE=1
+# --> Choose "cprofile" or "pyinstrument" with "synth_profiler" / SYNTH_PROFILER
+# --> Count the constructs of each phase with "synth_profile_constructs" (two
+#     walks of the whole construct tree per phase, so it grows with the org)
+################################################################################
+
+# Built-in imports
+import os
+import json
+import time
+import cProfile
+import functools
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+# Own imports
+from helpers.jsii_metrics import JsiiCallCounter
+
+if TYPE_CHECKING:
+    from constructs import Construct
+
+
+REPORT_FILE_NAME = "synth-profile.json"
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class SynthProfiler:
+    """
+    Class that records the metrics of each synth phase. When disabled, every
+    method is a cheap no-op, so it can always be passed to the stacks.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        profiler: Optional[str] = None,
+        count_constructs: bool = False,
+    ) -> None:
+        """
+        :param enabled (bool): Enable the instrumentation.
+        :param profiler (str): Optional "cprofile" or "pyinstrument" capture.
+        :param count_constructs (bool): Count the constructs created by each phase (walks the construct tree before and after each phase).
+        """
+        if profiler and profiler not in PROFILERS:
+            raise ValueError(
+                "Invalid synth profiler '{}', must be one of: {}".format(
+                    profiler, ", ".join(PROFILERS)
+                )
+            )
+        self.enabled = enabled
+        self.profiler_name = profiler if enabled else None
+        self.count_constructs = enabled and count_constructs
+        self.phases: List[Dict[str, Any]] = []
+        self._profiler = None
+        self._start = time.perf_counter()
+
+    def start(self) -> None:
+        """
+        Method to start the optional cProfile/pyinstrument capture.
+        """
+        if self.profiler_name == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.profiler_name == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("--> pyinstrument is not installed, profile not captured")
+                self.profiler_name = None
+                return
+            self._profiler = Profiler()
+            self._profiler.start()
+
+    @contextmanager
+    def phase(self, name: str, scope: "Construct") -> Iterator[None]:
+        """
+        Context manager that records the wall time and jsii round-trips of the
+        phase (and the number of constructs created, with "count_constructs").
+
+        :param name (str): Name of the phase.
+        :param scope (Construct): Any construct of the app (to count constructs).
+        """
+        if not self.enabled:
+            yield
+            return
+
+        # Counted outside of the timed section, as it walks the whole tree
+        constructs_before = _count_constructs(scope) if self.count_constructs else 0
+        start = time.perf_counter()
+        with JsiiCallCounter() as counter:
+            yield
+        seconds = time.perf_counter() - start
+        metrics = {
+            "name": name,
+            "seconds": round(seconds, 6),
+            "jsii_calls": counter.calls,
+        }
+        if self.count_constructs:
+            metrics["constructs_created"] = _count_constructs(scope) - constructs_before
+        self.phases.append(metrics)
+
+    def write_report(self, outdir: str) -> Optional[str]:
+        """
+        Method to stop the profile capture and write the JSON report.
+
+        :param outdir (str): Cloud assembly directory (usually "cdk.out").
+        :return: (str) path of the report (None if disabled).
+        """
+        if not self.enabled:
+            return None
+
+        profile_file = None
+        if self.profiler_name == "cprofile":
+            self._profiler.disable()
+            profile_file = os.path.join(outdir, "synth-profile.prof")
+            self._profiler.dump_stats(profile_file)
+        elif self.profiler_name == "pyinstrument":
+            self._profiler.stop()
+            profile_file = os.path.join(outdir, "synth-profile.html")
+            with open(profile_file, "w") as file:
+                file.write(self._profiler.output_html())
+
+        report_file = os.path.join(outdir, REPORT_FILE_NAME)
+        with open(report_file, "w") as file:
+            json.dump(
+                {
+                    "total_seconds": round(time.perf_counter() - self._start, 6),
+                    "phases": self.phases,
+                    "hot_phase": max(
+                        self.phases, key=lambda phase: phase["seconds"], default={}
+                    ).get("name"),
+                    "profile_file": profile_file and os.path.basename(profile_file),
+                },
+                file,
+                indent=2,
+            )
+        return report_file
+
+
+def synth_phase(method: Callable) -> Callable:
+    """
+    Decorator for the construction methods of a stack with a "profiler"
+    attribute, to record each method as a synth phase.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.profiler.phase(method.__name__, self):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def create_synth_profiler(scope: "Construct") -> SynthProfiler:
+    """
+    Function to create the profiler from the CDK context or env vars.
+
+    :param scope: (Construct) the app (to read the CDK context).
+    """
+    enabled = scope.node.try_get_context("synth_profile")
+    if enabled is None:
+        enabled = os.environ.get("SYNTH_PROFILE")
+    profiler = scope.node.try_get_context("synth_profiler") or os.environ.get(
+        "SYNTH_PROFILER"
+    )
+    count_constructs = scope.node.try_get_context("synth_profile_constructs")
+    if count_constructs is None:
+        count_constructs = os.environ.get("SYNTH_PROFILE_CONSTRUCTS")
+    return SynthProfiler(
+        enabled=str(enabled).lower() in ("1", "true"),
+        profiler=profiler or None,
+        count_constructs=str(count_constructs).lower() in ("1", "true"),
+    )
+
+
+def _count_constructs(scope: "Construct") -> int:
+    return len(scope.node.root.node.find_all())
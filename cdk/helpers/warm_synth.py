@@ -0,0 +1,211 @@
+################################################################################
+# WARM SYNTH (ONE PYTHON INTERPRETER AND JSII KERNEL FOR MANY SYNTHS)
+# Most of a short synth is startup: importing "aws_cdk" and pepperize, which
+# loads their libraries into the jsii Node.js kernel before the stack even runs.
+# The synth server pays it once, and then runs "app.py" for each request with
+# the outdir, context, env vars and working directory of the requester. The own
+# modules ("helpers" and "stacks") are reloaded for every request, so code
+# changes are picked up without restarting the server.
+# Requests are JSON lines over a Unix socket (see "cdk/synth_server.py").
+################################################################################
+
+# Built-in imports
+import io
+import os
+import sys
+import json
+import runpy
+import socket
+import traceback
+import socketserver
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app.py")
+
+# The socket runs any synth it is sent, so it lives in the (default) outdir of
+# the repo instead of the shared temp directory, and only its owner can use it
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(APP_FILE)), "cdk.out", ".synth.sock"
+)
+SOCKET_MODE = 0o600
+
+# Modules of the app, reloaded for each request (this one keeps its state)
+RELOADED_PACKAGES = ("helpers", "stacks")
+
+# Env vars of the CDK CLI that the jsii kernel reads only once, at its startup
+CLI_ENV_VARS = ("CDK_OUTDIR", "CDK_CONTEXT_JSON", "CDK_CONTEXT_OVERFLOW_LOCATION")
+
+# Props of the "cdk.App" of the request being served (empty on a normal synth)
+_app_props: Dict[str, Any] = {}
+
+
+def synth_request_props() -> Dict[str, Any]:
+    """
+    Function to get the props for the "cdk.App" of "app.py". On a normal synth
+    the CDK CLI env vars are read by the kernel, but a warm kernel was started
+    before the request, so its outdir and context are passed explicitly.
+    """
+    return dict(_app_props)
+
+
+def read_cli_context(environ: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Function to read the CDK context passed by the CDK CLI in the env vars.
+
+    :param environ: (Mapping) env vars of the CDK CLI app process.
+    :return: (dict) the CDK context.
+    """
+    context = json.loads(environ.get("CDK_CONTEXT_JSON") or "{}")
+    # Big contexts are written by the CLI to a file instead
+    overflow_path = environ.get("CDK_CONTEXT_OVERFLOW_LOCATION")
+    if overflow_path:
+        with open(overflow_path, "r") as file:
+            context.update(json.load(file))
+    return context
+
+
+def warm_up() -> None:
+    """
+    Function to import the heavy libraries (and start the jsii kernel).
+    """
+    # The kernel inherits the env vars once, so they must not leak into it
+    for name in CLI_ENV_VARS:
+        os.environ.pop(name, None)
+    import aws_cdk  # noqa: F401
+    import pepperize_cdk_organizations  # noqa: F401
+
+
+def run_app(environ: Mapping[str, str], cwd: str) -> Tuple[int, str]:
+    """
+    Function to run "app.py" in this process, as if the CDK CLI had started it
+    with the given env vars and working directory.
+
+    :param environ: (Mapping) env vars of the CDK CLI app process.
+    :param cwd: (str) working directory of the CDK CLI app process.
+    :return: (tuple) exit status and output (stdout and stderr) of the app.
+    """
+    global _app_props
+
+    output = io.StringIO()
+    original_environ, original_cwd = dict(os.environ), os.getcwd()
+    try:
+        os.chdir(cwd)
+        os.environ.clear()
+        os.environ.update(environ)
+        _app_props = {"context": read_cli_context(environ)}
+        if environ.get("CDK_OUTDIR"):
+            _app_props["outdir"] = os.path.abspath(environ["CDK_OUTDIR"])
+        _unload_own_modules()
+        with redirect_stdout(output), redirect_stderr(output):
+            runpy.run_path(APP_FILE, run_name="__main__")
+        status = 0
+    except SystemExit as error:
+        status = error.code if isinstance(error.code, int) else 1
+    except Exception:
+        output.write(traceback.format_exc())
+        status = 1
+    finally:
+        _app_props = {}
+        os.environ.clear()
+        os.environ.update(original_environ)
+        os.chdir(original_cwd)
+    return status, output.getvalue()
+
+
+def _unload_own_modules() -> None:
+    for name in list(sys.modules):
+        if name == __name__:
+            continue
+        if any(
+            name == package or name.startswith(package + ".")
+            for package in RELOADED_PACKAGES
+        ):
+            del sys.modules[name]
+
+
+class SynthServer(socketserver.UnixStreamServer):
+    """
+    Unix socket server that runs the synth requests one at a time (the jsii
+    kernel is not thread safe), until a "stop" request is received.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH) -> None:
+        """
+        :param socket_path (str): path of the Unix socket to listen on.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.socket_path = socket_path
+        self.stopped = False
+        self.requests = 0
+        # Created with the mode already set, so it is never open to others
+        umask = os.umask(0o777 ^ SOCKET_MODE)
+        try:
+            super().__init__(socket_path, _SynthRequestHandler)
+        finally:
+            os.umask(umask)
+
+    def serve_until_stopped(self) -> None:
+        try:
+            while not self.stopped:
+                self.handle_request()
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+class _SynthRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        request = json.loads(self.rfile.readline())
+        if request.get("command") == "stop":
+            self.server.stopped = True
+            response = {"status": 0, "output": "--> Synth server stopped\n"}
+        else:
+            status, output = run_app(request["env"], request["cwd"])
+            self.server.requests += 1
+            response = {"status": status, "output": output}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def send_request(
+    request: Dict[str, Any], socket_path: str = DEFAULT_SOCKET_PATH
+) -> Tuple[int, str]:
+    """
+    Function to send a request to a running synth server.
+
+    :param request: (dict) "env" and "cwd" of the synth, or {"command": "stop"}.
+    :param socket_path: (str) path of the Unix socket of the server.
+    :return: (tuple) exit status and output of the request.
+    :raises OSError: if no server is listening on the socket.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as file:
+            response = json.loads(file.readline())
+    return response["status"], response["output"]
+
+
+def request_synth(
+    environ: Optional[Mapping[str, str]] = None,
+    cwd: Optional[str] = None,
+    socket_path: str = DEFAULT_SOCKET_PATH,
+) -> Tuple[int, str]:
+    """
+    Function to synthesize the app in a running synth server.
+
+    :param environ: (Mapping) env vars of the synth (default: this process).
+    :param cwd: (str) working directory of the synth (default: this process).
+    :param socket_path: (str) path of the Unix socket of the server.
+    :return: (tuple) exit status and output of the app.
+    :raises OSError: if no server is listening on the socket.
+    """
+    request = {
+        "env": dict(os.environ if environ is None else environ),
+        "cwd": cwd or os.getcwd(),
+    }
+    return send_request(request, socket_path)
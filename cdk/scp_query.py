@@ -0,0 +1,97 @@
+################################################################################
+# OFFLINE QUERIES OF THE EFFECTIVE SCPS (NO CDK SYNTH OR CREDENTIALS)
+# Answers "can this account call this action in this region?" with the SCPs
+# inherited from the root down to the account, and what-if checks of changed
+# SCP documents over all the accounts of the org spec.
+# --> python cdk/scp_query.py finance-prod ec2:RunInstances --region sa-east-1
+# --> python cdk/scp_query.py --what-if scp_allow_specific_regions=new.json \
+#         --actions ec2:RunInstances,s3:GetObject --regions sa-east-1,us-east-1
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import argparse
+
+# Own imports
+from helpers.org_spec import DEFAULT_ORG_SPEC_PATH, load_org_spec
+from helpers.scp_evaluator import ScpEvaluator
+
+
+DEFAULT_CONTEXT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cdk.context.json"
+)
+
+
+def read_list(value: str) -> list:
+    """
+    Function to read a comma separated list, or a file with one item per line.
+    """
+    if os.path.isfile(value):
+        with open(value, "r") as file:
+            return [line.strip() for line in file if line.strip()]
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline queries of the SCPs")
+    parser.add_argument("account", nargs="?", help="Account construct ID or name")
+    parser.add_argument("action", nargs="?", help="IAM action, e.g. ec2:RunInstances")
+    parser.add_argument("--region", help="Requested region")
+    parser.add_argument("--spec", help="Org spec file (default: from the context)")
+    parser.add_argument(
+        "--context", default=DEFAULT_CONTEXT_PATH, help="CDK context JSON file"
+    )
+    parser.add_argument(
+        "--what-if",
+        action="append",
+        default=[],
+        metavar="DOCUMENT=FILE",
+        help="Replace a policy library document (can be repeated)",
+    )
+    parser.add_argument("--actions", help="Actions to check (list or file)")
+    parser.add_argument("--regions", default="", help="Regions to check (list)")
+    args = parser.parse_args(argv)
+
+    with open(args.context, "r") as file:
+        context = json.load(file)
+    evaluator = ScpEvaluator(
+        load_org_spec(
+            args.spec or context.get("org_spec_path") or DEFAULT_ORG_SPEC_PATH
+        )
+    )
+    if args.what_if:
+        documents = {}
+        for value in args.what_if:
+            name, path = value.split("=", 1)
+            with open(path, "r") as file:
+                documents[name] = json.load(file)
+        report = evaluator.what_if(
+            documents,
+            read_list(args.actions or args.action or ""),
+            read_list(args.regions) or [args.region],
+        )
+        for title, changes in (
+            ("newly denied", report.newly_denied),
+            ("newly allowed", report.newly_allowed),
+        ):
+            for account, checks in changes.items():
+                for action, region in sorted(checks, key=str):
+                    print("{} {}: {} in {}".format(title, account, action, region))
+        print("--> What-if: {}".format(report.summary()))
+        return 0
+
+    if not args.account or not args.action:
+        parser.error("account and action are required (or use --what-if)")
+    decision = evaluator.is_allowed(args.account, args.action, args.region)
+    print("SCPs: {}".format(", ".join(evaluator.account_policies(args.account))))
+    if decision.region_dependent:
+        print("--> REGION-DEPENDENT: {} (use --region)".format(decision.reason))
+        return 2
+    print("--> {}: {}".format("ALLOWED" if decision else "DENIED", decision.reason))
+    return 0 if decision else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,18 +7,22 @@
 ################################################################################
 
 # Built-in imports
-import os
-import json
+import re
+from typing import Dict, Iterable, List, Optional
 
 # External imports
 from aws_cdk import (
+    Aspects,
     Stack,
     CfnOutput,
+    NestedStack,
     RemovalPolicy,
+    aws_ssm as ssm,
 )
 from constructs import Construct
 from pepperize_cdk_organizations import (
     Account,
+    DependencyChain,
     FeatureSet,
     Organization,
     OrganizationalUnit,
@@ -26,6 +30,30 @@ from pepperize_cdk_organizations import (
     PolicyType,
 )
 
+# Own imports
+from helpers.account_scheduler import (
+    DEFAULT_ACCOUNT_CREATION_LANES,
+    schedule_account_lanes,
+)
+from helpers.org_manifest import OUTPUTS_MODES, chunk_manifest, manifest_path
+from helpers.org_spec import AccountSpec, OrgSpec, load_org_spec
+from helpers.org_tags import SPEC_TAG_PRIORITY, resolve_org_tags
+from helpers.policy_library import PolicyLibrary
+from helpers.scp_optimizer import (
+    ROOT_TARGET,
+    ScpOptimization,
+    account_target,
+    optimize_scps,
+    ou_target,
+    spec_attachments,
+)
+from helpers.synth_profiler import SynthProfiler, synth_phase
+
+
+# Sharding modes: all resources in this stack ("none"), one nested stack per
+# top-level OU ("nested") or one sibling stack per top-level OU ("stacks")
+SHARDING_MODES = ("none", "nested", "stacks")
+
 
 class OrganizationStack(Stack):
     """
@@ -33,42 +61,81 @@ class OrganizationStack(Stack):
     """
 
     def __init__(
-        self, scope: Construct, construct_id: str, deployment_environment: str, **kwargs
+        self,
+        scope: Construct,
+        construct_id: str,
+        deployment_environment: str,
+        org_spec: Optional[OrgSpec] = None,
+        account_creation_lanes: int = DEFAULT_ACCOUNT_CREATION_LANES,
+        sharding_mode: str = "none",
+        cached_shards: Iterable[str] = (),
+        profiler: Optional[SynthProfiler] = None,
+        policy_library: Optional[PolicyLibrary] = None,
+        optimize_policies: bool = False,
+        outputs_mode: str = "outputs",
+        base_tags: Optional[Dict[str, str]] = None,
+        **kwargs
     ) -> None:
         """
         :param scope (Construct): Parent of this stack, usually an ``App`` or a ``Stage``, but could be any construct.
         :param construct_id (str): The construct ID of this stack.
         :param main_resources_name (str): The main solution name being deployed.
         :param deployment_environment (str): Value that represents the deployment environment. For example: "dev" or "prod".
+        :param org_spec (OrgSpec): Parsed organization spec with the OUs, accounts and SCPs. Defaults to "stacks/org_spec.json".
+        :param account_creation_lanes (int): Number of parallel account creation lanes. Defaults to 1 (single serial chain).
+        :param sharding_mode (str): One of "none", "nested" or "stacks", to split the org by top-level OU. Defaults to "none".
+        :param cached_shards (Iterable[str]): Top-level OU paths whose sibling shard is restored from the synth cache (only built as placeholders).
+        :param profiler (SynthProfiler): Optional profiler to record the metrics of each construction phase.
+        :param policy_library (PolicyLibrary): SCP documents library (can be shared between stacks). Defaults to the "policies_dir" of the org spec.
+        :param optimize_policies (bool): Compact, merge and pack the SCPs to fit the AWS Organizations quotas. Defaults to False.
+        :param outputs_mode (str): One of "outputs" (one output per account) or "manifest" (compact org manifest in SSM). Defaults to "outputs".
+        :param base_tags (dict): Tags applied to the whole app, only counted against the tags quota when validating the tags of the spec.
         """
         super().__init__(scope, construct_id, **kwargs)
 
+        if sharding_mode not in SHARDING_MODES:
+            raise ValueError(
+                "Invalid sharding_mode '{}', must be one of: {}".format(
+                    sharding_mode, ", ".join(SHARDING_MODES)
+                )
+            )
+        if cached_shards and sharding_mode != "stacks":
+            raise ValueError("cached_shards requires sharding_mode 'stacks'")
+        if outputs_mode not in OUTPUTS_MODES:
+            raise ValueError(
+                "Invalid outputs_mode '{}', must be one of: {}".format(
+                    outputs_mode, ", ".join(OUTPUTS_MODES)
+                )
+            )
+
         self.construct_id = construct_id
         self.deployment_environment = deployment_environment
+        self.sharding_mode = sharding_mode
+        self.outputs_mode = outputs_mode
+        self.shard_env = kwargs.get("env")
+        self.cached_shards = frozenset(cached_shards)
+        self.profiler = profiler or SynthProfiler()
+        self.org_spec = org_spec or load_org_spec()
+        self.policy_library = policy_library or PolicyLibrary(
+            self.org_spec.policies_dir
+        )
+        self.optimize_policies = optimize_policies
+        self.org_tags = resolve_org_tags(self.org_spec, base_tags)
+        # Imported accounts also call "CreateAccount", so they share the lanes
+        self.account_schedule = schedule_account_lanes(
+            [account_spec.construct_id for account_spec in self.org_spec.accounts],
+            account_creation_lanes,
+        )
 
         # AWS Organization creation, services configuration and SCPs
         self.create_root_organization()
         self.configure_organization_services()
         self.configure_service_control_policies()
 
-        # Create "sandbox" OU with inner OUs and accounts inside
-        self.create_ou_sandbox()
-        self.create_accounts_inside_ou_sandbox()
-
-        # Create "infrastructure" OU with inner OUs and accounts inside
-        self.create_ou_infrastructure()
-        self.create_accounts_inside_ou_infrastructure()
-
-        # Create "workloads" OU with inner OUs and accounts inside
-        self.create_ou_workloads()
-        self.create_ou_finance()
-        self.create_accounts_inside_ou_finance()
-        self.create_ou_marketing()
-        self.create_accounts_inside_ou_marketing()
-
-        # Create "policy_staging_tests" OU with inner OUs and accounts inside
-        self.create_ou_policy_staging_tests()
-        self.create_accounts_inside_ou_policy_staging_tests()
+        # Create OUs and accounts from the org spec (single linear pass)
+        self.create_shards()
+        self.create_organizational_units()
+        self.create_accounts()
 
         # !IMPORTANT: this is mandatory for adding CDK dependencies for each account
         self.add_cdk_accounts_dependencies()  # DO NOT REMOVE!
@@ -76,6 +143,7 @@ class OrganizationStack(Stack):
         # Create CloudFormation outputs
         self.generate_cloudformation_outputs()
 
+    @synth_phase
     def create_root_organization(self):
         """
         Method that creates the AWS Organization (root).
@@ -85,7 +153,9 @@ class OrganizationStack(Stack):
             "RootOrganization",
             feature_set=FeatureSet.ALL,
         )
+        self._set_spec_tags(self.organization.root, self.org_tags.root)
 
+    @synth_phase
     def configure_organization_services(self):
         """
         Method that configures the AWS Organization with the desired enabled
@@ -105,296 +175,262 @@ class OrganizationStack(Stack):
         # Enable Service Control Policies (SCPs)
         self.organization.enable_policy_type(PolicyType.SERVICE_CONTROL_POLICY)
 
+    @synth_phase
     def configure_service_control_policies(self):
         """
         Method that configures the AWS Organization with the desired Service
-        Control Policies (SCPs) at organization level.
-        """
-
-        # Get OS path to SCPs files and load them (for easier read/write of SCPs)
-        path_scp_prevent_leaving_org = os.path.join(
-            os.path.dirname(__file__),
-            "scp_prevent_leaving_org.json",
-        )
-        with open(path_scp_prevent_leaving_org, "r") as file:
-            scp_prevent_leaving_org = json.load(file)
-
-        path_scp_allow_specific_regions = os.path.join(
-            os.path.dirname(__file__),
-            "scp_allow_specific_regions.json",
-        )
-        with open(path_scp_allow_specific_regions, "r") as file:
-            scp_allow_specific_regions = json.load(file)
-
-        # SCP for preventing accounts of leaving organization
-        self.policy_deny_leave_org = Policy(
-            self,
-            "PolicyDenyLeave",
-            content=json.dumps(scp_prevent_leaving_org),
-            policy_name="PreventLeavingOrganization",
-            policy_type=PolicyType.SERVICE_CONTROL_POLICY,
-            description="SCP to prevent accounts from leaving the organization",
-        )
-        self.organization.attach_policy(self.policy_deny_leave_org)
-
-        # SCP for only allow access to specific regions in AWS (deny others)
-        self.policy_allow_specific_regions = Policy(
-            self,
-            "PolicyAllowSpecificRegions",
-            content=json.dumps(scp_allow_specific_regions),
-            policy_name="AllowSpecificRegions",
-            policy_type=PolicyType.SERVICE_CONTROL_POLICY,
-            description="SCP to only allow access to specific AWS Regions",
-        )
-        self.organization.attach_policy(self.policy_allow_specific_regions)
-
-    def create_ou_sandbox(self):
-        """
-        Method that creates inner Organizational Units (OUs) inside the AWS
-        Organization for "Sandbox".
-        """
-        self.top_level_ou_sandbox = OrganizationalUnit(
-            self,
-            "SandboxOU",
-            parent=self.organization.root,
-            organizational_unit_name="sandbox",
-        )
-
-    def create_accounts_inside_ou_sandbox(self):
-        """
-        Method that creates AWS Accounts inside the Organizational Units (OUs)
-        for "Sandbox".
-        """
-        self.account_sandbox_1 = Account(
-            self,
-            "SandboxAccount1",
-            account_name="san99tiago-sandbox-1",
-            email="san99tiagodemo+san99tiago-sandbox-1@gmail.com",
-            parent=self.top_level_ou_sandbox,
-            role_name="OrganizationAccountAccessRole",
-        )
-
-        # # DELETED TO AVOID LIMIT QUOTA OF 10 ACCOUNTS IN DEMO
-        # self.account_sandbox_2 = Account(
-        #     self,
-        #     "SandboxAccount2",
-        #     account_name="san99tiago-sandbox-2",
-        #     email="san99tiagodemo+san99tiago-sandbox-2@gmail.com",
-        #     parent=self.top_level_ou_sandbox,
-        #     role_name="OrganizationAccountAccessRole",
-        # )
-
-    def create_ou_infrastructure(self):
-        """
-        Method that creates inner Organizational Units (OUs) inside the AWS
-        Organization for "Infrastructure".
-        """
-        self.top_level_ou_infrastructure = OrganizationalUnit(
-            self,
-            "OUInfrastructure",
-            parent=self.organization.root,
-            organizational_unit_name="infrastructure",
-        )
-        self.ou_infrastructure_non_prod = OrganizationalUnit(
-            self,
-            "OUInfrastructureNonProd",
-            parent=self.top_level_ou_infrastructure,
-            organizational_unit_name="non-prod",
-        )
-        self.ou_infrastructure_prod = OrganizationalUnit(
-            self,
-            "OUInfrastructureProd",
-            parent=self.top_level_ou_infrastructure,
-            organizational_unit_name="prod",
-        )
-
-    def create_accounts_inside_ou_infrastructure(self):
-        """
-        Method that creates AWS Accounts inside the Organizational Units (OUs)
-        for "Infrastructure".
-        """
-        self.account_shared_services_non_prod = Account(
-            self,
-            "AccountSharedServicesNonProd",
-            account_name="shared-services-non-prod",
-            email="san99tiagodemo+shared-services-non-prod@gmail.com",
-            parent=self.ou_infrastructure_non_prod,
-            role_name="OrganizationAccountAccessRole",
-        )
-        self.account_shared_services_prod = Account(
-            self,
-            "AccountSharedServicesProd",
-            account_name="shared-services-prod",
-            email="san99tiagodemo+shared-services-prod@gmail.com",
-            parent=self.ou_infrastructure_prod,
-            role_name="OrganizationAccountAccessRole",
-        )
-
-    def create_ou_workloads(self):
-        """
-        Method that creates inner Organizational Units (OUs) inside the AWS
-        Organization for "Workloads".
-        """
-        self.top_level_ou_workloads = OrganizationalUnit(
-            self,
-            "OUWorkloads",
-            parent=self.organization.root,
-            organizational_unit_name="workloads",
-        )
-
-    def create_ou_finance(self):
-        """
-        Method that creates inner Organizational Units (OUs) inside the AWS
-        Organization for "Finance".
-        """
-        self.ou_finance = OrganizationalUnit(
-            self,
-            "OUFinance",
-            parent=self.top_level_ou_workloads,
-            organizational_unit_name="finance",
-        )
-        self.ou_finance_non_prod = OrganizationalUnit(
-            self,
-            "OUFinanceNonProd",
-            parent=self.ou_finance,
-            organizational_unit_name="non-prod",
-        )
-        self.ou_finance_prod = OrganizationalUnit(
-            self,
-            "OUFinanceProd",
-            parent=self.ou_finance,
-            organizational_unit_name="prod",
-        )
-
-    def create_accounts_inside_ou_finance(self):
-        """
-        Method that creates AWS Accounts inside the Organizational Units (OUs)
-        for "Finance".
-        """
-        self.account_finance_dev = Account(
-            self,
-            "AccountFinanceDev",
-            account_name="finance-dev",
-            email="san99tiagodemo+finance-dev@gmail.com",
-            parent=self.ou_finance_non_prod,
-            role_name="OrganizationAccountAccessRole",
-        )
-        self.account_finance_qa = Account(
-            self,
-            "AccountFinanceQA",
-            account_name="finance-qa",
-            email="san99tiagodemo+finance-qa@gmail.com",
-            parent=self.ou_finance_non_prod,
-            role_name="OrganizationAccountAccessRole",
-        )
-        self.account_finance_prod = Account(
-            self,
-            "AccountFinanceProd",
-            account_name="finance-prod",
-            email="san99tiagodemo+finance-prod@gmail.com",
-            parent=self.ou_finance_prod,
-            role_name="OrganizationAccountAccessRole",
-        )
-
-    def create_ou_marketing(self):
-        """
-        Method that creates inner Organizational Units (OUs) inside the AWS
-        Organization for "Marketing".
-        """
-        self.ou_marketing = OrganizationalUnit(
-            self,
-            "OUMarketing",
-            parent=self.top_level_ou_workloads,
-            organizational_unit_name="marketing",
-        )
-        self.ou_marketing_non_prod = OrganizationalUnit(
-            self,
-            "OUMarketingNonProd",
-            parent=self.ou_marketing,
-            organizational_unit_name="non-prod",
-        )
-        self.ou_marketing_prod = OrganizationalUnit(
-            self,
-            "OUMarketingProd",
-            parent=self.ou_marketing,
-            organizational_unit_name="prod",
-        )
-
-    def create_accounts_inside_ou_marketing(self):
-        """
-        Method that creates AWS Accounts inside the Organizational Units (OUs)
-        for "Marketing".
-        """
-        self.account_marketing_dev = Account(
-            self,
-            "AccountMarketingDev",
-            account_name="marketing-dev",
-            email="san99tiagodemo+marketing-dev@gmail.com",
-            parent=self.ou_marketing_non_prod,
-            role_name="OrganizationAccountAccessRole",
-            removal_policy=RemovalPolicy.RETAIN,
-            import_on_duplicate=True,
-        )
-
-        self.account_marketing_prod = Account(
-            self,
-            "AccountMarketingProd",
-            account_name="marketing-prod",
-            email="san99tiagodemo+marketing-prod@gmail.com",
-            parent=self.ou_marketing_prod,
-            role_name="OrganizationAccountAccessRole",
-        )
-
-    def create_ou_policy_staging_tests(self):
-        """
-        Method that creates inner Organizational Units (OUs) inside the AWS
-        Organization for "PolicyStagingTests".
-        """
-        self.top_level_ou_policy_staging_tests = OrganizationalUnit(
-            self,
-            "OUPolicyStagingTests",
-            parent=self.organization.root,
-            organizational_unit_name="policy-staging-tests",
-        )
-
-    def create_accounts_inside_ou_policy_staging_tests(self):
-        """
-        Method that creates AWS Accounts inside the Organizational Units (OUs)
-        for "PolicyStagingTests".
-        """
-        self.account_policy_staging_tests = Account(
-            self,
-            "AccountPolicyStagingTests",
-            account_name="policy-staging-tests",
-            email="san99tiagodemo+policy-staging-tests@gmail.com",
-            parent=self.top_level_ou_policy_staging_tests,
-            role_name="OrganizationAccountAccessRole",
-        )
-
+        Control Policies (SCPs) referenced at organization (root) level. The
+        SCPs referenced by OUs and accounts are created when first attached,
+        so SCPs of the spec that are not attached anywhere are not created
+        (and deleted by the next deployment if they were deployed before).
+        """
+        self.policies: Dict[str, Policy] = {}
+        self.policy_specs = {spec.construct_id: spec for spec in self.org_spec.policies}
+        attached = {
+            policy_id
+            for policy_ids in spec_attachments(self.org_spec).values()
+            for policy_id in policy_ids
+        }
+        self.unattached_policies = [
+            policy_id for policy_id in self.policy_specs if policy_id not in attached
+        ]
+        self.scp_optimization: Optional[ScpOptimization] = None
+        if self.optimize_policies:
+            self.scp_optimization = optimize_scps(self.org_spec, self.policy_library)
+        for policy in self.get_target_policies(
+            ROOT_TARGET, self.org_spec.root_policies
+        ):
+            self.organization.attach_policy(policy)
+
+    def get_policy(self, policy_id: str) -> Policy:
+        """
+        Method to get the shared SCP construct for the given policy ID (spec
+        policy, or physical policy when optimized). It is created only once,
+        no matter how many targets it is attached to.
+        """
+        if policy_id not in self.policies:
+            if self.scp_optimization:
+                policy_spec = self.scp_optimization.policies[policy_id]
+                content = policy_spec.content
+            else:
+                policy_spec = self.policy_specs[policy_id]
+                content = self.policy_library.content(policy_spec.document)
+            self.policies[policy_id] = Policy(
+                self,
+                policy_id,
+                content=content,
+                policy_name=policy_spec.policy_name,
+                policy_type=PolicyType.SERVICE_CONTROL_POLICY,
+                description=policy_spec.description,
+            )
+        return self.policies[policy_id]
+
+    def get_target_policies(
+        self, target: str, policy_ids: Iterable[str]
+    ) -> List[Policy]:
+        """
+        Method to get the SCP constructs to attach to a target (root, OU or
+        account), given the spec policy IDs attached to it.
+        """
+        if self.scp_optimization:
+            policy_ids = self.scp_optimization.attachments.get(target, ())
+        return [self.get_policy(policy_id) for policy_id in policy_ids]
+
+    @synth_phase
+    def create_shards(self):
+        """
+        Method that creates one shard (nested or sibling stack) per top-level
+        OU, to keep each stack under the CloudFormation resources and outputs
+        limits. Cross-stack references are wired up automatically by CDK.
+        """
+        self.shards: Dict[str, Stack] = {}
+        if self.sharding_mode == "none":
+            return
+
+        for ou_spec in self.org_spec.organizational_units:
+            if ou_spec.parent_path:
+                continue
+            if self.sharding_mode == "nested":
+                shard = NestedStack(self, "{}Shard".format(ou_spec.construct_id))
+            else:
+                shard = Stack(
+                    self.node.scope,
+                    "{}-{}".format(
+                        self.construct_id, re.sub(r"[^A-Za-z0-9-]", "-", ou_spec.name)
+                    ),
+                    env=self.shard_env,
+                    description="Shard of {} for the {} OU in {} environment".format(
+                        self.construct_id, ou_spec.name, self.deployment_environment
+                    ),
+                )
+                # Sibling stacks are not visited by the aspect of this stack
+                Aspects.of(shard).add(DependencyChain())
+                shard.add_dependency(self)
+            self.shards[ou_spec.path] = shard
+
+        if self.sharding_mode == "stacks":
+            self.export_shared_values()
+
+    def export_shared_values(self):
+        """
+        Method that explicitly exports the values that sibling shards import
+        (root ID and IDs of SCPs attached inside shards). This keeps the
+        exports of this stack stable, even if some shards are restored from
+        the synth cache instead of being built.
+        """
+        self.export_value(self.organization.root.identifier())
+        shard_policies = [
+            policy
+            for ou_spec in self.org_spec.organizational_units
+            for policy in self.get_target_policies(
+                ou_target(ou_spec.path), ou_spec.policies
+            )
+        ] + [
+            policy
+            for account_spec in self.org_spec.accounts
+            for policy in self.get_target_policies(
+                account_target(account_spec.construct_id), account_spec.policies
+            )
+        ]
+        for policy in dict.fromkeys(shard_policies):
+            self.export_value(policy.policy_id)
+
+    def _is_cached(self, path: str) -> bool:
+        """
+        Method to check if the given OU path is inside a cached shard.
+        """
+        return bool(path) and path.split("/", 1)[0] in self.cached_shards
+
+    def _get_scope(self, path: str) -> Construct:
+        """
+        Method to get the scope (this stack or a shard) for the given OU path.
+        """
+        if not self.shards or not path:
+            return self
+        return self.shards[path.split("/", 1)[0]]
+
+    @synth_phase
+    def create_organizational_units(self):
+        """
+        Method that creates the Organizational Units (OUs) inside the AWS
+        Organization. OUs in the spec are in pre-order, so each parent is
+        always created before its children.
+        """
+        self.organizational_units: Dict[str, OrganizationalUnit] = {}
+        for ou_spec in self.org_spec.organizational_units:
+            if self._is_cached(ou_spec.path):
+                continue
+            organizational_unit = OrganizationalUnit(
+                self._get_scope(ou_spec.path),
+                ou_spec.construct_id,
+                parent=self._get_parent(ou_spec.parent_path),
+                organizational_unit_name=ou_spec.name,
+            )
+            for policy in self.get_target_policies(
+                ou_target(ou_spec.path), ou_spec.policies
+            ):
+                organizational_unit.attach_policy(policy)
+            self._set_spec_tags(
+                organizational_unit, self.org_tags.organizational_units[ou_spec.path]
+            )
+            self.organizational_units[ou_spec.path] = organizational_unit
+
+    @synth_phase
+    def create_accounts(self):
+        """
+        Method that creates the AWS Accounts inside their Organizational Units
+        (OUs), in the same depth-first order as they appear in the spec.
+        """
+        self.accounts: Dict[str, Account] = {}
+        self.account_lane_stacks: Dict[int, NestedStack] = {}
+        for account_spec in self.org_spec.accounts:
+            if self._is_cached(account_spec.ou_path):
+                continue
+            account = Account(
+                self._get_account_scope(account_spec),
+                account_spec.construct_id,
+                account_name=account_spec.account_name,
+                email=account_spec.email,
+                parent=self._get_parent(account_spec.ou_path),
+                role_name=account_spec.role_name,
+                removal_policy=(
+                    RemovalPolicy[account_spec.removal_policy.upper()]
+                    if account_spec.removal_policy
+                    else None
+                ),
+                import_on_duplicate=account_spec.import_on_duplicate or None,
+            )
+            for policy in self.get_target_policies(
+                account_target(account_spec.construct_id), account_spec.policies
+            ):
+                account.attach_policy(policy)
+            self._set_spec_tags(
+                account, self.org_tags.accounts[account_spec.construct_id]
+            )
+            self.accounts[account_spec.construct_id] = account
+
+    def _set_spec_tags(self, resource, tags: Dict[str, str]) -> None:
+        """
+        Method to set the resolved tags of the spec directly on the tag manager
+        of a root, OU or account (no tag aspect has to visit the tree).
+        """
+        for key, value in tags.items():
+            resource.tags.set_tag(key, value, SPEC_TAG_PRIORITY)
+
+    def _get_account_scope(self, account_spec: AccountSpec) -> Construct:
+        """
+        Method to get the scope where the account is created. With a single
+        lane it is this stack. Otherwise each lane is a nested stack, as the
+        cdk-organizations "DependencyChain" aspect serializes all organization
+        resources of the same stack (so lanes must live in different stacks).
+        When sharding, accounts always live in the shard of their OU.
+        """
+        if self.shards and account_spec.ou_path:
+            return self._get_scope(account_spec.ou_path)
+        if len(self.account_schedule.lanes) == 1:
+            return self
+        lane_index = self.account_schedule.lane_index[account_spec.construct_id]
+        if lane_index not in self.account_lane_stacks:
+            self.account_lane_stacks[lane_index] = NestedStack(
+                self,
+                "AccountCreationLane{}".format(lane_index + 1),
+            )
+        return self.account_lane_stacks[lane_index]
+
+    def _get_parent(self, path: str):
+        """
+        Method to get the parent construct (root or OU) for the given OU path.
+        """
+        if not path:
+            return self.organization.root
+        return self.organizational_units[path]
+
+    @synth_phase
     def add_cdk_accounts_dependencies(self):
         """
         IMPORTANT METHOD to add CDK dependencies for the AWS Accounts that are
         being created (to avoid 2 accounts creation simultaneously, which is
         not supported by AWS). This is because of AWS Organizations limitation.
         """
-        # ! IMPORTANT: We MUST add these dependencies, as AWS Organizations only support
-        # ... one account creation "IN_PROGRESS". We add CDK dependency to solve issue
-        # ... and wait for the previous one to finish, to continue with the next...
-        self.account_shared_services_non_prod.node.add_dependency(
-            self.account_sandbox_1
-        )
-        self.account_shared_services_prod.node.add_dependency(
-            self.account_shared_services_non_prod
-        )
-        self.account_finance_dev.node.add_dependency(self.account_shared_services_prod)
-        self.account_finance_qa.node.add_dependency(self.account_finance_dev)
-        self.account_finance_prod.node.add_dependency(self.account_finance_qa)
-        self.account_marketing_dev.node.add_dependency(self.account_finance_prod)
-        self.account_marketing_prod.node.add_dependency(self.account_marketing_dev)
-        self.account_policy_staging_tests.node.add_dependency(
-            self.account_marketing_prod
-        )
-
+        # ! IMPORTANT: We MUST add these dependencies, as AWS Organizations limits the
+        # ... account creations "IN_PROGRESS". We add CDK dependency to solve issue
+        # ... and wait for the previous one (of the same lane) to finish...
+        account_specs = {spec.construct_id: spec for spec in self.org_spec.accounts}
+        for account_id, dependency_id in self.account_schedule.graph.edges():
+            if account_id in self.accounts and dependency_id in self.accounts:
+                self.accounts[account_id].node.add_dependency(
+                    self.accounts[dependency_id]
+                )
+                continue
+            # Accounts of cached shards are not built, so depend on their stack
+            stack = Stack.of(self._get_account_scope(account_specs[account_id]))
+            dependency_stack = Stack.of(
+                self._get_account_scope(account_specs[dependency_id])
+            )
+            if stack is not dependency_stack:
+                stack.add_dependency(dependency_stack)
+
+    @synth_phase
     def generate_cloudformation_outputs(self):
         """
         Method to add the relevant CloudFormation outputs.
@@ -435,65 +471,64 @@ class OrganizationStack(Stack):
             description="Email of the Management Account",
         )
 
-        CfnOutput(
-            self,
-            "AccountSandbox1Id",
-            value=self.account_sandbox_1.account_id,
-            description="ID of SandboxAccount1 Account",
-        )
-
-        CfnOutput(
-            self,
-            "AccountSharedServicesNonProdId",
-            value=self.account_shared_services_non_prod.account_id,
-            description="ID of AccountSharedServicesNonProd Account",
-        )
-
-        CfnOutput(
-            self,
-            "AccountSharedServicesProdId",
-            value=self.account_shared_services_prod.account_id,
-            description="ID of AccountSharedServicesProd Account",
-        )
-
-        CfnOutput(
-            self,
-            "AccountFinanceDevId",
-            value=self.account_finance_dev.account_id,
-            description="ID of AccountFinanceDev Account",
-        )
-
-        CfnOutput(
-            self,
-            "AccountFinanceQAId",
-            value=self.account_finance_qa.account_id,
-            description="ID of AccountFinanceQA Account",
-        )
+        if self.outputs_mode == "manifest":
+            self.generate_org_manifest()
+            return
 
-        CfnOutput(
-            self,
-            "AccountFinanceProdId",
-            value=self.account_finance_prod.account_id,
-            description="ID of AccountFinanceProd Account",
-        )
-
-        CfnOutput(
-            self,
-            "AccountMarketingDevId",
-            value=self.account_marketing_dev.account_id,
-            description="ID of AccountMarketingDev Account",
-        )
-
-        CfnOutput(
-            self,
-            "AccountMarketingProdId",
-            value=self.account_marketing_prod.account_id,
-            description="ID of AccountMarketingProd Account",
-        )
+        # Sibling shards reference this stack, so their outputs live in the shard
+        for account_spec in self.org_spec.accounts:
+            if self._is_cached(account_spec.ou_path):
+                continue
+            CfnOutput(
+                self._get_scope(account_spec.ou_path)
+                if self.sharding_mode == "stacks"
+                else self,
+                account_spec.output_id or "{}Id".format(account_spec.construct_id),
+                value=self.accounts[account_spec.construct_id].account_id,
+                description="ID of {} Account".format(account_spec.construct_id),
+            )
 
+    def generate_org_manifest(self):
+        """
+        Method to publish the account IDs as a compact org manifest (OU path ->
+        account name -> account ID) in SSM parameters under a single path,
+        instead of one CloudFormation output per account.
+        """
+        path = manifest_path(self.construct_id, self.deployment_environment)
         CfnOutput(
             self,
-            "AccountPolicyStagingTestsId",
-            value=self.account_policy_staging_tests.account_id,
-            description="ID of AccountPolicyStagingTests Account",
-        )
+            "OrgManifestPath",
+            value=path,
+            description="SSM parameters path of the organization manifest",
+        )
+
+        # Sibling shards reference this stack, so their chunks live in the shard
+        entries_by_shard: Dict[str, list] = {}
+        for account_spec in self.org_spec.accounts:
+            if self._is_cached(account_spec.ou_path):
+                continue
+            top_level_path = ""
+            if self.sharding_mode == "stacks":
+                top_level_path = account_spec.ou_path.split("/", 1)[0]
+            entries_by_shard.setdefault(top_level_path, []).append(
+                (
+                    account_spec.ou_path,
+                    account_spec.account_name,
+                    self.accounts[account_spec.construct_id].account_id,
+                )
+            )
+
+        for top_level_path, entries in entries_by_shard.items():
+            scope = self._get_scope(top_level_path) if top_level_path else self
+            label = re.sub(r"[^A-Za-z0-9_.-]", "-", top_level_path) or "org"
+            chunks = chunk_manifest(entries)
+            for index, chunk in enumerate(chunks, start=1):
+                ssm.StringParameter(
+                    scope,
+                    "OrgManifest{}".format(index),
+                    parameter_name="{}/{}/{}".format(path, label, index),
+                    string_value=Stack.of(scope).to_json_string(chunk),
+                    description="Organization manifest ({} chunk {} of {})".format(
+                        label, index, len(chunks)
+                    ),
+                )
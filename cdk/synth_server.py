@@ -0,0 +1,72 @@
+################################################################################
+# SYNTH SERVER AND STARTUP-OPTIMIZED CDK APP ENTRY POINT
+# Keeps a warm Python interpreter and jsii kernel to re-synthesize on request,
+# so repeated synths skip the startup (see "helpers/warm_synth.py").
+# --> Start the server: python cdk/synth_server.py serve
+# --> Synth with it: cdk synth --app "python3 cdk/synth_server.py synth"
+#     (without a running server, "app.py" is run in the same process instead)
+# --> Stop the server: python cdk/synth_server.py stop
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import time
+import runpy
+import argparse
+
+# Own imports (jsii-free, so the entry point starts fast)
+from helpers.warm_synth import (
+    APP_FILE,
+    DEFAULT_SOCKET_PATH,
+    SynthServer,
+    request_synth,
+    send_request,
+    warm_up,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Warm synth server and CDK app entry point"
+    )
+    parser.add_argument("command", choices=("serve", "synth", "stop"))
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get("SYNTH_SERVER_SOCKET", DEFAULT_SOCKET_PATH),
+        help="Unix socket of the synth server",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        start = time.perf_counter()
+        warm_up()
+        server = SynthServer(args.socket)
+        print(
+            "--> Synth server warm in {:.1f}s, listening on {}".format(
+                time.perf_counter() - start, args.socket
+            ),
+            flush=True,
+        )
+        server.serve_until_stopped()
+        print("--> Synth server served {} synths".format(server.requests))
+        return 0
+
+    try:
+        if args.command == "stop":
+            status, output = send_request({"command": "stop"}, args.socket)
+        else:
+            status, output = request_synth(socket_path=args.socket)
+    except OSError:
+        if args.command == "stop":
+            print("--> No synth server listening on {}".format(args.socket))
+            return 0
+        # No warm server: cold synth in this process
+        runpy.run_path(APP_FILE, run_name="__main__")
+        return 0
+    sys.stdout.write(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+################################################################################
+# STATIC VALIDATION OF THE ORG MODEL (NO CDK SYNTH, JSII OR CREDENTIALS)
+# Validates the org spec with the options of the CDK context, in well under a
+# second, so mistakes are found before a slow synth or a failed deployment.
+# The account creation chains are checked with the lanes of the stack (and
+# also on a synthesized cloud assembly with "--assembly cdk.out").
+# --> python cdk/validate.py (or "poe validate", also run as a pre-commit hook)
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import argparse
+
+# Own imports
+from helpers.account_inventory import load_account_inventory, load_managed_account_ids
+from helpers.account_scheduler import normalize_lanes
+from helpers.org_spec import DEFAULT_ORG_SPEC_PATH
+from helpers.org_tags import app_tags
+from helpers.org_validator import validate_org_spec_file
+
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CONTEXT_PATH = os.path.join(REPO_DIR, "cdk.context.json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Static validation of the org spec")
+    parser.add_argument("--spec", help="Org spec file (default: from the context)")
+    parser.add_argument(
+        "--context", default=DEFAULT_CONTEXT_PATH, help="CDK context JSON file"
+    )
+    parser.add_argument(
+        "--assembly",
+        help="Synthesized cloud assembly to also check the account dependencies of",
+    )
+    parser.add_argument(
+        "--strict", action="store_true", help="Exit with 1 on warnings too"
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.context, "r") as file:
+        context = json.load(file)
+    # The spec is validated with the imports the app applies to it
+    inventory_path = context.get("account_inventory_path")
+    managed_accounts_path = context.get("managed_accounts_path")
+    try:
+        account_inventory = (
+            load_account_inventory(inventory_path) if inventory_path else None
+        )
+        managed_account_ids = (
+            load_managed_account_ids(managed_accounts_path)
+            if managed_accounts_path
+            else ()
+        )
+    except (OSError, ValueError) as error:
+        print("ERROR [inventory] Invalid account inventory: {}".format(error))
+        return 1
+    report = validate_org_spec_file(
+        args.spec or context.get("org_spec_path") or DEFAULT_ORG_SPEC_PATH,
+        account_creation_lanes=normalize_lanes(context.get("account_creation_lanes")),
+        optimize_policies=str(context.get("optimize_scps")).lower() == "true",
+        place_policies=str(context.get("place_scps")).lower() == "true",
+        scp_hoist_mode=context.get("scp_hoist_mode"),
+        base_tags=app_tags(
+            context.get("main_resources_name", ""),
+            os.environ.get("DEPLOYMENT_ENVIRONMENT", "prod"),
+            context.get("tags"),
+        ),
+        account_inventory=account_inventory,
+        managed_account_ids=managed_account_ids,
+        cloud_assembly=args.assembly,
+    )
+    for issue in report.issues:
+        print(issue)
+    print("--> Validation: {}".format(report.summary()))
+    if not report.ok or (args.strict and report.warnings):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
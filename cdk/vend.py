@@ -0,0 +1,97 @@
+################################################################################
+# ASYNC ACCOUNT VENDING OF THE ORG SPEC (OPTIONAL, BEFORE THE DEPLOYMENT)
+# Creates the accounts of the spec with the AWS Organizations APIs (several at
+# a time) and moves them into their OUs, resuming from the journal if it was
+# interrupted. The OUs must be deployed first. The accounts it created are
+# written as an account inventory, so the stack adopts them instead of creating
+# them (accounts that were already in the organization are not included).
+# --> python cdk/vend.py --journal vending.jsonl --inventory vended-accounts.json
+# --> cdk deploy --context account_inventory_path=vended-accounts.json
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import argparse
+
+# Own imports
+from helpers.account_inventory import apply_account_inventory, load_account_inventory
+from helpers.account_vending import (
+    DEFAULT_MAX_IN_PROGRESS,
+    AccountVendingOrchestrator,
+    VendingJournal,
+    vended_inventory,
+)
+from helpers.org_spec import DEFAULT_ORG_SPEC_PATH, load_org_spec
+from helpers.org_tags import app_tags
+
+
+DEFAULT_CONTEXT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cdk.context.json"
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Async account vending of the spec")
+    parser.add_argument("--spec", help="Org spec file (default: from the context)")
+    parser.add_argument(
+        "--context", default=DEFAULT_CONTEXT_PATH, help="CDK context JSON file"
+    )
+    parser.add_argument(
+        "--journal", default="vending.jsonl", help="Journal file (to resume runs)"
+    )
+    parser.add_argument(
+        "--inventory",
+        default="vended-accounts.json",
+        help="Account inventory of the vended accounts (written after the run)",
+    )
+    parser.add_argument(
+        "--max-in-progress",
+        type=int,
+        default=DEFAULT_MAX_IN_PROGRESS,
+        help="Max account creations in progress at the same time",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.context, "r") as file:
+        context = json.load(file)
+    org_spec = load_org_spec(
+        args.spec or context.get("org_spec_path") or DEFAULT_ORG_SPEC_PATH
+    )
+    # Same account definitions as the stack (without the inventory accounts)
+    inventory = {}
+    if context.get("account_inventory_path"):
+        inventory = load_account_inventory(context["account_inventory_path"])
+        org_spec = apply_account_inventory(org_spec, inventory)
+
+    import boto3
+
+    journal = VendingJournal(args.journal)
+    report = AccountVendingOrchestrator(
+        boto3.client("organizations"),
+        org_spec,
+        journal,
+        max_in_progress=args.max_in_progress,
+        base_tags=app_tags(
+            context.get("main_resources_name", ""),
+            os.environ.get("DEPLOYMENT_ENVIRONMENT", "prod"),
+            context.get("tags"),
+        ),
+    ).vend()
+    for construct_id, reason in report.failed.items():
+        print("FAILED {}: {}".format(construct_id, reason))
+    # The accounts of the current inventory are kept in the new one
+    document = vended_inventory(org_spec, journal)
+    document["Accounts"].extend(
+        {"Id": account_id, "Email": email} for email, account_id in inventory.items()
+    )
+    with open(args.inventory, "w") as file:
+        json.dump(document, file, indent=2)
+    print("--> Vending: {}".format(report.summary()))
+    print("--> Account inventory written to {}".format(args.inventory))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -54,6 +54,48 @@ poetry shell
 # Run unit tests
 poe test-unit
 
+# Run synth benchmark (generated orgs of 10 to 5,000 accounts, offline)
+RUN_SYNTH_BENCHMARK=1 poe benchmark-synth
+
+# Synth with per-phase profiling (report at "cdk.out/synth-profile.json")
+cdk synth --context synth_profile=true --context synth_profiler=cprofile
+cdk synth --context synth_profile=true --context synth_profile_constructs=true  # Slower
+
+# Synth several environments in one process ("cdk.out/assembly-<environment>")
+cdk synth --context deployment_environments=dev,qa,prod
+
+# Warm synth server for repeated synths (stop it with "python cdk/synth_server.py stop")
+poe synth-server
+cdk synth --app "python3 cdk/synth_server.py synth"
+
+# Static validation of the org spec (no synth)
+poe validate
+
+# Deploy time estimate and critical path (cdk.out/deploy-estimate.json/.dot)
+cdk synth --context deploy_estimate=true
+dot -Tsvg cdk.out/deploy-estimate.dot -o deploy-estimate.svg
+
+# Deploy only the stacks that changed since the last deployment (fingerprints)
+cdk synth
+poe deploy-check compare --deployed .deploy/fingerprints.json
+cdk deploy --app cdk.out --exclusively <changed stacks>
+poe deploy-check record --deployed .deploy/fingerprints.json
+
+# Async account vending ahead of the deployment (resumable, needs credentials)
+poe vend --journal vending.jsonl --inventory vended-accounts.json
+cdk deploy --context account_inventory_path=vended-accounts.json
+
+# Fewer SCP attachments (hoisted to the lowest common OU) and packed SCPs
+cdk synth --context place_scps=true --context scp_hoist_mode=ous --context optimize_scps=true
+
+# Offline SCP queries and what-if checks of changed SCP documents
+poe scp-query finance-prod ec2:RunInstances --region sa-east-1
+poe scp-query --what-if scp_allow_specific_regions=new.json --actions ec2:RunInstances --regions sa-east-1
+
+# Offline drift check of the org spec against a snapshot of the organization
+python cdk/drift.py --export snapshot.json  # Only once (needs credentials)
+poe drift snapshot.json
+
 # Deploy commands (NOTE: prefered method is with the CI/CD Pipeline)
 export DEPLOYMENT_ENVIRONMENT=dev
 cdk synth
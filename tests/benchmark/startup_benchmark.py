@@ -0,0 +1,113 @@
+################################################################################
+# STARTUP BENCHMARK RUNNER
+# Measures the startup cost of the CDK app and prints the metrics as JSON:
+# --> Import of the own helpers (must not load jsii, see "lazy imports")
+# --> Cold synth: "python cdk/app.py" (new interpreter and jsii kernel)
+# --> Warm synth: "python cdk/synth_server.py synth" against a running server
+# The context of "cdk.context.json" is passed as the CDK CLI would do.
+# Usage: python tests/benchmark/startup_benchmark.py [--runs N]
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "..", "..")
+CDK_DIR = os.path.join(ROOT_DIR, "cdk")
+
+# Every helper except "add_tags" (it applies the tags, so it needs aws_cdk)
+HELPERS_IMPORT_CODE = """
+import os, sys, time
+start = time.perf_counter()
+for name in sorted(os.listdir("helpers")):
+    if name.endswith(".py") and name != "add_tags.py":
+        __import__("helpers." + name[:-3])
+print(time.perf_counter() - start, "jsii" in sys.modules)
+"""
+
+
+def timed_run(command: list, env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, env=env, cwd=ROOT_DIR, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def run(runs: int) -> dict:
+    with open(os.path.join(ROOT_DIR, "cdk.context.json"), "r") as file:
+        context = json.load(file)
+
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "synth.sock")
+        env = dict(
+            os.environ,
+            CDK_OUTDIR=os.path.join(directory, "cdk.out"),
+            CDK_CONTEXT_JSON=json.dumps(context),
+            SYNTH_SERVER_SOCKET=socket_path,
+            JSII_SILENCE_WARNING_DEPRECATED_NODE_VERSION="1",
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", HELPERS_IMPORT_CODE],
+            cwd=CDK_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        helpers_import_seconds, jsii_loaded = result.stdout.split()
+
+        cold_seconds = [
+            timed_run([sys.executable, "cdk/app.py"], env) for _ in range(runs)
+        ]
+
+        server = subprocess.Popen(
+            [sys.executable, "cdk/synth_server.py", "serve"],
+            env={
+                key: value
+                for key, value in env.items()
+                if key not in ("CDK_OUTDIR", "CDK_CONTEXT_JSON")
+            },
+            cwd=ROOT_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        try:
+            # The server prints a line once it is warm and listening
+            server.stdout.readline()
+            warm_command = [sys.executable, "cdk/synth_server.py", "synth"]
+            warm_seconds = [timed_run(warm_command, env) for _ in range(runs)]
+            subprocess.run(
+                [sys.executable, "cdk/synth_server.py", "stop"],
+                env=env,
+                cwd=ROOT_DIR,
+                check=True,
+                capture_output=True,
+            )
+            server.wait(timeout=60)
+        finally:
+            if server.poll() is None:
+                server.kill()
+
+    cold = statistics.median(cold_seconds)
+    warm = statistics.median(warm_seconds)
+    return {
+        "runs": runs,
+        "helpers_import_seconds": round(float(helpers_import_seconds), 3),
+        "helpers_load_jsii": jsii_loaded == "True",
+        "cold_synth_seconds": round(cold, 3),
+        "warm_synth_seconds": round(warm, 3),
+        "warm_speedup": round(cold / warm, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup benchmark runner")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs)))
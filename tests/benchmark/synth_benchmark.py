@@ -0,0 +1,108 @@
+################################################################################
+# SYNTH BENCHMARK RUNNER
+# Synthesizes an "OrganizationStack" built from a generated org spec and prints
+# the metrics as JSON. It runs in its own process for each size (so the peak
+# RSS is not shared between sizes) and needs no AWS credentials.
+# Usage: python tests/benchmark/synth_benchmark.py <accounts> [--depth N] [--fanout N]
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "cdk"))
+
+IMPORT_START = time.perf_counter()
+
+# External imports
+import aws_cdk as cdk
+
+# Own imports
+from helpers.jsii_metrics import JsiiCallCounter
+from helpers.org_generator import generate_org_spec
+from stacks.cdk_organization import OrganizationStack
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
+
+
+def node_peak_rss_kb() -> int:
+    """
+    Peak RSS of the jsii Node.js kernel processes, i.e. all the descendants of
+    this process (Linux only, 0 otherwise).
+    """
+    if not os.path.isdir("/proc"):
+        return 0
+
+    children = {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open("/proc/{}/stat".format(pid), "r") as file:
+                parent_pid = file.read().rsplit(")", 1)[1].split()[1]
+        except OSError:
+            continue
+        children.setdefault(parent_pid, []).append(pid)
+
+    peak_rss_kb = 0
+    pending = list(children.get(str(os.getpid()), []))
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open("/proc/{}/status".format(pid), "r") as file:
+                for line in file:
+                    if line.startswith("VmHWM:"):
+                        peak_rss_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return peak_rss_kb
+
+
+def run(accounts: int, depth: int, fanout: int) -> dict:
+    org_spec = generate_org_spec(accounts, depth, fanout)
+
+    with tempfile.TemporaryDirectory() as outdir:
+        start = time.perf_counter()
+        with JsiiCallCounter() as counter:
+            # The resources limit of a single stack is disabled on purpose, to
+            # measure how synth scales with the size of the organization
+            app = cdk.App(
+                outdir=outdir,
+                context={"@aws-cdk/core:stackResourceLimit": 0},
+            )
+            OrganizationStack(app, "benchmark-organization", "prod", org_spec=org_spec)
+            assembly = app.synth()
+        wall_seconds = time.perf_counter() - start
+
+        template_bytes = sum(
+            os.path.getsize(os.path.join(assembly.directory, name))
+            for name in os.listdir(assembly.directory)
+            if name.endswith(".template.json")
+        )
+
+    python_peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    node_rss_kb = node_peak_rss_kb()
+    return {
+        "accounts": accounts,
+        "organizational_units": len(org_spec.organizational_units),
+        "import_seconds": round(IMPORT_SECONDS, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "python_peak_rss_kb": python_peak_rss_kb,
+        "node_peak_rss_kb": node_rss_kb,
+        "peak_rss_kb": python_peak_rss_kb + node_rss_kb,
+        "jsii_calls": counter.calls,
+        "template_bytes": template_bytes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synth benchmark runner")
+    parser.add_argument("accounts", type=int)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    args = parser.parse_args()
+    print(json.dumps(run(args.accounts, args.depth, args.fanout)))
@@ -0,0 +1,70 @@
+################################################################################
+# STARTUP BENCHMARK (OPT-IN, OFFLINE)
+# Compares the import, cold synth and warm synth server times with
+# "startup_baseline.json" (regressions fail the run).
+# --> RUN_SYNTH_BENCHMARK=1 poe benchmark-synth
+# Optional env vars:
+# --> SYNTH_BENCHMARK_UPDATE_BASELINE=1 (store the new results as baseline)
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import subprocess
+
+# External imports
+import pytest
+
+
+BENCHMARK_DIR = os.path.dirname(__file__)
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "startup_baseline.json")
+
+# Max allowed ratio against the baseline (times depend on the machine)
+TOLERANCES = {
+    "helpers_import_seconds": 2.0,
+    "cold_synth_seconds": 2.0,
+    "warm_synth_seconds": 2.0,
+}
+
+# The warm synth server must stay much faster than a cold synth
+MIN_WARM_SPEEDUP = 3.0
+
+with open(BASELINE_PATH, "r") as file:
+    BASELINE = json.load(file)
+
+pytestmark = pytest.mark.skipif(
+    os.environ.get("RUN_SYNTH_BENCHMARK") != "1",
+    reason="Startup benchmark is opt-in (set RUN_SYNTH_BENCHMARK=1)",
+)
+
+
+def test_startup_does_not_regress():
+    result = subprocess.run(
+        [
+            sys.executable,
+            os.path.join(BENCHMARK_DIR, "startup_benchmark.py"),
+            "--runs",
+            str(BASELINE["runs"]),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    metrics = json.loads(result.stdout.strip().splitlines()[-1])
+    print(json.dumps(metrics))
+
+    if os.environ.get("SYNTH_BENCHMARK_UPDATE_BASELINE") == "1":
+        with open(BASELINE_PATH, "w") as file:
+            json.dump(metrics, file)
+            file.write("\n")
+        return
+
+    assert not metrics["helpers_load_jsii"], "Own helpers must not import jsii"
+    assert metrics["warm_speedup"] >= MIN_WARM_SPEEDUP
+    regressions = {
+        key: "{} > {} x {}".format(metrics[key], tolerance, BASELINE[key])
+        for key, tolerance in TOLERANCES.items()
+        if metrics[key] > BASELINE[key] * tolerance
+    }
+    assert not regressions, "Startup regressions: {}".format(regressions)
@@ -0,0 +1,77 @@
+################################################################################
+# SYNTH BENCHMARK SUITE (OPT-IN, OFFLINE)
+# Synthesizes generated orgs of 10 / 100 / 1,000 / 5,000 accounts and compares
+# their metrics with "synth_baseline.json" (regressions fail the run).
+# --> RUN_SYNTH_BENCHMARK=1 poe benchmark-synth
+# Optional env vars:
+# --> SYNTH_BENCHMARK_SIZES=10,100 (subset of the sizes in the baseline)
+# --> SYNTH_BENCHMARK_UPDATE_BASELINE=1 (store the new results as baseline)
+################################################################################
+
+# Built-in imports
+import os
+import sys
+import json
+import subprocess
+
+# External imports
+import pytest
+
+
+BENCHMARK_DIR = os.path.dirname(__file__)
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "synth_baseline.json")
+
+# Max allowed ratio against the baseline. Time and memory depend on the machine,
+# while jsii calls and template bytes are deterministic.
+TOLERANCES = {
+    "wall_seconds": 2.0,
+    "peak_rss_kb": 1.3,
+    "jsii_calls": 1.05,
+    "template_bytes": 1.05,
+}
+
+with open(BASELINE_PATH, "r") as file:
+    BASELINE = json.load(file)
+
+SIZES = os.environ.get("SYNTH_BENCHMARK_SIZES", ",".join(BASELINE)).split(",")
+
+pytestmark = pytest.mark.skipif(
+    os.environ.get("RUN_SYNTH_BENCHMARK") != "1",
+    reason="Synth benchmark is opt-in (set RUN_SYNTH_BENCHMARK=1)",
+)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_synth_does_not_regress(size):
+    baseline = BASELINE[size]
+    result = subprocess.run(
+        [
+            sys.executable,
+            os.path.join(BENCHMARK_DIR, "synth_benchmark.py"),
+            size,
+            "--depth",
+            str(baseline["depth"]),
+            "--fanout",
+            str(baseline["fanout"]),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    metrics = json.loads(result.stdout.strip().splitlines()[-1])
+    print(json.dumps(metrics))
+
+    if os.environ.get("SYNTH_BENCHMARK_UPDATE_BASELINE") == "1":
+        BASELINE[size].update({key: metrics[key] for key in TOLERANCES})
+        with open(BASELINE_PATH, "w") as file:
+            json.dump(BASELINE, file, indent=2)
+        return
+
+    regressions = {
+        key: "{} > {} x {}".format(metrics[key], tolerance, baseline[key])
+        for key, tolerance in TOLERANCES.items()
+        if metrics[key] > baseline[key] * tolerance
+    }
+    assert not regressions, "Synth regressions for {} accounts: {}".format(
+        size, regressions
+    )
@@ -0,0 +1,143 @@
+################################################################################
+# ACCOUNT VENDING THROUGHPUT BENCHMARK (OPT-IN, OFFLINE)
+# Vends a generated org against moto, with a simulated API latency and account
+# creation time, with one creation at a time and with the default concurrency,
+# and compares the throughput with "vending_baseline.json".
+# --> RUN_SYNTH_BENCHMARK=1 poe benchmark-synth
+# Optional env vars:
+# --> SYNTH_BENCHMARK_UPDATE_BASELINE=1 (store the new results as baseline)
+################################################################################
+
+# Built-in imports
+import os
+import json
+import time
+import threading
+
+# External imports
+import boto3
+import pytest
+from moto import mock_organizations
+
+# Own imports
+from cdk.helpers.account_vending import (
+    DEFAULT_MAX_IN_PROGRESS,
+    AccountVendingOrchestrator,
+    VendingJournal,
+)
+from cdk.helpers.org_generator import generate_org_spec
+
+
+BENCHMARK_DIR = os.path.dirname(__file__)
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "vending_baseline.json")
+
+# Max allowed ratio of the baseline throughput (depends on the machine)
+MIN_THROUGHPUT_RATIO = 0.5
+
+with open(BASELINE_PATH, "r") as file:
+    BASELINE = json.load(file)
+
+pytestmark = pytest.mark.skipif(
+    os.environ.get("RUN_SYNTH_BENCHMARK") != "1",
+    reason="Vending benchmark is opt-in (set RUN_SYNTH_BENCHMARK=1)",
+)
+
+
+class SimulatedOrganizations:
+    """
+    Client with a fixed latency per API call, where each account creation is
+    "IN_PROGRESS" for a fixed time after its request (moto creates it at once).
+    """
+
+    def __init__(self, client, latency_seconds: float, creation_seconds: float):
+        self.client = client
+        self.latency_seconds = latency_seconds
+        self.creation_seconds = creation_seconds
+        self.finish_times = {}
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def call(*args, **kwargs):
+            time.sleep(self.latency_seconds)
+            return method(*args, **kwargs)
+
+        return call if name != "get_paginator" else method
+
+    def create_account(self, **kwargs):
+        response = self.__getattr__("create_account")(**kwargs)
+        with self.lock:
+            self.finish_times[response["CreateAccountStatus"]["Id"]] = (
+                time.perf_counter() + self.creation_seconds
+            )
+        return response
+
+    def list_create_account_status(self, **kwargs):
+        time.sleep(self.latency_seconds)
+        now = time.perf_counter()
+        with self.lock:
+            return {
+                "CreateAccountStatuses": [
+                    {"Id": request_id, "State": "IN_PROGRESS"}
+                    for request_id, finish_time in self.finish_times.items()
+                    if finish_time > now
+                ]
+            }
+
+
+def vend(max_in_progress: int, journal_path: str) -> dict:
+    org_spec = generate_org_spec(
+        BASELINE["accounts"], depth=BASELINE["depth"], fanout=BASELINE["fanout"]
+    )
+    with mock_organizations():
+        client = boto3.client("organizations", region_name="us-east-1")
+        client.create_organization(FeatureSet="ALL")
+        ou_ids = {"": client.list_roots()["Roots"][0]["Id"]}
+        for ou_spec in org_spec.organizational_units:
+            ou_ids[ou_spec.path] = client.create_organizational_unit(
+                ParentId=ou_ids[ou_spec.parent_path], Name=ou_spec.name
+            )["OrganizationalUnit"]["Id"]
+        report = AccountVendingOrchestrator(
+            SimulatedOrganizations(
+                client, BASELINE["latency_seconds"], BASELINE["creation_seconds"]
+            ),
+            org_spec,
+            VendingJournal(journal_path),
+            max_in_progress=max_in_progress,
+            min_poll_seconds=BASELINE["creation_seconds"] / 4,
+            max_poll_seconds=BASELINE["creation_seconds"],
+        ).vend()
+    assert len(report.moved) == len(org_spec.accounts)
+    return {
+        "accounts_per_minute": round(report.accounts_per_minute, 1),
+        "api_calls": sum(report.api_calls.values()),
+    }
+
+
+def test_vending_throughput_does_not_regress(tmp_path):
+    serial = vend(1, str(tmp_path / "serial.jsonl"))
+    concurrent = vend(DEFAULT_MAX_IN_PROGRESS, str(tmp_path / "concurrent.jsonl"))
+    metrics = {
+        "serial_accounts_per_minute": serial["accounts_per_minute"],
+        "accounts_per_minute": concurrent["accounts_per_minute"],
+        "api_calls": concurrent["api_calls"],
+        "speedup": round(
+            concurrent["accounts_per_minute"] / serial["accounts_per_minute"], 2
+        ),
+    }
+    print(json.dumps(metrics))
+
+    if os.environ.get("SYNTH_BENCHMARK_UPDATE_BASELINE") == "1":
+        with open(BASELINE_PATH, "w") as file:
+            json.dump(dict(BASELINE, **metrics), file)
+            file.write("\n")
+        return
+
+    # Creations overlap, so the throughput grows with the concurrency
+    assert metrics["speedup"] >= DEFAULT_MAX_IN_PROGRESS / 2
+    assert (
+        metrics["accounts_per_minute"]
+        >= BASELINE["accounts_per_minute"] * MIN_THROUGHPUT_RATIO
+    )
+    assert metrics["api_calls"] <= BASELINE["api_calls"] * 1.2
@@ -0,0 +1,159 @@
+################################################################################
+# SHARED SYNTHESIZED TEMPLATES FOR THE UNIT TESTS
+# A synth costs seconds of jsii calls, so each set of "OrganizationStack"
+# parameters (environment, org spec and options) is synthesized once per test
+# session, and its template is indexed by resource type, logical ID and
+# construct ID for the assertions (plain dict lookups, no jsii round trips).
+# The CDK is only imported by the fixtures, so jsii-free tests run without it.
+################################################################################
+
+# Built-in imports
+import json
+import hashlib
+import dataclasses
+from collections import defaultdict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# External imports
+import pytest
+
+# Own imports
+from cdk.helpers.org_spec import DEFAULT_ORG_SPEC_PATH, OrgSpec, load_org_spec
+
+
+MAIN_RESOURCES_NAME = "test-organization"
+
+
+def stable_key(value: Any) -> str:
+    """
+    Function to get a stable hash of the synth parameters (unhashable
+    options, such as dicts of tags, or derived org specs are hashed by
+    their content).
+    """
+
+    def default(item: Any) -> Any:
+        if dataclasses.is_dataclass(item):
+            return dataclasses.asdict(item)
+        if isinstance(item, (set, frozenset)):
+            return sorted(item)
+        return repr(item)
+
+    document = json.dumps(value, sort_keys=True, default=default)
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
+class TemplateIndex:
+    """
+    Resources of a synthesized template, indexed by type, logical ID and
+    construct ID (the top-level construct of the stack that owns them).
+    """
+
+    def __init__(self, template, stack_path: str) -> None:
+        self.template = template
+        self.document = template.to_json()
+        self.resources: Dict[str, Dict] = self.document.get("Resources", {})
+        self.outputs: Dict[str, Dict] = self.document.get("Outputs", {})
+        self._by_type: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+        self._by_construct: Dict[Tuple[str, str], str] = {}
+        prefix = stack_path + "/"
+        for logical_id, resource in self.resources.items():
+            self._by_type[resource["Type"]][logical_id] = resource
+            path = resource.get("Metadata", {}).get("aws:cdk:path", "")
+            if path.startswith(prefix):
+                construct_id = path[len(prefix) :].split("/", 1)[0]
+                self._by_construct.setdefault(
+                    (construct_id, resource["Type"]), logical_id
+                )
+
+    def of_type(self, resource_type: str) -> Dict[str, Dict]:
+        return self._by_type.get(resource_type, {})
+
+    def logical_id(self, construct_id: str, resource_type: str) -> str:
+        return self._by_construct[(construct_id, resource_type)]
+
+    def resource(self, construct_id: str, resource_type: str) -> Dict:
+        return self.resources[self.logical_id(construct_id, resource_type)]
+
+
+class SynthesizedOrg:
+    """
+    Synthesized "OrganizationStack" with its (indexed) template.
+    """
+
+    def __init__(self, stack) -> None:
+        from aws_cdk.assertions import Template
+
+        self.stack = stack
+        self.template = Template.from_stack(stack)
+        self.index = TemplateIndex(self.template, stack.node.path)
+
+    @property
+    def assembly_directory(self) -> str:
+        """
+        Cloud assembly directory of the synth (with the nested templates).
+        """
+        return self.stack.node.root.synth().directory
+
+
+@pytest.fixture(scope="session")
+def synth_org():
+    """
+    Fixture with a function to get the synthesized org for a set of
+    parameters: "synth_org(deployment_environment, org_spec_path, org_spec,
+    app_tags, **options)", where the options are keyword arguments of
+    "OrganizationStack" ("org_spec" is a parsed spec that replaces the file,
+    and "app_tags" are applied to the app as "add_tags_to_app" does).
+    """
+    # Imported here, so the jsii-free tests never load the CDK
+    import aws_cdk as cdk
+    from cdk.stacks.cdk_organization import OrganizationStack
+
+    org_specs: Dict[str, OrgSpec] = {}
+    synthesized: Dict[str, SynthesizedOrg] = {}
+
+    def synth(
+        deployment_environment: str = "prod",
+        org_spec_path: str = DEFAULT_ORG_SPEC_PATH,
+        org_spec: Optional[OrgSpec] = None,
+        app_tags: Optional[Mapping[str, str]] = None,
+        **options
+    ) -> SynthesizedOrg:
+        key = stable_key(
+            [
+                deployment_environment,
+                org_spec if org_spec else org_spec_path,
+                app_tags,
+                options,
+            ]
+        )
+        if key not in synthesized:
+            if org_spec is None:
+                if org_spec_path not in org_specs:
+                    org_specs[org_spec_path] = load_org_spec(org_spec_path)
+                org_spec = org_specs[org_spec_path]
+            # Path metadata maps the resources back to the constructs of the spec
+            app = cdk.App(context={"aws:cdk:enable-path-metadata": True})
+            for tag_key, tag_value in (app_tags or {}).items():
+                cdk.Tags.of(app).add(tag_key, tag_value)
+            if app_tags:
+                options.setdefault("base_tags", app_tags)
+            synthesized[key] = SynthesizedOrg(
+                OrganizationStack(
+                    app,
+                    MAIN_RESOURCES_NAME,
+                    deployment_environment,
+                    org_spec=org_spec,
+                    **options
+                )
+            )
+        return synthesized[key]
+
+    return synth
+
+
+@pytest.fixture(scope="session")
+def org(synth_org) -> SynthesizedOrg:
+    """
+    Fixture with the synthesized org of the default spec and options.
+    """
+    return synth_org()
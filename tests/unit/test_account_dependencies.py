@@ -0,0 +1,70 @@
+import copy
+import json
+
+from cdk.helpers.account_dependencies import (
+    assembly_account_dependencies,
+    template_account_dependencies,
+)
+from cdk.helpers.org_validator import validate_org
+from cdk import validate
+
+
+ACCOUNT = "Custom::Organizations_Account"
+
+
+def _codes(report):
+    return [issue.code for issue in report.issues]
+
+
+def test_a_dropped_template_dependency_is_reported(org):
+    org_spec = org.stack.org_spec
+    account_ids = [account_spec.construct_id for account_spec in org_spec.accounts]
+    template = copy.deepcopy(org.index.document)
+
+    report = validate_org(
+        org_spec,
+        account_dependencies=template_account_dependencies(template, account_ids),
+    )
+    assert report.ok, report.issues
+
+    # Without the dependencies emitted for the second account, it is created
+    # at the same time as the first one
+    second = template["Resources"][org.index.logical_id(account_ids[1], ACCOUNT)]
+    assert org.index.logical_id(account_ids[0], ACCOUNT) in second["DependsOn"]
+    del second["DependsOn"]
+    dropped = validate_org(
+        org_spec,
+        account_dependencies=template_account_dependencies(template, account_ids),
+    )
+    assert _codes(dropped) == ["account-chain"]
+    assert dropped.errors[0].message.startswith("Up to 2 accounts can be created")
+
+
+def test_the_account_dependencies_are_read_from_the_cloud_assembly(tmp_path, synth_org):
+    synthesized = synth_org(account_creation_lanes=2)
+    org_spec = synthesized.stack.org_spec
+    directory = synthesized.assembly_directory
+    account_ids = [account_spec.construct_id for account_spec in org_spec.accounts]
+
+    # The account chains of the nested lane stacks
+    dependencies = assembly_account_dependencies(directory, account_ids)
+    assert sorted(dependencies.nodes) == sorted(account_ids)
+    assert validate_org(
+        org_spec, account_creation_lanes=2, account_dependencies=dependencies
+    ).ok
+    assert validate_org(org_spec, account_creation_lanes=2, cloud_assembly=directory).ok
+
+    # With a single lane in the context, the CLI reports both synthesized lanes
+    with open(validate.DEFAULT_CONTEXT_PATH, "r") as file:
+        context = json.load(file)
+    context["account_creation_lanes"] = 1
+    (tmp_path / "cdk.context.json").write_text(json.dumps(context))
+    assert (
+        validate.main(
+            ["--assembly", directory, "--context", str(tmp_path / "cdk.context.json")]
+        )
+        == 1
+    )
+    single = validate_org(org_spec, cloud_assembly=directory)
+    assert _codes(single) == ["account-chain"]
+    assert single.errors[0].message.startswith("Up to 2 accounts can be created")
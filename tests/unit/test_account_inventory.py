@@ -0,0 +1,89 @@
+import json
+
+from cdk.helpers.account_inventory import (
+    apply_account_inventory,
+    load_account_inventory,
+    load_managed_account_ids,
+)
+from cdk.helpers.org_spec import load_org_spec
+
+
+def write_inventory(tmp_path, emails):
+    path = tmp_path / "inventory.json"
+    path.write_text(
+        json.dumps(
+            {
+                "Accounts": [
+                    {"Id": str(100000000000 + index), "Email": email.upper()}
+                    for index, email in enumerate(emails)
+                ]
+            }
+        )
+    )
+    return str(path)
+
+
+def test_inventory_accounts_are_marked_for_import(tmp_path):
+    org_spec = load_org_spec()
+    emails = [account.email for account in org_spec.accounts[3:6]]
+
+    imported_spec = apply_account_inventory(
+        org_spec, load_account_inventory(write_inventory(tmp_path, emails))
+    )
+
+    imported = [account for account in imported_spec.accounts if account.imported]
+    assert [account.email for account in imported] == emails
+    assert all(account.import_on_duplicate for account in imported)
+    assert {account.removal_policy for account in imported} == {"retain"}
+
+
+def test_accounts_already_deployed_by_the_stack_are_not_marked(tmp_path):
+    org_spec = load_org_spec()
+    emails = [account.email for account in org_spec.accounts[3:6]]
+    outputs = tmp_path / "outputs.json"
+    # IDs of the inventory are 100000000000 + index
+    outputs.write_text(
+        json.dumps({"test-organization": {"AccountFinanceDevId": "100000000001"}})
+    )
+    resources = tmp_path / "resources.json"
+    resources.write_text(
+        json.dumps(
+            {
+                "StackResourceSummaries": [
+                    {
+                        "ResourceType": "Custom::Organizations_Account",
+                        "PhysicalResourceId": "100000000002",
+                    }
+                ]
+            }
+        )
+    )
+    managed = load_managed_account_ids(str(outputs)) | load_managed_account_ids(
+        str(resources)
+    )
+
+    imported_spec = apply_account_inventory(
+        org_spec, load_account_inventory(write_inventory(tmp_path, emails)), managed
+    )
+
+    assert managed == {"100000000001", "100000000002"}
+    imported = [account for account in imported_spec.accounts if account.imported]
+    assert [account.email for account in imported] == emails[:1]
+
+
+def test_imported_accounts_share_the_creation_lanes(tmp_path, synth_org):
+    org_spec = load_org_spec()
+    emails = [account.email for account in org_spec.accounts[3:6]]
+    imported_spec = apply_account_inventory(
+        org_spec, load_account_inventory(write_inventory(tmp_path, emails))
+    )
+
+    synthesized = synth_org(org_spec=imported_spec, account_creation_lanes=2)
+
+    # Imports also call "CreateAccount", so they never run beside the lanes
+    schedule = synthesized.stack.account_schedule
+    assert sorted(schedule.lane_index) == sorted(
+        account.construct_id for account in org_spec.accounts
+    )
+    assert len(synthesized.stack.account_lane_stacks) == 2
+    synthesized.template.has_output("AccountFinanceDevId", {})
@@ -0,0 +1,44 @@
+import pytest
+
+from cdk.helpers.account_scheduler import normalize_lanes, schedule_account_lanes
+from cdk.helpers.dependency_graph import DependencyGraph
+
+
+ACCOUNT_IDS = ["A1", "A2", "A3", "A4", "A5", "A6", "A7"]
+
+
+def test_single_lane_is_the_serial_chain():
+    schedule = schedule_account_lanes(ACCOUNT_IDS, 1)
+
+    assert schedule.lanes == (tuple(ACCOUNT_IDS),)
+    assert list(schedule.graph.edges()) == list(zip(ACCOUNT_IDS[1:], ACCOUNT_IDS))
+    assert schedule.critical_path_length == len(ACCOUNT_IDS)
+
+
+def test_lanes_are_contiguous_and_balanced():
+    schedule = schedule_account_lanes(ACCOUNT_IDS, 3)
+
+    assert schedule.lanes == (("A1", "A2", "A3"), ("A4", "A5"), ("A6", "A7"))
+    assert schedule.lane_index["A5"] == 1
+    assert schedule.graph.dependencies("A4") == []
+    assert schedule.critical_path == ("A1", "A2", "A3")
+
+
+@pytest.mark.parametrize("value", [None, "", "invalid", 0, -2])
+def test_invalid_lanes_fall_back_to_single_lane(value):
+    assert normalize_lanes(value) == 1
+    assert len(schedule_account_lanes(ACCOUNT_IDS, value).lanes) == 1
+
+
+def test_lanes_are_capped_by_number_of_accounts():
+    assert len(schedule_account_lanes(ACCOUNT_IDS[:2], 5).lanes) == 2
+
+
+def test_cycles_are_detected():
+    graph = DependencyGraph()
+    graph.add_dependency("A1", "A2")
+    graph.add_dependency("A2", "A3")
+    graph.add_dependency("A3", "A1")
+
+    with pytest.raises(ValueError, match="Dependency cycle detected"):
+        graph.topological_order()
@@ -0,0 +1,250 @@
+import time
+import threading
+from collections import Counter
+
+import boto3
+import pytest
+from moto import mock_organizations
+
+from cdk.helpers.account_inventory import apply_account_inventory
+from cdk.helpers.account_vending import (
+    MOVED,
+    REQUESTED,
+    REQUESTING,
+    AccountVendingOrchestrator,
+    VendingJournal,
+    vended_inventory,
+)
+from cdk.helpers.org_snapshot import export_org_snapshot, parse_org_snapshot
+from cdk.helpers.org_spec import load_org_spec
+
+
+class DelayedCreations:
+    """
+    Client that reports each moto account creation (done at once) as
+    "IN_PROGRESS" for some status polls, and tracks the concurrent ones.
+    """
+
+    def __init__(self, client, polls=2):
+        self.client = client
+        self.polls = polls
+        self.remaining = {}
+        self.max_in_progress = 0
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def create_account(self, **kwargs):
+        response = self.client.create_account(**kwargs)
+        with self.lock:
+            self.remaining[response["CreateAccountStatus"]["Id"]] = self.polls
+            in_progress = len([polls for polls in self.remaining.values() if polls])
+            self.max_in_progress = max(self.max_in_progress, in_progress)
+        return response
+
+    def list_create_account_status(self, **kwargs):
+        with self.lock:
+            statuses = [
+                {"Id": request_id, "State": "IN_PROGRESS"}
+                for request_id, polls in self.remaining.items()
+                if polls
+            ]
+            for status in statuses:
+                self.remaining[status["Id"]] -= 1
+        return {"CreateAccountStatuses": statuses}
+
+
+class UnfinishedRequest:
+    """
+    Client where the request of an interrupted run is still in progress: its
+    account is not listed yet, and it is reported as "IN_PROGRESS" by the
+    first two status listings.
+    """
+
+    def __init__(self, client, status):
+        self.client = client
+        self.status = status
+        self.listings = 0
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def get_paginator(self, operation):
+        paginator = self.client.get_paginator(operation)
+        if operation != "list_accounts_for_parent":
+            return paginator
+        hidden_id = self.status["AccountId"]
+
+        class HidingPaginator:
+            def paginate(self, **kwargs):
+                for page in paginator.paginate(**kwargs):
+                    accounts = [a for a in page["Accounts"] if a["Id"] != hidden_id]
+                    yield dict(page, Accounts=accounts)
+
+        return HidingPaginator()
+
+    def list_create_account_status(self, **kwargs):
+        self.listings += 1
+        statuses = [dict(self.status, State="IN_PROGRESS")]
+        return {"CreateAccountStatuses": statuses if self.listings <= 2 else []}
+
+
+def create_org(client, org_spec):
+    client.create_organization(FeatureSet="ALL")
+    ou_ids = {"": client.list_roots()["Roots"][0]["Id"]}
+    for ou_spec in org_spec.organizational_units:
+        ou_ids[ou_spec.path] = client.create_organizational_unit(
+            ParentId=ou_ids[ou_spec.parent_path], Name=ou_spec.name
+        )["OrganizationalUnit"]["Id"]
+    return ou_ids
+
+
+def vend(client, org_spec, journal, **options):
+    return AccountVendingOrchestrator(
+        client,
+        org_spec,
+        journal,
+        min_poll_seconds=0.001,
+        max_poll_seconds=0.01,
+        **options
+    ).vend()
+
+
+@mock_organizations
+def test_accounts_are_vended_into_their_ous(tmp_path):
+    client = boto3.client("organizations", region_name="us-east-1")
+    org_spec = load_org_spec()
+    create_org(client, org_spec)
+    delayed_client = DelayedCreations(client)
+    journal = VendingJournal(str(tmp_path / "journal.jsonl"))
+
+    report = vend(
+        delayed_client,
+        org_spec,
+        journal,
+        max_in_progress=3,
+        base_tags={"Environment": "prod"},
+    )
+
+    construct_ids = sorted(account.construct_id for account in org_spec.accounts)
+    assert sorted(report.created) == sorted(report.moved) == construct_ids
+    assert delayed_client.max_in_progress == 3
+    # Only the requests that left "IN_PROGRESS" are described
+    assert report.api_calls["describe_create_account_status"] == len(construct_ids)
+    snapshot = parse_org_snapshot(export_org_snapshot(client))
+    for account_spec in org_spec.accounts:
+        account = snapshot.accounts_by_email[account_spec.email]
+        assert snapshot.path(account.parent_id) == account_spec.ou_path
+    assert {"Key": "Environment", "Value": "prod"} in client.list_tags_for_resource(
+        ResourceId=account.account_id
+    )["Tags"]
+
+    # The stack adopts the vended accounts through the account inventory
+    imported_spec = apply_account_inventory(
+        org_spec,
+        {
+            account["Email"].lower(): account["Id"]
+            for account in vended_inventory(org_spec, journal)["Accounts"]
+        },
+    )
+    assert all(account.imported for account in imported_spec.accounts)
+
+
+@mock_organizations
+def test_interrupted_vending_resumes_from_the_journal(tmp_path):
+    client = boto3.client("organizations", region_name="us-east-1")
+    org_spec = load_org_spec()
+    create_org(client, org_spec)
+    journal_path = str(tmp_path / "journal.jsonl")
+    # Interrupted while the first account was being created
+    first, second = org_spec.accounts[:2]
+    request_id = client.create_account(
+        AccountName=first.account_name, Email=first.email
+    )["CreateAccountStatus"]["Id"]
+    VendingJournal(journal_path).record(
+        first.construct_id, REQUESTED, request_id=request_id
+    )
+    with open(journal_path, "a") as file:
+        file.write('{"account": "' + second.construct_id)
+
+    report = vend(client, org_spec, VendingJournal(journal_path))
+
+    assert report.api_calls["create_account"] == len(org_spec.accounts) - 1
+    emails = Counter(account["Email"] for account in client.list_accounts()["Accounts"])
+    assert emails[first.email] == emails[second.email] == 1
+
+    # Nothing left to do in a new run
+    report = vend(client, org_spec, VendingJournal(journal_path))
+    assert not report.created and report.api_calls["create_account"] == 0
+    assert len(report.existing) == len(org_spec.accounts)
+
+
+@mock_organizations
+def test_existing_accounts_are_not_requested_again(tmp_path):
+    client = boto3.client("organizations", region_name="us-east-1")
+    org_spec = load_org_spec()
+    create_org(client, org_spec)
+    account_spec = org_spec.accounts[0]
+    client.create_account(AccountName="legacy", Email=account_spec.email.upper())
+    journal = VendingJournal(str(tmp_path / "journal.jsonl"))
+
+    report = vend(client, org_spec, journal)
+
+    assert report.existing == [account_spec.construct_id]
+    assert journal.state(account_spec.construct_id) == "existing"
+    # Maybe already deployed by the stack, so it is not marked for import
+    emails = [
+        account["Email"] for account in vended_inventory(org_spec, journal)["Accounts"]
+    ]
+    assert account_spec.email not in emails
+    assert len(emails) == len(org_spec.accounts) - 1
+    with open(journal.path) as file:
+        assert len(file.readlines()) == 1 + 4 * (len(org_spec.accounts) - 1)
+
+
+def interrupt_after_request(client, journal_path, account_spec):
+    # The request was sent, but the run stopped before journaling its ID
+    VendingJournal(journal_path).record(
+        account_spec.construct_id, REQUESTING, requested_at=time.time() - 1
+    )
+    return client.create_account(
+        AccountName=account_spec.account_name, Email=account_spec.email
+    )["CreateAccountStatus"]
+
+
+@mock_organizations
+def test_requests_of_an_interrupted_run_are_adopted(tmp_path):
+    client = boto3.client("organizations", region_name="us-east-1")
+    org_spec = load_org_spec()
+    ou_ids = create_org(client, org_spec)
+    journal_path = str(tmp_path / "journal.jsonl")
+    first, second = org_spec.accounts[:2]
+    interrupt_after_request(client, journal_path, first)
+    status = interrupt_after_request(client, journal_path, second)
+    unfinished_client = UnfinishedRequest(client, status)
+
+    journal = VendingJournal(journal_path)
+    report = vend(unfinished_client, org_spec, journal)
+
+    # Both are created by the journal (so moved into their OU), not "existing"
+    assert report.api_calls["create_account"] == len(org_spec.accounts) - 2
+    assert report.api_calls["list_create_account_status"] >= 2
+    assert {first.construct_id, second.construct_id} <= set(report.moved)
+    assert journal.entries[second.construct_id]["request_id"] == status["Id"]
+    for account_spec in (first, second):
+        assert journal.state(account_spec.construct_id) == MOVED
+        account_id = journal.entries[account_spec.construct_id]["account_id"]
+        parents = client.list_parents(ChildId=account_id)["Parents"]
+        assert parents[0]["Id"] == ou_ids[account_spec.ou_path]
+    emails = Counter(account["Email"] for account in client.list_accounts()["Accounts"])
+    assert emails[first.email] == emails[second.email] == 1
+
+
+@mock_organizations
+def test_missing_ous_stop_the_vending(tmp_path):
+    client = boto3.client("organizations", region_name="us-east-1")
+    client.create_organization(FeatureSet="ALL")
+
+    with pytest.raises(ValueError, match="Missing OUs in the organization"):
+        vend(client, load_org_spec(), VendingJournal(str(tmp_path / "journal.jsonl")))
@@ -0,0 +1,144 @@
+import json
+
+from cdk.helpers.assembly_fingerprint import (
+    changed_stacks,
+    fingerprint_assembly,
+    load_fingerprints,
+    normalize_template,
+    write_assembly_fingerprints,
+)
+
+
+NESTED_HASH = "b" * 64
+
+
+def _template(accounts, nested_hash=NESTED_HASH, metadata=False):
+    resources = {
+        "Nested": {
+            "Type": "AWS::CloudFormation::Stack",
+            "Properties": {
+                "TemplateURL": {"Fn::Sub": "https://bucket/{}.json".format(nested_hash)}
+            },
+        },
+    }
+    for index, name in enumerate(accounts):
+        resources[name] = {
+            "Type": "Custom::Organizations_Account",
+            "Properties": {"AccountName": name},
+            "DependsOn": ["Nested"] + accounts[:index][::-1],
+        }
+        if metadata:
+            resources[name]["Metadata"] = {
+                "aws:cdk:path": "org/{}".format(name),
+                "aws:asset:path": "asset.{}".format(name),
+            }
+    if metadata:
+        resources["CDKMetadata"] = {
+            "Type": "AWS::CDK::Metadata",
+            "Properties": {"Analytics": "v2:deflate64:xyz"},
+        }
+    template = {"Resources": resources}
+    if metadata:
+        template["Conditions"] = {"CDKMetadataAvailable": {"Fn::Equals": ["a", "b"]}}
+    return template
+
+
+def _nested(accounts, metadata=False):
+    template = _template(accounts, metadata=metadata)
+    del template["Resources"]["Nested"]
+    for resource in template["Resources"].values():
+        resource.pop("DependsOn", None)
+    return template
+
+
+def _write_assembly(directory, template, nested, indent=None, nested_hash=NESTED_HASH):
+    def write(name, document):
+        (directory / name).write_text(json.dumps(document, indent=indent))
+
+    write(
+        "manifest.json",
+        {
+            "artifacts": {
+                "org.assets": {
+                    "type": "cdk:asset-manifest",
+                    "properties": {"file": "org.assets.json"},
+                },
+                "org": {
+                    "type": "aws:cloudformation:stack",
+                    "environment": "aws://123456789012/us-east-1",
+                    "properties": {
+                        "templateFile": "org.template.json",
+                        "stackName": "org",
+                    },
+                },
+            }
+        },
+    )
+    write(
+        "org.assets.json",
+        {
+            "files": {
+                nested_hash: {"source": {"path": "orgNested.nested.template.json"}},
+                "c" * 64: {"source": {"path": "asset.lambda"}},
+            }
+        },
+    )
+    write("org.template.json", template)
+    write("orgNested.nested.template.json", nested)
+
+
+def test_normalize_template_drops_the_synth_noise():
+    normalized = normalize_template(_template(["A", "B", "C"], metadata=True))
+
+    assert normalized == normalize_template(_template(["A", "B", "C"]))
+    assert set(normalized) == {"Resources"}
+    assert set(normalized["Resources"]) == {"Nested", "A", "B", "C"}
+    assert "Metadata" not in normalized["Resources"]["C"]
+    assert normalized["Resources"]["C"]["DependsOn"] == ["A", "B", "Nested"]
+
+
+def test_normalize_template_keeps_the_deployed_metadata():
+    template = _template(["A"], metadata=True)
+    init = {"config": {"commands": {"setup": {"command": "echo setup"}}}}
+    template["Resources"]["A"]["Metadata"]["AWS::CloudFormation::Init"] = init
+
+    normalized = normalize_template(template)
+
+    assert normalized["Resources"]["A"]["Metadata"] == {
+        "AWS::CloudFormation::Init": init
+    }
+    assert normalized != normalize_template(_template(["A"]))
+
+
+def test_fingerprints_ignore_the_format_and_the_nested_asset_hash(tmp_path):
+    plain, noisy = tmp_path / "plain", tmp_path / "noisy"
+    plain.mkdir()
+    noisy.mkdir()
+    _write_assembly(plain, _template(["A", "B"]), _nested(["Nested1"]))
+    # The metadata of the nested template changes its asset hash too
+    _write_assembly(
+        noisy,
+        _template(["A", "B"], nested_hash="d" * 64, metadata=True),
+        _nested(["Nested1"], metadata=True),
+        indent=2,
+        nested_hash="d" * 64,
+    )
+
+    assert fingerprint_assembly(str(plain)) == fingerprint_assembly(str(noisy))
+
+
+def test_a_nested_template_change_changes_the_parent_fingerprint(tmp_path):
+    before, after = tmp_path / "before", tmp_path / "after"
+    before.mkdir()
+    after.mkdir()
+    _write_assembly(before, _template(["A"]), _nested(["Nested1"]))
+    _write_assembly(after, _template(["A"]), _nested(["Nested1", "Nested2"]))
+
+    deployed = fingerprint_assembly(str(before))
+    fingerprints = write_assembly_fingerprints(str(after))
+
+    assert changed_stacks(fingerprints, deployed) == ["org"]
+    assert changed_stacks(fingerprints, fingerprints) == []
+    assert changed_stacks(fingerprints, {}) == ["org"]
+    assert load_fingerprints(str(after / "fingerprints.json")) == fingerprints
+    assert load_fingerprints(str(tmp_path / "missing.json")) == {}
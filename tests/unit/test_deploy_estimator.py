@@ -0,0 +1,166 @@
+import json
+
+import aws_cdk as cdk
+
+from cdk.helpers.dependency_graph import DependencyGraph
+from cdk.helpers.deploy_estimator import (
+    estimate_assembly,
+    template_dependencies,
+    write_deploy_estimates,
+)
+from cdk.stacks.cdk_organization import OrganizationStack
+
+
+NESTED_HASH = "a" * 64
+
+
+def test_template_dependencies_include_references_and_depends_on():
+    template = {
+        "Resources": {
+            "Ou": {"Type": "Custom::Organizations_OrganizationalUnitProvider"},
+            "Role": {"Type": "AWS::IAM::Role"},
+            "Account": {
+                "Type": "Custom::Organizations_Account",
+                "DependsOn": "Role",
+                "Properties": {
+                    "ParentId": {"Fn::GetAtt": "Ou.Id"},
+                    "Name": {"Fn::Sub": ["${Ou}-${AWS::Region}-${X}", {"X": "y"}]},
+                },
+            },
+            "Tags": {
+                "Type": "Custom::Organizations_TagResource",
+                "Properties": {"ResourceId": {"Ref": "Account"}},
+            },
+        }
+    }
+
+    graph = template_dependencies(template)
+
+    assert sorted(graph.edges()) == [
+        ("Account", "Ou"),
+        ("Account", "Role"),
+        ("Tags", "Account"),
+    ]
+
+
+def test_schedule_gives_the_slack_of_each_node():
+    graph = DependencyGraph()
+    graph.add_dependency("Long", "Start")
+    graph.add_dependency("Short", "Start")
+    graph.add_dependency("End", "Long")
+    graph.add_dependency("End", "Short")
+
+    schedule = graph.schedule({"Start": 1, "Long": 10, "Short": 4, "End": 1})
+
+    assert schedule == {
+        "Start": (0, 1, 0),
+        "Long": (1, 11, 0),
+        "Short": (1, 5, 6),
+        "End": (11, 12, 0),
+    }
+
+
+def _write_assembly(directory):
+    def write(name, document):
+        (directory / name).write_text(json.dumps(document))
+
+    write(
+        "manifest.json",
+        {
+            "artifacts": {
+                "org.assets": {
+                    "type": "cdk:asset-manifest",
+                    "properties": {"file": "org.assets.json"},
+                },
+                "org": {
+                    "type": "aws:cloudformation:stack",
+                    "properties": {"templateFile": "org.template.json"},
+                    "dependencies": ["org.assets"],
+                },
+                "org-shard": {
+                    "type": "aws:cloudformation:stack",
+                    "properties": {"templateFile": "org-shard.template.json"},
+                    "dependencies": ["org"],
+                },
+            }
+        },
+    )
+    write(
+        "org.assets.json",
+        {"files": {NESTED_HASH: {"source": {"path": "lane.nested.template.json"}}}},
+    )
+    write(
+        "org.template.json",
+        {
+            "Resources": {
+                "Ou": {"Type": "Custom::Organizations_OrganizationalUnitProvider"},
+                "Lane": {
+                    "Type": "AWS::CloudFormation::Stack",
+                    "DependsOn": ["Ou"],
+                    "Properties": {
+                        "TemplateURL": {
+                            "Fn::Join": ["", ["https://s3/", NESTED_HASH + ".json"]]
+                        }
+                    },
+                },
+            }
+        },
+    )
+    write(
+        "lane.nested.template.json",
+        {
+            "Resources": {
+                "Account1": {"Type": "Custom::Organizations_Account"},
+                "Account2": {
+                    "Type": "Custom::Organizations_Account",
+                    "DependsOn": "Account1",
+                },
+            }
+        },
+    )
+    write(
+        "org-shard.template.json",
+        {"Resources": {"Param": {"Type": "AWS::SSM::Parameter"}}},
+    )
+
+
+def test_assembly_estimate_follows_nested_and_sibling_stacks(tmp_path):
+    _write_assembly(tmp_path)
+
+    estimate = estimate_assembly(str(tmp_path), {"Custom::Organizations_Account": 100})
+
+    # Ou (15) + nested Lane (30 + 2 x 100) + overhead (30), then the shard (5 + 30)
+    assert estimate.stacks["org/Lane"].total_seconds == 200
+    assert estimate.stacks["org"].total_seconds == 245
+    assert estimate.total_seconds == 310
+    assert estimate.critical_path() == [
+        "org/Ou",
+        "org/Lane",
+        "org/Lane/Account1",
+        "org/Lane/Account2",
+        "org-shard/Param",
+    ]
+
+    write_deploy_estimates(str(tmp_path))
+    report = json.loads((tmp_path / "deploy-estimate.json").read_text())
+    assert report["templates"]["org/Lane"]["parallel_waves"] == [
+        ["Account1"],
+        ["Account2"],
+    ]
+    assert '"org/Lane/Account1" -> "org/Lane/Account2" [color=red];' in (
+        (tmp_path / "deploy-estimate.dot").read_text()
+    )
+
+
+def test_account_creation_lanes_shorten_the_estimate(tmp_path):
+    totals = []
+    for lanes in (1, 3):
+        outdir = str(tmp_path / "lanes{}".format(lanes))
+        app = cdk.App(outdir=outdir)
+        OrganizationStack(
+            app, "test-organization", "prod", account_creation_lanes=lanes
+        )
+        app.synth()
+        totals.append(estimate_assembly(outdir).total_seconds)
+
+    assert totals[1] < totals[0]
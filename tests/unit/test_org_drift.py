@@ -0,0 +1,106 @@
+import os
+import json
+
+import boto3
+from moto import mock_organizations
+
+from cdk.helpers.org_drift import diff_org
+from cdk.helpers.org_generator import generate_org_document, generate_org_spec
+from cdk.helpers.org_snapshot import (
+    export_org_snapshot,
+    load_org_snapshot,
+    parse_org_snapshot,
+)
+from cdk.helpers.org_spec import DEFAULT_ORG_SPEC_PATH, load_org_spec
+from cdk import drift
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "org_snapshot.json")
+
+
+def snapshot_document(org_spec):
+    ids = {"": "r-root"}
+    document = {"Roots": [{"Id": "r-root"}], "OrganizationalUnits": [], "Accounts": []}
+    for index, ou in enumerate(org_spec.organizational_units):
+        ids[ou.path] = "ou-{}".format(index)
+        document["OrganizationalUnits"].append(
+            {"Id": ids[ou.path], "Name": ou.name, "ParentId": ids[ou.parent_path]}
+        )
+    for index, account in enumerate(org_spec.accounts):
+        document["Accounts"].append(
+            {
+                "Id": str(index),
+                "Name": account.account_name,
+                "Email": account.email,
+                "ParentId": ids[account.ou_path],
+            }
+        )
+    return document
+
+
+def snapshot_from_spec(org_spec):
+    return parse_org_snapshot(snapshot_document(org_spec))
+
+
+def test_diff_against_snapshot_fixture():
+    report = diff_org(load_org_spec(), load_org_snapshot(FIXTURE))
+
+    assert [str(change) for change in report.changes] == [
+        "+ create ou policy-staging-tests",
+        "+ create account AccountPolicyStagingTests: in 'policy-staging-tests'",
+        "> move account AccountMarketingDev: 200000000006 from 'sandbox' to "
+        "'workloads/marketing/non-prod'",
+        "~ rename ou workloads/finance/non-prod: 'nonprod' -> 'non-prod'",
+        "~ rename account SandboxAccount1: 'sandbox-1' -> 'san99tiago-sandbox-1'",
+        "- orphan ou suspended: ou-demo-9999",
+        "- orphan account old-experiments: 300000000000 in 'suspended'",
+    ]
+
+
+def test_large_org_in_sync_has_no_drift():
+    org_spec = generate_org_spec(5000, depth=4, fanout=5)
+
+    assert not diff_org(org_spec, snapshot_from_spec(org_spec)).has_drift
+
+
+@mock_organizations
+def test_export_snapshot_of_live_org():
+    client = boto3.client("organizations", region_name="us-east-1")
+    client.create_organization(FeatureSet="ALL")
+    root_id = client.list_roots()["Roots"][0]["Id"]
+    ou_id = client.create_organizational_unit(ParentId=root_id, Name="sandbox")[
+        "OrganizationalUnit"
+    ]["Id"]
+    account_id = client.create_account(
+        AccountName="sandbox-1", Email="sandbox-1@example.com"
+    )["CreateAccountStatus"]["AccountId"]
+    client.move_account(
+        AccountId=account_id, SourceParentId=root_id, DestinationParentId=ou_id
+    )
+
+    snapshot = parse_org_snapshot(export_org_snapshot(client))
+
+    assert snapshot.path(snapshot.accounts[account_id].parent_id) == "sandbox"
+    assert snapshot.management_account_id in snapshot.accounts
+
+
+def test_drift_cli_checks_the_spec_of_the_context(tmp_path):
+    document = generate_org_document(6, depth=1, fanout=2)
+    document["policies_dir"] = os.path.join(
+        os.path.dirname(DEFAULT_ORG_SPEC_PATH), "policies"
+    )
+    (tmp_path / "org_spec.json").write_text(json.dumps(document))
+    context = {"org_spec_path": str(tmp_path / "org_spec.json")}
+    (tmp_path / "cdk.context.json").write_text(json.dumps(context))
+    snapshot = snapshot_document(load_org_spec(context["org_spec_path"]))
+    (tmp_path / "snapshot.json").write_text(json.dumps(snapshot))
+    args = [
+        str(tmp_path / "snapshot.json"),
+        "--context",
+        str(tmp_path / "cdk.context.json"),
+        "--fail-on-drift",
+    ]
+
+    assert drift.main(args) == 0
+    # The default spec is not the deployed one
+    assert drift.main(args + ["--spec", DEFAULT_ORG_SPEC_PATH]) == 1
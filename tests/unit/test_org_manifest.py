@@ -0,0 +1,65 @@
+import json
+
+import boto3
+from moto import mock_ssm
+
+from cdk.helpers.org_manifest import OrgManifest, chunk_manifest, manifest_path
+
+
+ENTRIES = [
+    ("workloads/ou-{}".format(index % 7), "account-{}".format(index), str(index))
+    for index in range(500)
+]
+
+
+def test_manifest_chunks_fit_in_ssm_parameters():
+    chunks = chunk_manifest(
+        (ou_path, name, "123456789012") for ou_path, name, _ in ENTRIES
+    )
+
+    assert len(chunks) > 1
+    assert all(
+        len(json.dumps(chunk, separators=(",", ":"))) <= 4096 for chunk in chunks
+    )
+    assert sum(len(accounts) for chunk in chunks for accounts in chunk.values()) == 500
+
+
+@mock_ssm
+def test_manifest_lookup_from_ssm():
+    client = boto3.client("ssm", region_name="us-east-1")
+    for index, chunk in enumerate(chunk_manifest(ENTRIES), start=1):
+        client.put_parameter(
+            Name="{}/org/{}".format(manifest_path("test-organization", "prod"), index),
+            Value=json.dumps(chunk, separators=(",", ":")),
+            Type="String",
+        )
+
+    manifest = OrgManifest.from_ssm(client, "test-organization", "prod")
+
+    assert manifest.account_id("account-42") == "42"
+    assert manifest.ou_path("account-42") == "workloads/ou-0"
+    assert len(manifest.accounts("workloads/ou-3")) == 71
+
+
+def test_manifest_outputs_mode_replaces_account_outputs(synth_org):
+    template = synth_org(outputs_mode="manifest").template
+    assert "AccountFinanceDevId" not in template.find_outputs("*")
+    template.has_output(
+        "OrgManifestPath", {"Value": "/test-organization/prod/org-manifest"}
+    )
+    template.resource_count_is("AWS::SSM::Parameter", 1)
+
+
+def test_manifest_paths_of_the_environments_do_not_collide(synth_org):
+    parameter_names = {}
+    for environment in ("dev", "prod"):
+        template = synth_org(environment, outputs_mode="manifest").template
+        parameters = template.find_resources("AWS::SSM::Parameter")
+        parameter_names[environment] = {
+            parameter["Properties"]["Name"] for parameter in parameters.values()
+        }
+
+    assert parameter_names == {
+        "dev": {"/test-organization/dev/org-manifest/org/1"},
+        "prod": {"/test-organization/prod/org-manifest/org/1"},
+    }
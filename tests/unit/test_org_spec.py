@@ -0,0 +1,62 @@
+import pytest
+
+from cdk.helpers.org_generator import generate_org_spec
+from cdk.helpers.org_spec import load_org_spec, parse_org_spec
+
+
+def test_default_spec_is_flattened_in_order():
+    org_spec = load_org_spec()
+
+    # OUs are in pre-order, so parents are always before children
+    paths = [ou.path for ou in org_spec.organizational_units]
+    for ou in org_spec.organizational_units:
+        if ou.parent_path:
+            assert paths.index(ou.parent_path) < paths.index(ou.path)
+
+    # Accounts are in depth-first order (same as the account creation chain)
+    assert [account.account_name for account in org_spec.accounts] == [
+        "san99tiago-sandbox-1",
+        "shared-services-non-prod",
+        "shared-services-prod",
+        "finance-dev",
+        "finance-qa",
+        "finance-prod",
+        "marketing-dev",
+        "marketing-prod",
+        "policy-staging-tests",
+    ]
+    assert org_spec.accounts[3].ou_path == "workloads/finance/non-prod"
+    assert org_spec.root_policies == ("PolicyDenyLeave", "PolicyAllowSpecificRegions")
+
+
+def test_unknown_policy_is_rejected():
+    document = {
+        "root": {
+            "organizational_units": [
+                {"id": "OUSandbox", "name": "sandbox", "policies": ["Missing"]}
+            ]
+        }
+    }
+    with pytest.raises(ValueError, match="Unknown policy 'Missing'"):
+        parse_org_spec(document, ".")
+
+
+def test_duplicate_construct_id_is_rejected():
+    document = {
+        "root": {
+            "organizational_units": [
+                {"id": "OUSandbox", "name": "sandbox"},
+                {"id": "OUSandbox", "name": "other"},
+            ]
+        }
+    }
+    with pytest.raises(ValueError, match="Duplicate construct id 'OUSandbox'"):
+        parse_org_spec(document, ".")
+
+
+def test_generated_spec_has_requested_size():
+    org_spec = generate_org_spec(accounts=50, depth=3, fanout=2)
+
+    assert len(org_spec.accounts) == 50
+    assert len(org_spec.organizational_units) == 2 + 4 + 8
+    assert {account.ou_path.count("/") for account in org_spec.accounts} == {2}
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from cdk.helpers.org_spec import DEFAULT_ORG_SPEC_PATH, parse_org_spec
+from cdk.helpers.org_tags import app_tags, resolve_org_tags
+
+
+ACCOUNT = "Custom::Organizations_Account"
+
+DOCUMENT = {
+    "root": {
+        "tags": {"DataClassification": "internal"},
+        "organizational_units": [
+            {
+                "id": "OUWorkloads",
+                "name": "workloads",
+                "tags": {"CostCenter": "CC-100", "Owner": "platform"},
+                "organizational_units": [
+                    {
+                        "id": "OUFinance",
+                        "name": "finance",
+                        "tags": {"CostCenter": "CC-200"},
+                        "accounts": [
+                            {
+                                "id": "AccountFinanceProd",
+                                "account_name": "finance-prod",
+                                "email": "finance-prod@example.com",
+                                "tags": {"DataClassification": "confidential"},
+                            }
+                        ],
+                    }
+                ],
+            }
+        ],
+        "accounts": [
+            {
+                "id": "AccountAudit",
+                "account_name": "audit",
+                "email": "audit@example.com",
+            }
+        ],
+    }
+}
+
+
+def test_tags_are_merged_down_the_tree():
+    org_tags = resolve_org_tags(parse_org_spec(DOCUMENT, "."))
+
+    assert org_tags.root == {"DataClassification": "internal"}
+    assert org_tags.organizational_units["workloads/finance"] == {
+        "DataClassification": "internal",
+        "CostCenter": "CC-200",
+        "Owner": "platform",
+    }
+    assert org_tags.accounts["AccountFinanceProd"] == {
+        "DataClassification": "confidential",
+        "CostCenter": "CC-200",
+        "Owner": "platform",
+    }
+    assert org_tags.accounts["AccountAudit"] is org_tags.root
+
+
+@pytest.mark.parametrize(
+    "tags, match",
+    [
+        ({"k" * 129: "value"}, "must have 1 to 128 characters"),
+        ({"Owner": "v" * 257}, "exceeds 256 characters"),
+        ({"aws:owner": "platform"}, "reserved prefix"),
+    ],
+)
+def test_invalid_tags_are_rejected(tags, match):
+    document = {"root": {"organizational_units": [{"id": "OU", "name": "ou"}]}}
+    document["root"]["organizational_units"][0]["tags"] = tags
+
+    with pytest.raises(ValueError, match=match):
+        resolve_org_tags(parse_org_spec(document, "."))
+
+
+def test_app_tags_count_against_the_tags_quota():
+    # 48 app tags + "DataClassification" + "CostCenter" + "Owner" > 50
+    base_tags = {"Tag{}".format(index): "value" for index in range(48)}
+
+    with pytest.raises(ValueError, match="OU 'workloads' would have 51 tags"):
+        resolve_org_tags(parse_org_spec(DOCUMENT, "."), base_tags)
+
+
+def test_spec_tags_are_set_on_the_accounts(synth_org):
+    index = synth_org(
+        org_spec=parse_org_spec(DOCUMENT, os.path.dirname(DEFAULT_ORG_SPEC_PATH)),
+        app_tags=app_tags("test-organization", "prod", {"Owner": "app-owner"}),
+    ).index
+
+    account_id = index.logical_id("AccountFinanceProd", ACCOUNT)
+    (tag_resource,) = [
+        resource
+        for resource in index.of_type("Custom::Organizations_TagResource").values()
+        if resource["Properties"]["ResourceId"]["Fn::GetAtt"][0] == account_id
+    ]
+    assert tag_resource["Properties"]["Tags"] == [
+        {"Key": "CostCenter", "Value": "CC-200"},
+        {"Key": "DataClassification", "Value": "confidential"},
+        {"Key": "Environment", "Value": "prod"},
+        {"Key": "MainResourcesName", "Value": "test-organization"},
+        {"Key": "Owner", "Value": "platform"},
+    ]
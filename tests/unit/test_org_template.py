@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from cdk.helpers.org_spec import DEFAULT_ORG_SPEC_PATH, load_org_spec
+from cdk.helpers.policy_library import PolicyLibrary
+
+
+ACCOUNT = "Custom::Organizations_Account"
+ORGANIZATIONAL_UNIT = "Custom::Organizations_OrganizationalUnitProvider"
+POLICY = "Custom::Organizations_Policy"
+
+# Collected once, so each account, OU and SCP of the spec is its own test case
+ORG_SPEC = load_org_spec()
+OU_SPECS = {ou_spec.path: ou_spec for ou_spec in ORG_SPEC.organizational_units}
+
+
+def parent_id(org, ou_path):
+    if not ou_path:
+        (root_id,) = org.index.of_type("Custom::Organizations_Root")
+        return {"Fn::GetAtt": [root_id, "Roots.0.Id"]}
+    return {
+        "Fn::GetAtt": [
+            org.index.logical_id(OU_SPECS[ou_path].construct_id, ORGANIZATIONAL_UNIT),
+            "Id",
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "account_spec", ORG_SPEC.accounts, ids=lambda spec: spec.construct_id
+)
+def test_account_is_created_in_its_ou(org, account_spec):
+    properties = org.index.resource(account_spec.construct_id, ACCOUNT)["Properties"]
+
+    assert properties["AccountName"] == account_spec.account_name
+    assert properties["Email"] == account_spec.email
+    assert properties["ParentId"] == parent_id(org, account_spec.ou_path)
+
+
+@pytest.mark.parametrize(
+    "account_spec", ORG_SPEC.accounts, ids=lambda spec: spec.construct_id
+)
+def test_account_id_is_an_output(org, account_spec):
+    output = org.index.outputs[
+        account_spec.output_id or "{}Id".format(account_spec.construct_id)
+    ]
+
+    assert output["Value"] == {
+        "Fn::GetAtt": [
+            org.index.logical_id(account_spec.construct_id, ACCOUNT),
+            "AccountId",
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "account_spec", ORG_SPEC.accounts, ids=lambda spec: spec.construct_id
+)
+def test_account_waits_for_the_previous_account_creation(org, account_spec):
+    schedule = org.stack.account_schedule
+    lane = schedule.lanes[schedule.lane_index[account_spec.construct_id]]
+    position = lane.index(account_spec.construct_id)
+    depends_on = org.index.resource(account_spec.construct_id, ACCOUNT).get(
+        "DependsOn", []
+    )
+
+    # Only the previous account of the lane, so lanes are created in parallel
+    assert set(depends_on).intersection(org.index.of_type(ACCOUNT)) == (
+        {org.index.logical_id(lane[position - 1], ACCOUNT)} if position else set()
+    )
+
+
+@pytest.mark.parametrize(
+    "ou_spec", ORG_SPEC.organizational_units, ids=lambda spec: spec.construct_id
+)
+def test_ou_is_created_under_its_parent(org, ou_spec):
+    properties = org.index.resource(ou_spec.construct_id, ORGANIZATIONAL_UNIT)[
+        "Properties"
+    ]
+
+    assert properties["Name"] == ou_spec.name
+    assert properties["ParentId"] == parent_id(org, ou_spec.parent_path)
+
+
+@pytest.mark.parametrize(
+    "policy_spec", ORG_SPEC.policies, ids=lambda spec: spec.construct_id
+)
+def test_scp_content_comes_from_the_policy_library(org, policy_spec):
+    create = json.loads(
+        org.index.resource(policy_spec.construct_id, POLICY)["Properties"]["Create"]
+    )
+
+    assert create["parameters"]["Name"] == policy_spec.policy_name
+    assert json.loads(create["parameters"]["Content"]) == json.loads(
+        PolicyLibrary(ORG_SPEC.policies_dir).content(policy_spec.document)
+    )
+
+
+def test_resource_counts_match_the_spec(org):
+    assert len(org.index.of_type(ACCOUNT)) == len(ORG_SPEC.accounts)
+    assert len(org.index.of_type(ORGANIZATIONAL_UNIT)) == len(OU_SPECS)
+    assert len(org.index.of_type(POLICY)) == len(ORG_SPEC.policies)
+
+
+def test_synth_org_is_cached_per_parameter_set(synth_org, org):
+    assert synth_org() is org
+    assert synth_org("prod") is org
+    assert synth_org("dev") is not org
+
+
+def test_unattached_spec_policies_are_reported(tmp_path, synth_org, org):
+    with open(DEFAULT_ORG_SPEC_PATH, "r") as file:
+        document = json.load(file)
+    document["policies_dir"] = ORG_SPEC.policies_dir
+    document["policies"]["PolicyUnused"] = {
+        "document": "scp_prevent_leaving_org",
+        "policy_name": "Unused",
+    }
+    spec_file = tmp_path / "org_spec.json"
+    spec_file.write_text(json.dumps(document))
+
+    unused = synth_org(org_spec_path=str(spec_file))
+
+    assert org.stack.unattached_policies == []
+    assert unused.stack.unattached_policies == ["PolicyUnused"]
+    # Only attached SCPs are synthesized
+    assert len(unused.index.of_type(POLICY)) == len(ORG_SPEC.policies)
@@ -0,0 +1,149 @@
+import os
+import copy
+import json
+import subprocess
+import sys
+import time
+
+from cdk.helpers.account_scheduler import schedule_account_lanes
+from cdk.helpers.dependency_graph import DependencyGraph
+from cdk.helpers.org_generator import generate_org_document, generate_org_spec
+from cdk.helpers.org_spec import DEFAULT_ORG_SPEC_PATH, load_org_spec
+from cdk.helpers.org_validator import (
+    validate_org,
+    validate_org_document,
+    validate_org_spec_file,
+)
+from cdk import validate
+
+
+STACKS_DIR = os.path.dirname(DEFAULT_ORG_SPEC_PATH)
+
+
+def _codes(report):
+    return [issue.code for issue in report.issues]
+
+
+def test_default_spec_is_valid():
+    report = validate_org_spec_file(DEFAULT_ORG_SPEC_PATH, account_creation_lanes=3)
+
+    assert report.ok, report.issues
+    assert report.issues == []
+
+
+def test_all_the_mistakes_are_reported_at_once():
+    document = generate_org_document(8, depth=1, fanout=2)
+    ous = document["root"]["organizational_units"]
+    ous.append({"id": "OUDuplicated", "name": "OU-0"})
+    accounts = ous[0]["accounts"]
+    accounts[1]["email"] = accounts[0]["email"].upper()
+    accounts[2]["account_name"] = accounts[0]["account_name"]
+    accounts[3]["email"] = "not-an-email"
+    ous[1]["tags"] = {"aws:owner": "platform"}
+
+    report = validate_org_document(document, STACKS_DIR)
+
+    assert not report.ok
+    assert _codes(report) == [
+        "duplicate-ou",
+        "duplicate-email",
+        "duplicate-account-name",
+        "email",
+        "tags",
+    ]
+
+
+def test_parse_errors_are_reported():
+    document = generate_org_document(2, depth=1, fanout=1)
+    document["root"]["organizational_units"][0]["policies"] = ["Missing"]
+
+    report = validate_org_document(document, STACKS_DIR)
+
+    assert _codes(report) == ["spec"]
+    assert "Unknown policy 'Missing'" in report.errors[0].message
+
+
+def test_scp_quotas_are_checked(tmp_path):
+    (tmp_path / "policies").mkdir()
+    document = generate_org_document(2, depth=1, fanout=1)
+    document["policies"] = {}
+    for index in range(5):
+        # Policy4 repeats one action 200 times (over the size before compacting)
+        statement = {
+            "Effect": "Deny",
+            "Action": ["service{}:{}".format(index, "a" * 30)]
+            * (1 + 199 * (index == 4)),
+            "Resource": "*",
+        }
+        (tmp_path / "policies" / "scp{}.json".format(index)).write_text(
+            json.dumps({"Version": "2012-10-17", "Statement": [statement]})
+        )
+        document["policies"]["Policy{}".format(index)] = {
+            "document": "scp{}".format(index),
+            "policy_name": "Policy{}".format(index),
+        }
+    document["root"]["policies"] = list(document["policies"])
+
+    report = validate_org_document(copy.deepcopy(document), str(tmp_path))
+    assert _codes(report) == ["scp-size", "scp-count"]
+
+    # The optimizer dedups the actions and packs the 5 SCPs of the root
+    optimized = validate_org_document(document, str(tmp_path), optimize_policies=True)
+    assert _codes(optimized) == []
+
+
+def test_a_dropped_account_dependency_is_reported():
+    org_spec = load_org_spec(DEFAULT_ORG_SPEC_PATH)
+    account_ids = [account_spec.construct_id for account_spec in org_spec.accounts]
+    schedule = schedule_account_lanes(account_ids, 1)
+
+    # The chain check uses the same lanes as "add_cdk_accounts_dependencies"
+    assert validate_org(org_spec, account_creation_lanes=1).ok
+    assert validate_org(org_spec, account_dependencies=schedule.graph).ok
+
+    # Without the dependency of the second account, it is created at the
+    # same time as the first one
+    dropped_graph = DependencyGraph()
+    for account_id in schedule.graph.nodes:
+        dropped_graph.add_node(account_id)
+    for account_id, dependency in schedule.graph.edges():
+        if account_id != account_ids[1]:
+            dropped_graph.add_dependency(account_id, dependency)
+    dropped = validate_org(org_spec, account_dependencies=dropped_graph)
+    assert _codes(dropped) == ["account-chain"]
+    assert dropped.errors[0].message.startswith("Up to 2 accounts can be created")
+
+
+def test_validate_applies_the_account_inventory_of_the_context(tmp_path):
+    with open(validate.DEFAULT_CONTEXT_PATH, "r") as file:
+        context = json.load(file)
+    inventory = {"Accounts": [{"Email": "nobody@example.com", "Id": "123456789012"}]}
+    (tmp_path / "inventory.json").write_text(json.dumps(inventory))
+    context["account_inventory_path"] = str(tmp_path / "inventory.json")
+    (tmp_path / "cdk.context.json").write_text(json.dumps(context))
+    assert validate.main(["--context", str(tmp_path / "cdk.context.json")]) == 0
+
+    (tmp_path / "inventory.json").write_text(json.dumps({"accounts": []}))
+    assert validate.main(["--context", str(tmp_path / "cdk.context.json")]) == 1
+
+
+def test_thousands_of_accounts_validate_in_under_a_second_without_jsii():
+    org_spec = generate_org_spec(5000, depth=4, fanout=5)
+
+    start = time.perf_counter()
+    report = validate_org(org_spec, account_creation_lanes=4)
+
+    assert time.perf_counter() - start < 1.0
+    assert report.ok
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, validate; print(validate.main([]), 'jsii' in sys.modules)",
+        ],
+        cwd=os.path.dirname(STACKS_DIR),
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout.splitlines()[-1] == "0 False"
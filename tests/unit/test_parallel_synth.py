@@ -0,0 +1,83 @@
+import os
+import sys
+import json
+import subprocess
+
+from cdk.helpers.org_generator import generate_org_spec
+from cdk.helpers.org_spec import load_org_spec
+from cdk.helpers.parallel_synth import APP_FILE, plan_shard_groups
+
+
+CONTEXT_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(APP_FILE)), "cdk.context.json"
+)
+
+# The app caps the workers to the CPU cores, so the cap is lifted to force the
+# worker processes (and the merge) even on single core runners
+RUN_APP = (
+    "import os, sys, runpy\n"
+    "os.cpu_count = lambda: 2\n"
+    "sys.path.insert(0, os.path.dirname(sys.argv[1]))\n"
+    "runpy.run_path(sys.argv[1], run_name='__main__')\n"
+)
+
+
+def synth_templates(outdir, **context):
+    with open(CONTEXT_FILE, "r") as file:
+        app_context = dict(json.load(file), sharding_mode="stacks", **context)
+    env = dict(
+        os.environ,
+        CDK_OUTDIR=str(outdir),
+        CDK_CONTEXT_JSON=json.dumps(app_context),
+        DEPLOYMENT_ENVIRONMENT="prod",
+    )
+    for name in ("CDK_DEFAULT_ACCOUNT", "CDK_DEFAULT_REGION", "SYNTH_PROFILE"):
+        env.pop(name, None)
+    result = subprocess.run(
+        [sys.executable, "-c", RUN_APP, APP_FILE],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout, {
+        name: json.loads((outdir / name).read_text())
+        for name in os.listdir(outdir)
+        if name.endswith(".template.json")
+    }
+
+
+def test_shards_are_balanced_between_workers():
+    org_spec = load_org_spec()
+    shard_paths = ["sandbox", "infrastructure", "workloads", "policy-staging-tests"]
+
+    # "workloads" has 7 OUs and 5 accounts, the other shards 9 in total
+    assert plan_shard_groups(org_spec, shard_paths, 2) == [
+        ["sandbox", "infrastructure", "policy-staging-tests"],
+        ["workloads"],
+    ]
+    assert plan_shard_groups(org_spec, shard_paths, 8) == [
+        [path] for path in shard_paths
+    ]
+    assert plan_shard_groups(org_spec, [], 4) == []
+
+
+def test_every_shard_is_planned_once():
+    org_spec = generate_org_spec(1000, depth=2, fanout=7)
+    shard_paths = [
+        ou.path for ou in org_spec.organizational_units if not ou.parent_path
+    ]
+
+    groups = plan_shard_groups(org_spec, shard_paths, 3)
+
+    assert len(groups) == 3
+    assert sorted(path for group in groups for path in group) == sorted(shard_paths)
+
+
+def test_parallel_synth_merges_the_same_templates_as_a_serial_synth(tmp_path):
+    _, serial = synth_templates(tmp_path / "serial")
+    output, parallel = synth_templates(tmp_path / "parallel", parallel_synth=2)
+
+    assert "--> Parallel synth: 4 shards in 2 worker processes" in output
+    assert any(name.endswith(".nested.template.json") for name in serial)
+    assert parallel == serial
@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from cdk.helpers.policy_library import PolicyLibrary
+
+
+def test_policy_content_is_minified_and_memoized(tmp_path):
+    (tmp_path / "deny_leave.json").write_text(
+        json.dumps({"Version": "2012-10-17", "Statement": []}, indent=4)
+    )
+    (tmp_path / "README.md").write_text("not a policy")
+    library = PolicyLibrary(str(tmp_path))
+
+    assert library.names == ["deny_leave"]
+    assert library.content("deny_leave") == '{"Version":"2012-10-17","Statement":[]}'
+
+    # Later changes on disk are not read again
+    (tmp_path / "deny_leave.json").write_text("{}")
+    assert library.document("deny_leave") == {"Version": "2012-10-17", "Statement": []}
+
+
+def test_unknown_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="not found"):
+        PolicyLibrary(str(tmp_path)).content("missing")
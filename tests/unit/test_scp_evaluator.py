@@ -0,0 +1,140 @@
+import os
+import copy
+import json
+import time
+
+import pytest
+
+from cdk.helpers.org_generator import generate_org_document, generate_org_spec
+from cdk.helpers.org_spec import DEFAULT_ORG_SPEC_PATH, load_org_spec, parse_org_spec
+from cdk.helpers.policy_library import PolicyLibrary
+from cdk.helpers.scp_evaluator import ScpEvaluator
+from cdk import scp_query
+
+
+REGIONS_DOCUMENT = "scp_allow_specific_regions"
+
+
+def test_actions_are_denied_by_inherited_scps():
+    evaluator = ScpEvaluator(load_org_spec())
+
+    denied = evaluator.is_allowed("finance-prod", "ec2:RunInstances", "sa-east-1")
+    assert not denied
+    assert denied.policy_id == "PolicyAllowSpecificRegions"
+    assert evaluator.is_allowed("AccountFinanceProd", "ec2:RunInstances", "us-east-1")
+    # Global services are excluded with "NotAction" (case insensitive actions)
+    assert evaluator.is_allowed("finance-prod", "IAM:CreateRole", "sa-east-1")
+    assert evaluator.is_allowed("finance-prod", "s3:GetAccountPublicAccessBlock")
+    assert not evaluator.is_allowed(
+        "finance-prod", "organizations:LeaveOrganization", "us-east-1"
+    )
+
+
+def test_conditions_resources_and_levels():
+    document = {
+        "policies": {
+            "PolicyRegions": {"document": REGIONS_DOCUMENT, "policy_name": "Regions"},
+        },
+        "root": {
+            "organizational_units": [
+                {
+                    "id": "OUSandbox",
+                    "name": "sandbox",
+                    "policies": ["PolicyRegions"],
+                    "accounts": [
+                        {"id": "Sandbox", "account_name": "sb", "email": "s@x.com"}
+                    ],
+                },
+            ],
+            "accounts": [{"id": "Shared", "account_name": "sh", "email": "h@x.com"}],
+        },
+    }
+    org_spec = parse_org_spec(document, "")
+    library = PolicyLibrary(load_org_spec().policies_dir)
+    evaluator = ScpEvaluator(org_spec, library)
+
+    assert evaluator.account_policies("sb") == ("PolicyRegions",)
+    assert evaluator.is_allowed("sh", "ec2:RunInstances", "sa-east-1")
+    assert not evaluator.is_allowed("sb", "ec2:RunInstances", "sa-east-1")
+    # Without a region, the region condition can't be decided either way
+    decision = evaluator.is_allowed("sb", "ec2:RunInstances")
+    assert not decision and decision.region_dependent
+    assert decision.reason == (
+        "Depends on the requested region (PolicyRegions (DenyAllOutsideUS) has "
+        "a condition on aws:RequestedRegion)"
+    )
+    assert evaluator.is_allowed("sb", "iam:CreateRole")
+    assert evaluator.is_allowed("sh", "ec2:RunInstances")
+    assert not evaluator.is_allowed(
+        "sb", "ec2:RunInstances", "sa-east-1"
+    ).region_dependent
+
+    # Without "FullAWSAccess", every level needs an SCP that allows the action
+    strict = ScpEvaluator(org_spec, library, full_aws_access=False)
+    assert not strict.is_allowed("sh", "ec2:RunInstances", "us-east-1")
+    assert not strict.is_allowed("sb", "ec2:RunInstances").region_dependent
+
+    with pytest.raises(ValueError, match="Unknown account"):
+        evaluator.is_allowed("missing", "ec2:RunInstances")
+
+
+def test_changes_only_invalidate_the_affected_subtree():
+    org_spec = generate_org_spec(64, depth=2, fanout=4)
+    evaluator = ScpEvaluator(org_spec)
+    subtree_accounts = evaluator.set_attachments("ou:ou-0", ["PolicyDenyLeave"])
+
+    assert len(subtree_accounts) == 16
+    document = copy.deepcopy(evaluator.policy_library.document(REGIONS_DOCUMENT))
+    document["Statement"][0]["Condition"]["StringNotEquals"][
+        "aws:RequestedRegion"
+    ].append("sa-east-1")
+    affected = evaluator.update_document(REGIONS_DOCUMENT, document)
+
+    assert len(affected) == 64
+    assert evaluator.is_allowed("Account00000", "ec2:RunInstances", "sa-east-1")
+
+
+def test_what_if_of_a_changed_document_on_a_large_org():
+    org_spec = generate_org_spec(1000, depth=3, fanout=4)
+    evaluator = ScpEvaluator(org_spec)
+    actions = ["svc{}:Action{}".format(index % 50, index) for index in range(495)]
+    actions += ["ec2:RunInstances", "iam:CreateRole", "s3:GetObject", "sts:*", "kms:x"]
+    document = copy.deepcopy(evaluator.policy_library.document(REGIONS_DOCUMENT))
+    document["Statement"][0]["NotAction"].append("s3:*")
+
+    start = time.perf_counter()
+    report = evaluator.what_if(
+        {REGIONS_DOCUMENT: document}, actions, ["sa-east-1", "us-east-1"]
+    )
+    elapsed = time.perf_counter() - start
+
+    assert len(report.affected_accounts) == 1000
+    assert not report.newly_denied
+    assert report.newly_allowed["Account00999"] == {("s3:GetObject", "sa-east-1")}
+    # The evaluator itself is not changed by the what-if
+    assert not evaluator.is_allowed("Account00999", "s3:GetObject", "sa-east-1")
+    assert elapsed < 1.0
+
+
+def test_query_cli_uses_the_spec_of_the_context(tmp_path):
+    document = generate_org_document(2, depth=1, fanout=1)
+    document["policies_dir"] = os.path.join(
+        os.path.dirname(DEFAULT_ORG_SPEC_PATH), "policies"
+    )
+    (tmp_path / "regions.json").write_text(json.dumps(document))
+    # The deployed spec has no region restriction
+    document["root"]["policies"].remove("PolicyAllowSpecificRegions")
+    (tmp_path / "org_spec.json").write_text(json.dumps(document))
+    context = {"org_spec_path": str(tmp_path / "org_spec.json")}
+    (tmp_path / "cdk.context.json").write_text(json.dumps(context))
+    args = [
+        "account-00000",
+        "ec2:RunInstances",
+        "--region",
+        "sa-east-1",
+        "--context",
+        str(tmp_path / "cdk.context.json"),
+    ]
+
+    assert scp_query.main(args) == 0
+    assert scp_query.main(args + ["--spec", str(tmp_path / "regions.json")]) == 1
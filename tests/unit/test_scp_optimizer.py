@@ -0,0 +1,132 @@
+import json
+
+import pytest
+
+from cdk.helpers.org_spec import parse_org_spec
+from cdk.helpers.policy_library import PolicyLibrary
+from cdk.helpers.scp_optimizer import merge_statements, optimize_scps
+
+
+def deny(actions, condition=None, sid=None):
+    statement = {"Effect": "Deny", "Action": actions, "Resource": ["*"]}
+    if condition:
+        statement["Condition"] = condition
+    if sid:
+        statement["Sid"] = sid
+    return statement
+
+
+def write_policies(tmp_path, documents):
+    for name, statements in documents.items():
+        (tmp_path / "{}.json".format(name)).write_text(
+            json.dumps({"Version": "2012-10-17", "Statement": statements}, indent=4)
+        )
+    return PolicyLibrary(str(tmp_path))
+
+
+def build_spec(tmp_path, root_policies, ou_policies):
+    policies = {
+        name: {"document": name, "policy_name": name.title()}
+        for name in set(root_policies) | set(ou_policies)
+    }
+    document = {
+        "policies_dir": ".",
+        "policies": policies,
+        "root": {
+            "policies": root_policies,
+            "organizational_units": [
+                {"id": "OUSandbox", "name": "sandbox", "policies": ou_policies}
+            ],
+        },
+    }
+    return parse_org_spec(document, str(tmp_path))
+
+
+def test_statements_with_same_condition_are_merged():
+    condition = {"StringEquals": {"aws:PrincipalTag/Team": "sandbox"}}
+    statements = merge_statements(
+        [
+            deny(["s3:*"], condition, sid="DenyS3"),
+            deny("ec2:RunInstances", condition, sid="DenyEC2"),
+            deny(["s3:GetObject", "s3:*"], condition, sid="DenyS3"),
+            deny(["iam:*"]),
+        ]
+    )
+
+    assert statements == [
+        {
+            "Effect": "Deny",
+            "Action": ["s3:*", "ec2:RunInstances"],
+            "Resource": "*",
+            "Condition": condition,
+            "Sid": "DenyS3",
+        },
+        {"Effect": "Deny", "Action": "iam:*", "Resource": "*"},
+    ]
+
+
+def test_policies_with_same_targets_are_packed(tmp_path):
+    library = write_policies(
+        tmp_path,
+        {
+            "deny_leave": [deny(["organizations:LeaveOrganization"])],
+            "deny_regions": [deny(["ec2:*"], {"Bool": {"aws:ViaAWSService": "false"}})],
+            "deny_root": [deny(["*"], {"StringLike": {"aws:PrincipalArn": "*:root"}})],
+        },
+    )
+    org_spec = build_spec(tmp_path, ["deny_leave", "deny_regions"], ["deny_root"])
+
+    optimization = optimize_scps(org_spec, library)
+
+    (root_policy,) = optimization.attachments["root"]
+    assert optimization.policies[root_policy].members == ("deny_leave", "deny_regions")
+    assert optimization.attachments["ou:sandbox"] == ("deny_root",)
+    # Saved against the minified documents the stack embeds without the optimizer
+    assert optimization.original_bytes == sum(
+        len(library.content(name))
+        for name in ("deny_leave", "deny_regions", "deny_root")
+    )
+    assert optimization.bytes_saved > 0
+    assert all(len(policy.content) <= 5120 for policy in optimization.policies.values())
+
+
+def test_policies_over_the_quotas_are_rejected(tmp_path):
+    library = write_policies(
+        tmp_path, {"large": [deny(["s3:Action{}".format(i) for i in range(500)])]}
+    )
+    org_spec = build_spec(tmp_path, ["large"], [])
+
+    with pytest.raises(ValueError, match="over 5120 characters"):
+        optimize_scps(org_spec, library)
+
+
+def test_the_digest_covers_the_packing_of_the_whole_org(tmp_path):
+    library = write_policies(
+        tmp_path,
+        {
+            "deny_leave": [deny(["organizations:LeaveOrganization"])],
+            "deny_regions": [deny(["ec2:*"])],
+            "deny_root": [deny(["iam:*"])],
+        },
+    )
+    digest = optimize_scps(
+        build_spec(tmp_path, ["deny_leave", "deny_regions"], ["deny_root"]), library
+    ).digest
+
+    # Attaching a root SCP to the OU repacks the root SCPs too
+    repacked = optimize_scps(
+        build_spec(
+            tmp_path, ["deny_leave", "deny_regions"], ["deny_root", "deny_leave"]
+        ),
+        library,
+    )
+    assert repacked.digest != digest
+    assert (
+        repacked.digest
+        == optimize_scps(
+            build_spec(
+                tmp_path, ["deny_leave", "deny_regions"], ["deny_root", "deny_leave"]
+            ),
+            library,
+        ).digest
+    )
@@ -0,0 +1,175 @@
+import pytest
+
+from cdk.helpers.org_generator import generate_org_spec
+from cdk.helpers.org_spec import load_org_spec, parse_org_spec
+from cdk.helpers.org_validator import validate_org
+from cdk.helpers.policy_library import PolicyLibrary
+from cdk.helpers.scp_evaluator import ScpEvaluator
+from cdk.helpers.scp_placement import place_scps
+
+
+def account(construct_id, policies=()):
+    return {
+        "id": construct_id,
+        "account_name": construct_id.lower(),
+        "email": "{}@example.com".format(construct_id.lower()),
+        "policies": list(policies),
+    }
+
+
+def build_spec():
+    policies = {
+        name: {"document": document, "policy_name": name}
+        for name, document in (
+            ("PolicyRegions", "scp_allow_specific_regions"),
+            ("PolicyLeave", "scp_prevent_leaving_org"),
+        )
+    }
+    document = {
+        "policies_dir": load_org_spec().policies_dir,
+        "policies": policies,
+        "root": {
+            "organizational_units": [
+                {
+                    "id": "OUWorkloads",
+                    "name": "workloads",
+                    "organizational_units": [
+                        {
+                            "id": "OUFinance",
+                            "name": "finance",
+                            "accounts": [
+                                account("FinanceDev", ["PolicyRegions"]),
+                                account("FinanceProd", ["PolicyRegions"]),
+                            ],
+                        },
+                        {
+                            "id": "OUSales",
+                            "name": "sales",
+                            "policies": ["PolicyRegions"],
+                            "accounts": [
+                                account("SalesDev", ["PolicyLeave"]),
+                                account("SalesProd"),
+                            ],
+                        },
+                    ],
+                },
+                {
+                    "id": "OUSandbox",
+                    "name": "sandbox",
+                    "policies": ["PolicyLeave"],
+                    "accounts": [
+                        account("SandboxA", ["PolicyLeave", "PolicyRegions"]),
+                        account("SandboxB"),
+                    ],
+                },
+            ],
+            "accounts": [account("Shared", ["PolicyLeave"])],
+        },
+    }
+    return parse_org_spec(document, "")
+
+
+def test_only_inherited_attachments_are_dropped_by_default():
+    placement = place_scps(build_spec())
+
+    assert placement.hoists == () and placement.warnings() == []
+    assert placement.inherited == (("account:SandboxA", "PolicyLeave"),)
+    assert placement.org_spec.root_policies == ()
+    assert placement.placed_attachments == placement.original_attachments - 1
+
+
+def test_policies_are_hoisted_to_the_lowest_common_ou():
+    placement = place_scps(build_spec(), hoist_mode="ous")
+    org_spec = placement.org_spec
+
+    attachments = {ou.path: ou.policies for ou in org_spec.organizational_units}
+    assert attachments == {
+        "workloads": ("PolicyRegions",),
+        "workloads/finance": (),
+        "workloads/sales": (),
+        "sandbox": ("PolicyLeave",),
+    }
+    assert org_spec.root_policies == ()
+    assert {
+        account.construct_id: account.policies for account in org_spec.accounts
+    } == {
+        "FinanceDev": (),
+        "FinanceProd": (),
+        "SalesDev": ("PolicyLeave",),
+        "SalesProd": (),
+        "SandboxA": ("PolicyRegions",),
+        "SandboxB": (),
+        "Shared": ("PolicyLeave",),
+    }
+    assert [(hoist.policy_id, hoist.target) for hoist in placement.hoists] == [
+        ("PolicyRegions", "ou:workloads/finance"),
+        ("PolicyRegions", "ou:workloads"),
+    ]
+    assert placement.inherited == (("account:SandboxA", "PolicyLeave"),)
+    assert (placement.original_attachments, placement.placed_attachments) == (8, 5)
+    assert placement.summary().startswith("8 SCP attachments placed as 5 (3 saved")
+    # Every hoist widens the SCP to the targets of the OU that are not in the spec
+    assert placement.warnings() == [
+        "SCP 'PolicyRegions' is hoisted to ou:workloads/finance, so it also "
+        "applies to the accounts and OUs under it that are not in the spec",
+        "SCP 'PolicyRegions' is hoisted to ou:workloads, so it also applies to "
+        "the accounts and OUs under it that are not in the spec",
+    ]
+
+
+def test_policies_are_only_hoisted_to_the_root_on_demand():
+    document = {
+        "policies_dir": load_org_spec().policies_dir,
+        "policies": {
+            "PolicyLeave": {
+                "document": "scp_prevent_leaving_org",
+                "policy_name": "PolicyLeave",
+            }
+        },
+        "root": {
+            "accounts": [account("A", ["PolicyLeave"]), account("B", ["PolicyLeave"])]
+        },
+    }
+    org_spec = parse_org_spec(document, "")
+
+    assert place_scps(org_spec, hoist_mode="ous").hoists == ()
+    placement = place_scps(org_spec, hoist_mode="root")
+    assert [(hoist.policy_id, hoist.target) for hoist in placement.hoists] == [
+        ("PolicyLeave", "root")
+    ]
+    assert placement.org_spec.root_policies == ("PolicyLeave",)
+    with pytest.raises(ValueError, match="Invalid SCP hoist mode"):
+        place_scps(org_spec, hoist_mode="everywhere")
+
+
+def test_placement_keeps_the_effective_policies_of_every_account():
+    org_spec = build_spec()
+    library = PolicyLibrary(org_spec.policies_dir)
+    original = ScpEvaluator(org_spec, library)
+    placed = ScpEvaluator(place_scps(org_spec, hoist_mode="root").org_spec, library)
+
+    for account_spec in org_spec.accounts:
+        name = account_spec.account_name
+        assert set(placed.account_policies(name)) == set(
+            original.account_policies(name)
+        )
+        for action in ("ec2:RunInstances", "organizations:LeaveOrganization"):
+            assert bool(placed.is_allowed(name, action, "sa-east-1")) == bool(
+                original.is_allowed(name, action, "sa-east-1")
+            )
+
+
+def test_hoists_respect_the_attachments_quota():
+    placement = place_scps(build_spec(), max_per_target=0, hoist_mode="root")
+
+    assert placement.hoists == ()
+    assert placement.attachments_saved == len(placement.inherited) == 1
+
+
+def test_generated_org_keeps_validating_after_the_placement():
+    org_spec = generate_org_spec(200)
+
+    placement = place_scps(org_spec, hoist_mode="root")
+
+    assert placement.placed_attachments <= placement.original_attachments
+    assert validate_org(org_spec, place_policies=True, scp_hoist_mode="root").ok
@@ -0,0 +1,83 @@
+import os
+import json
+import dataclasses
+
+from cdk.helpers.account_scheduler import schedule_account_lanes
+from cdk.helpers.org_spec import load_org_spec
+from cdk.helpers.synth_cache import SynthCache, shard_cache_keys
+
+
+def _shard_keys(org_spec):
+    schedule = schedule_account_lanes(
+        [account.construct_id for account in org_spec.accounts], 1
+    )
+    return shard_cache_keys(org_spec, schedule, salt={"source": "test"})
+
+
+def test_only_the_changed_shard_gets_a_new_key():
+    org_spec = load_org_spec()
+    keys = _shard_keys(org_spec)
+
+    accounts = list(org_spec.accounts)
+    accounts[5] = dataclasses.replace(accounts[5], email="changed@example.com")
+    changed_keys = _shard_keys(dataclasses.replace(org_spec, accounts=tuple(accounts)))
+
+    assert accounts[5].ou_path == "workloads/finance/prod"
+    assert [path for path in keys if keys[path] != changed_keys[path]] == ["workloads"]
+
+
+def _write_assembly(outdir, artifact_id, template):
+    os.makedirs(os.path.join(outdir, "asset.abc"), exist_ok=True)
+    with open(os.path.join(outdir, "asset.abc", "index.py"), "w") as file:
+        file.write("handler = None\n")
+    files = {
+        "{}.template.json".format(artifact_id): template,
+        "{}.assets.json".format(artifact_id): {
+            "files": {"abc": {"source": {"path": "asset.abc", "packaging": "zip"}}}
+        },
+        "manifest.json": {
+            "artifacts": {
+                artifact_id: {
+                    "type": "aws:cloudformation:stack",
+                    "properties": {
+                        "templateFile": "{}.template.json".format(artifact_id)
+                    },
+                    "dependencies": ["{}.assets".format(artifact_id)],
+                },
+                "{}.assets".format(artifact_id): {
+                    "type": "cdk:asset-manifest",
+                    "properties": {"file": "{}.assets.json".format(artifact_id)},
+                },
+            }
+        },
+    }
+    for name, content in files.items():
+        with open(os.path.join(outdir, name), "w") as file:
+            json.dump(content, file)
+
+
+def test_store_and_restore_stack(tmp_path):
+    synth_cache = SynthCache(str(tmp_path / "cache"))
+    built, placeholder = str(tmp_path / "built"), str(tmp_path / "placeholder")
+    _write_assembly(built, "shard", {"Resources": {"A": {"Type": "Custom"}}})
+    _write_assembly(placeholder, "shard", {})
+
+    synth_cache.store_stack("key", built, "shard")
+    restored = synth_cache.restore_stack("key", placeholder)
+
+    assert restored == ["shard", "shard.assets"]
+    with open(os.path.join(placeholder, "shard.template.json")) as file:
+        assert json.load(file) == {"Resources": {"A": {"Type": "Custom"}}}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    synth_cache = SynthCache(str(tmp_path / "cache"), max_entries=2)
+    outdir = str(tmp_path / "out")
+    _write_assembly(outdir, "shard", {})
+
+    for index, key in enumerate(["first", "second", "third"]):
+        synth_cache.store_stack(key, outdir, "shard")
+        os.utime(os.path.join(synth_cache.directory, key), (index, index))
+
+    assert not synth_cache.has("first")
+    assert synth_cache.has("second") and synth_cache.has("third")
@@ -0,0 +1,48 @@
+import json
+
+import aws_cdk as cdk
+
+from cdk.helpers.synth_profiler import SynthProfiler
+
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    profiler = SynthProfiler()
+    app = cdk.App()
+
+    with profiler.phase("noop", app):
+        cdk.Stack(app, "TestStack")
+
+    assert profiler.phases == []
+    assert profiler.write_report(str(tmp_path)) is None
+
+
+def test_enabled_profiler_writes_phase_report(tmp_path):
+    profiler = SynthProfiler(enabled=True, profiler="cprofile", count_constructs=True)
+    profiler.start()
+    app = cdk.App(outdir=str(tmp_path))
+
+    with profiler.phase("create_stack", app):
+        stack = cdk.Stack(app, "TestStack")
+        cdk.CfnOutput(stack, "Output", value="value")
+    with profiler.phase("app_synth", app):
+        app.synth()
+
+    with open(profiler.write_report(str(tmp_path)), "r") as file:
+        report = json.load(file)
+    assert [phase["name"] for phase in report["phases"]] == [
+        "create_stack",
+        "app_synth",
+    ]
+    assert report["phases"][0]["constructs_created"] >= 2
+    assert report["phases"][0]["jsii_calls"] >= 2
+    assert (tmp_path / report["profile_file"]).exists()
+
+
+def test_constructs_are_only_counted_on_demand():
+    profiler = SynthProfiler(enabled=True)
+    app = cdk.App()
+
+    with profiler.phase("create_stack", app):
+        cdk.Stack(app, "TestStack")
+
+    assert "constructs_created" not in profiler.phases[0]
@@ -2,28 +2,57 @@ from aws_cdk import aws_sns as sns
 import aws_cdk as cdk
 from aws_cdk.assertions import Template
 
+from cdk.helpers.org_spec import load_org_spec
+from cdk.helpers.policy_library import PolicyLibrary
 from cdk.stacks.cdk_organization import OrganizationStack
 
 
-def test_synthesizes_properly():
-    app = cdk.App()
-
-    # Create the TestOrganizationStack with sample params
-    deployment_env = "prod"
-    main_resources_name = "test-organization"
-    state_machine_stack = OrganizationStack(
-        app,
-        main_resources_name,
-        deployment_env,
-    )
-
-    # Prepare the stack for assertions.
-    template = Template.from_stack(state_machine_stack)
-
-    template.has_output(
+def test_synthesizes_properly(org):
+    # Shared "OrganizationStack" with sample params (see "conftest.py")
+    org.template.has_output(
         "DeploymentEnvironment",
         {
             "Description": "Deployment environment",
-            "Value": deployment_env,
+            "Value": "prod",
         },
     )
+
+
+def test_synthesizes_sibling_stack_shards(synth_org):
+    organization_stack = synth_org(sharding_mode="stacks").stack
+
+    # One sibling stack per top-level OU, with the accounts of that OU
+    assert sorted(organization_stack.shards) == [
+        "infrastructure",
+        "policy-staging-tests",
+        "sandbox",
+        "workloads",
+    ]
+    workloads_template = Template.from_stack(organization_stack.shards["workloads"])
+    workloads_template.has_output("AccountFinanceDevId", {})
+    Template.from_stack(organization_stack).has_output("RootId", {})
+
+
+def test_synthesizes_several_environments_in_one_app():
+    app = cdk.App()
+    org_spec = load_org_spec()
+    policy_library = PolicyLibrary(org_spec.policies_dir)
+
+    for environment in ("dev", "prod"):
+        OrganizationStack(
+            cdk.Stage(app, environment),
+            "test-organization",
+            environment,
+            org_spec=org_spec,
+            policy_library=policy_library,
+        )
+    cloud_assembly = app.synth()
+
+    for environment in ("dev", "prod"):
+        stage_assembly = cloud_assembly.get_nested_assembly(
+            "assembly-{}".format(environment)
+        )
+        (stack,) = stage_assembly.stacks
+        assert (
+            stack.template["Outputs"]["DeploymentEnvironment"]["Value"] == environment
+        )
@@ -0,0 +1,84 @@
+import os
+import stat
+import sys
+import json
+import threading
+import subprocess
+
+# Same module name as in "app.py" (the request props are module state)
+from helpers import warm_synth
+from helpers.warm_synth import (
+    SynthServer,
+    read_cli_context,
+    request_synth,
+    send_request,
+)
+
+
+def test_own_helpers_do_not_import_jsii():
+    code = (
+        "import sys, helpers.synth_profiler, helpers.warm_synth, "
+        "helpers.parallel_synth; print('jsii' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(warm_synth.__file__)),
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_read_cli_context_merges_the_overflow_file(tmp_path):
+    overflow_path = tmp_path / "context.json"
+    overflow_path.write_text(json.dumps({"big": [1, 2, 3]}))
+
+    context = read_cli_context(
+        {
+            "CDK_CONTEXT_JSON": json.dumps({"main_resources_name": "org"}),
+            "CDK_CONTEXT_OVERFLOW_LOCATION": str(overflow_path),
+        }
+    )
+
+    assert context == {"main_resources_name": "org", "big": [1, 2, 3]}
+
+
+def test_server_runs_the_app_with_the_env_of_the_request(tmp_path, monkeypatch):
+    app_file = tmp_path / "app.py"
+    app_file.write_text(
+        "import os\n"
+        "from helpers.warm_synth import synth_request_props\n"
+        "props = synth_request_props()\n"
+        "print(os.environ['DEPLOYMENT_ENVIRONMENT'], os.getcwd())\n"
+        "print(props['outdir'], props['context'])\n"
+        "raise SystemExit(3)\n"
+    )
+    monkeypatch.setattr(warm_synth, "APP_FILE", str(app_file))
+    server = SynthServer(str(tmp_path / "cdk.out" / ".synth.sock"))
+    socket_mode = stat.S_IMODE(os.stat(server.socket_path).st_mode)
+    thread = threading.Thread(target=server.serve_until_stopped)
+    thread.start()
+
+    status, output = request_synth(
+        {
+            "DEPLOYMENT_ENVIRONMENT": "dev",
+            "CDK_OUTDIR": "cdk.out",
+            "CDK_CONTEXT_JSON": json.dumps({"outputs_mode": "manifest"}),
+        },
+        cwd=str(tmp_path),
+        socket_path=server.socket_path,
+    )
+    send_request({"command": "stop"}, server.socket_path)
+    thread.join(timeout=10)
+
+    assert socket_mode == 0o600
+    assert status == 3
+    assert output.splitlines() == [
+        "dev {}".format(tmp_path),
+        "{} {}".format(tmp_path / "cdk.out", {"outputs_mode": "manifest"}),
+    ]
+    assert server.requests == 1
+    assert not os.path.exists(server.socket_path)
+    assert warm_synth.synth_request_props() == {}
+    assert os.environ.get("DEPLOYMENT_ENVIRONMENT") != "dev"